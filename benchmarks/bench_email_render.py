@@ -0,0 +1,81 @@
+"""
+Per-email render cost of the HTML emails (core/email_templates.py)
+
+    python -m benchmarks.bench_email_render [--repeat 2000]
+
+For each email:
+
+- "shell per email" renders emails/base.html around the body every time, as
+  a plain template port would
+- "memoized shell" is what the app does: only the body is rendered, then
+  spliced into the shell rendered once per title
+- "text via strip_tags" derives the plain-text part from the HTML, as the
+  password reset email used to; "text template" renders <name>.txt
+  (payment reminders have none: their text is reminder_text())
+
+Needs no database.
+"""
+import argparse
+import time
+from decimal import Decimal
+
+from benchmarks.common import print_table, setup_django
+
+
+CONTEXTS = {
+    'welcome': {'user_name': 'Asha', 'email': 'asha@example.com', 'username': 'asha'},
+    'payment_reminder': {'user_name': 'Asha', 'month_year': '2026-03', 'amount': Decimal('2500.00'),
+                         'status': 'Pending', 'upi_id': 'mess@upi'},
+    'monthly_report': {'user_name': 'Asha', 'month_year': '2026-03', 'amount': Decimal('2500.00'),
+                       'status': 'Paid', 'total_grocery': Decimal('18250.50'),
+                       'total_fixed': Decimal('16200.00'), 'total_expenses': Decimal('34450.50')},
+    'password_reset_success': {'user_name': 'Asha'},
+    'account_not_found': {'email': 'nobody@example.com'},
+}
+
+
+def per_call_us(func, repeat):
+    func()  # compile and memoize outside the timing
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return round((time.perf_counter() - start) / repeat * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.template.loader import render_to_string
+    from django.utils.html import strip_tags
+    from django.utils.safestring import mark_safe
+    from core.email_templates import EMAILS, render_email_html, render_email_text
+
+    def shell_per_email(name, context):
+        content = render_to_string(f'emails/{name}.html', context)
+        if EMAILS[name] is None:
+            return content
+        return render_to_string('emails/base.html', {'title': EMAILS[name], 'content': mark_safe(content)})
+
+    rows = []
+    for name, context in CONTEXTS.items():
+        html = render_email_html(name, context)
+        rows.append({
+            'email': name,
+            'html bytes': len(html),
+            'shell per email us': per_call_us(lambda: shell_per_email(name, context), args.repeat),
+            'memoized shell us': per_call_us(lambda: render_email_html(name, context), args.repeat),
+            'text via strip_tags us': per_call_us(lambda: strip_tags(html), args.repeat),
+            'text template us': (per_call_us(lambda: render_email_text(name, context), args.repeat)
+                                 if name != 'payment_reminder' else '-'),
+        })
+
+    print_table(rows, ['email', 'html bytes', 'shell per email us', 'memoized shell us',
+                       'text via strip_tags us', 'text template us'])
+
+
+if __name__ == '__main__':
+    main()
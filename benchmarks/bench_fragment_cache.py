@@ -0,0 +1,117 @@
+"""
+Render time of the dashboards and transparency page with and without the
+version-keyed template fragment cache
+
+    python -m benchmarks.bench_fragment_cache [--members 500] [--repeat 20]
+
+"before" clears the cache ahead of every request, so each fragment renders
+from the database; "after" serves the warm fragments.
+"""
+import argparse
+from datetime import date
+from decimal import Decimal
+
+from benchmarks.common import setup_django, throwaway_database, timed, print_table
+
+
+def seed(members):
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+    from core.models import UserProfile, Payment, Grocery, FixedExpense, Message
+
+    month = date.today().strftime('%Y-%m')
+    password = make_password('bench-pass')
+
+    admin = User.objects.create(username='bench_admin', password=password)
+    UserProfile.objects.filter(user=admin).update(role='admin')
+
+    users = User.objects.bulk_create([
+        User(username=f'member{i}', first_name=f'Member{i}', last_name='Bench', password=password)
+        for i in range(members)
+    ])
+    UserProfile.objects.bulk_create([UserProfile(user=u, role='user', room_no=str(100 + i))
+                                     for i, u in enumerate(users)])
+    Payment.objects.bulk_create([
+        Payment(user=u, month_year=month, amount=Decimal('2500'),
+                status=('paid', 'pending', 'partial')[i % 3])
+        for i, u in enumerate(users)
+    ])
+    Grocery.objects.bulk_create([
+        Grocery(item_name=f'Item {i}', category='vegetables', quantity='1 kg',
+                price=Decimal('120.50'), purchase_date=date.today(), month_year=month)
+        for i in range(80)
+    ])
+    FixedExpense.objects.create(month_year=month, kitchen_rent=Decimal('8000'),
+                                maid_salary=Decimal('6000'), gas_cylinder=Decimal('2200'))
+    Message.objects.bulk_create([
+        Message(user=users[0], subject=f'Subject {i}', message='Lorem ipsum ' * 20)
+        for i in range(20)
+    ])
+    return admin, users[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--members', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    with throwaway_database():
+        admin, member = seed(args.members)
+
+        admin_client = Client()
+        admin_client.force_login(admin)
+        member_client = Client()
+        member_client.force_login(member)
+
+        pages = [
+            ('admin_dashboard', admin_client),
+            ('user_dashboard', member_client),
+            ('transparent_data', member_client),
+        ]
+
+        rows = []
+        for name, client in pages:
+            url = reverse(name)
+
+            def cold():
+                cache.clear()
+                client.get(url)
+
+            def warm():
+                client.get(url)
+
+            # Count queries right away; the query log is reset per request
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                client.get(url)
+            queries_before = len(captured)
+            with CaptureQueriesContext(connection) as captured:
+                client.get(url)
+            queries_after = len(captured)
+
+            before = timed(cold, args.repeat)
+            after = timed(warm, args.repeat)
+            rows.append({
+                'page': name,
+                'before_ms': before['median_ms'],
+                'after_ms': after['median_ms'],
+                'speedup': f"{before['median_ms'] / after['median_ms']:.1f}x",
+                'queries_before': queries_before,
+                'queries_after': queries_after,
+            })
+
+    print(f'Fragment cache, {args.members} members, median of {args.repeat} requests\n')
+    print_table(rows, ['page', 'before_ms', 'after_ms', 'speedup', 'queries_before', 'queries_after'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Throughput of the app under gunicorn with different worker configurations
+
+    python -m benchmarks.bench_gunicorn [--workers 2] [--concurrency 16] [--duration 10]
+
+Every configuration serves the same mix of requests against a temporary
+SQLite database: the member dashboard, the transparency page and a PDF
+receipt (the slow request that ties up a sync worker). The "shipped" row
+uses gunicorn.conf.py as it is deployed.
+"""
+import argparse
+import http.client
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import BASE_DIR, free_port, print_table, wait_for_server
+
+
+SETTINGS_MODULE = 'benchmarks.server_settings'
+
+
+def configurations(workers):
+    return [
+        ('sync x1 (gunicorn default)', {
+            'GUNICORN_WORKER_CLASS': 'sync', 'WEB_CONCURRENCY': '1',
+            'GUNICORN_THREADS': '1', 'GUNICORN_PRELOAD': 'False',
+        }),
+        (f'sync x{workers}', {
+            'GUNICORN_WORKER_CLASS': 'sync', 'WEB_CONCURRENCY': str(workers),
+            'GUNICORN_THREADS': '1', 'GUNICORN_PRELOAD': 'False',
+        }),
+        (f'gthread x{workers}x4', {
+            'GUNICORN_WORKER_CLASS': 'gthread', 'WEB_CONCURRENCY': str(workers),
+            'GUNICORN_THREADS': '4', 'GUNICORN_PRELOAD': 'False',
+        }),
+        (f'gthread x{workers}x4 preload (shipped)', {
+            'GUNICORN_WORKER_CLASS': 'gthread', 'WEB_CONCURRENCY': str(workers),
+            'GUNICORN_THREADS': '4', 'GUNICORN_PRELOAD': 'True',
+        }),
+    ]
+
+
+def prepare_database(env):
+    """Migrate and seed the temporary database; returns the member's session key"""
+    os.environ.update(env)
+    from benchmarks.common import setup_django
+    setup_django(SETTINGS_MODULE)
+
+    from django.core.management import call_command
+    from django.test import Client
+    from benchmarks.bench_fragment_cache import seed
+
+    call_command('migrate', verbosity=0)
+    _, member = seed(members=200)
+
+    client = Client()
+    client.force_login(member)
+    return client.cookies['sessionid'].value
+
+
+def run_load(port, session_key, concurrency, duration):
+    """Hit the server from `concurrency` keep-alive clients for `duration` seconds"""
+    paths = ['/user/dashboard/', '/user/data/', '/user/receipt/']
+    headers = {'Cookie': f'sessionid={session_key}', 'Host': 'localhost'}
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        own, failed, i = [], 0, offset
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                continue
+            own.append((time.perf_counter() - start) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(own)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors)
+
+
+def bench(name, overrides, env, session_key, args):
+    port = free_port()
+    server_env = {**os.environ, **env, **overrides,
+                  'GUNICORN_BIND': f'127.0.0.1:{port}', 'GUNICORN_ACCESS_LOG': '',
+                  'GUNICORN_LOG_LEVEL': 'warning'}
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+         'mess_management.wsgi:application'],
+        cwd=BASE_DIR, env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_for_server(port):
+            return {'config': name, 'errors': 'server did not start'}
+        # One untimed round so every worker has served a request
+        run_load(port, session_key, args.concurrency, 1)
+        latencies, errors = run_load(port, session_key, args.concurrency, args.duration)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        'config': name,
+        'req_per_s': round(len(latencies) / args.duration, 1),
+        'p50_ms': round(statistics.median(latencies), 1) if latencies else '-',
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)], 1) if latencies else '-',
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_gunicorn_')
+    env = {
+        'DJANGO_SETTINGS_MODULE': SETTINGS_MODULE,
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}",
+        'CACHE_DIR': os.path.join(workdir, 'cache'),
+        'DEBUG': 'False',
+    }
+    try:
+        session_key = prepare_database(env)
+        rows = [bench(name, overrides, env, session_key, args)
+                for name, overrides in configurations(args.workers)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f'{args.concurrency} concurrent clients, {args.duration:g}s per configuration, '
+          f'{os.cpu_count()} CPU(s)\n')
+    print_table(rows, ['config', 'req_per_s', 'p50_ms', 'p95_ms', 'errors'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+"""
+HTTP load test: a weighted mix of routes with per-route latency percentiles
+
+Against a server you started yourself (runserver or gunicorn) and seeded:
+
+    python manage.py seed_perf_data --users 500
+    python -m benchmarks.bench_load --url http://127.0.0.1:8000 \\
+        --admin admin:admin123 --user perf0:perf-pass
+
+Or let the harness seed a temporary SQLite database and start the server:
+
+    python -m benchmarks.bench_load [--server gunicorn|runserver]
+        [--concurrency 16] [--duration 30] [--output run.json] [--compare old.json]
+
+The harness logs in over HTTP through the admin portal and the member login
+form, then runs `--concurrency` threads, each with its own keep-alive
+connection, picking routes from ROUTE_MIX by weight. Anything other than a
+200 counts as an error. Results (throughput and p50/p95/p99 per URL name)
+are printed as JSON, or written to --output so two runs can be diffed;
+--compare prints the change against an earlier run.
+"""
+import argparse
+import http.client
+import http.cookiejar
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime, timezone
+
+from benchmarks.common import BASE_DIR, free_port, print_table, setup_django, wait_for_server
+
+
+SETTINGS_MODULE = 'benchmarks.server_settings'
+
+# (URL name, role, weight): roughly what a day of traffic looks like, with
+# the expensive report and export downloads kept rare
+ROUTE_MIX = [
+    ('user_dashboard', 'user', 20),
+    ('transparent_data', 'user', 15),
+    ('user_meal_calendar', 'user', 10),
+    ('user_payment', 'user', 6),
+    ('user_messages_list', 'user', 5),
+    ('api_dashboard', 'user', 5),
+    ('user_receipt', 'user', 3),
+    ('admin_dashboard', 'admin', 10),
+    ('payment_list', 'admin', 8),
+    ('meal_calendar', 'admin', 4),
+    ('user_list', 'admin', 4),
+    ('grocery_list', 'admin', 4),
+    ('admin_messages', 'admin', 3),
+    ('monthly_report', 'admin', 2),
+    ('export_payments_excel', 'admin', 2),
+    ('export_groceries_excel', 'admin', 1),
+    ('export_monthly_report_excel', 'admin', 1),
+]
+
+ADMIN_USERNAME = 'perf_admin'
+PASSWORD = 'perf-pass'
+
+
+# ==================== Setup ====================
+
+def prepare_database(env, users):
+    """Migrate and seed the temporary database with members and one admin"""
+    os.environ.update(env)
+    setup_django(SETTINGS_MODULE)
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from core.models import UserProfile
+    from core.perf_data import seed_perf_data
+
+    call_command('migrate', verbosity=0)
+    seed_perf_data(users=users, password=PASSWORD)
+    admin = User.objects.create_user(ADMIN_USERNAME, password=PASSWORD)
+    UserProfile.objects.filter(user=admin).update(role='admin')
+
+
+def start_server(kind, env, port):
+    command = {
+        'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                     'mess_management.wsgi:application'],
+        'runserver': [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}'],
+    }[kind]
+    server_env = {**os.environ, **env, 'GUNICORN_BIND': f'127.0.0.1:{port}',
+                  'GUNICORN_ACCESS_LOG': '', 'GUNICORN_LOG_LEVEL': 'warning'}
+    return subprocess.Popen(command, cwd=BASE_DIR, env=server_env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def log_in(base_url, path, fields):
+    """
+    Log in through a form the way a browser does (CSRF cookie and token)
+
+    Returns:
+        the session cookie value
+    """
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    url = base_url + path
+
+    page = opener.open(url).read().decode()
+    token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', page)
+    if token is None:
+        raise SystemExit(f'No CSRF token in {url}')
+
+    body = urllib.parse.urlencode({**fields, 'csrfmiddlewaretoken': token.group(1)}).encode()
+    opener.open(urllib.request.Request(url, data=body, headers={'Referer': url}))
+
+    session = next((cookie.value for cookie in jar if cookie.name == 'sessionid'), None)
+    if session is None:
+        raise SystemExit(f'Login at {url} as {next(iter(fields.values()))} failed')
+    return session
+
+
+def route_paths():
+    """URL name -> path for every route in the mix"""
+    from django.urls import reverse
+    return {name: reverse(name) for name, _, _ in ROUTE_MIX}
+
+
+# ==================== Load ====================
+
+def run_load(base_url, sessions, paths, concurrency, duration, seed=0):
+    """
+    Drive the route mix from `concurrency` keep-alive clients for `duration` seconds
+
+    Returns:
+        dict mapping URL name to {'latencies': [ms, ...], 'errors': n}
+    """
+    target = urllib.parse.urlsplit(base_url)
+    names = [name for name, _, _ in ROUTE_MIX]
+    weights = [weight for _, _, weight in ROUTE_MIX]
+    roles = {name: role for name, role, _ in ROUTE_MIX}
+    results = {name: {'latencies': [], 'errors': 0} for name in names}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def connect():
+        return http.client.HTTPConnection(target.hostname, target.port or 80, timeout=60)
+
+    def client(number):
+        rng = random.Random(seed * 1000 + number)
+        own = {name: {'latencies': [], 'errors': 0} for name in names}
+        conn = connect()
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            headers = {'Cookie': f'sessionid={sessions[roles[name]]}', 'Host': target.netloc}
+            start = time.perf_counter()
+            try:
+                conn.request('GET', paths[name], headers=headers)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                own[name]['errors'] += 1
+                conn.close()
+                conn = connect()
+                continue
+            if response.status == 200:
+                own[name]['latencies'].append((time.perf_counter() - start) * 1000)
+            else:
+                own[name]['errors'] += 1
+        conn.close()
+        with lock:
+            for name, result in own.items():
+                results[name]['latencies'].extend(result['latencies'])
+                results[name]['errors'] += result['errors']
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return round(ordered[min(rank, len(ordered)) - 1], 2)
+
+
+def summarize(latencies, errors, duration):
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'req_per_s': round(len(ordered) / duration, 2),
+        'mean_ms': round(sum(ordered) / len(ordered), 2) if ordered else None,
+        'p50_ms': percentile(ordered, 50),
+        'p95_ms': percentile(ordered, 95),
+        'p99_ms': percentile(ordered, 99),
+        'max_ms': round(ordered[-1], 2) if ordered else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results, args, base_url):
+    every = [ms for result in results.values() for ms in result['latencies']]
+    return {
+        'meta': {
+            'started': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'url': base_url,
+            'server': args.server if not args.url else 'external',
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'cpus': os.cpu_count(),
+        },
+        'total': summarize(every, sum(r['errors'] for r in results.values()), args.duration),
+        'routes': {name: summarize(result['latencies'], result['errors'], args.duration)
+                   for name, result in results.items()},
+    }
+
+
+def print_comparison(old, new):
+    """p50/p95 of two reports side by side; negative change is faster"""
+    rows = []
+    for name in ['total', *new['routes']]:
+        before = old['total'] if name == 'total' else old['routes'].get(name)
+        after = new['total'] if name == 'total' else new['routes'][name]
+        if not before or not before['p95_ms'] or not after['p95_ms']:
+            continue
+        rows.append({
+            'route': name,
+            'p50_ms': f"{before['p50_ms']} -> {after['p50_ms']}",
+            'p95_ms': f"{before['p95_ms']} -> {after['p95_ms']}",
+            'p95_change': f"{(after['p95_ms'] / before['p95_ms'] - 1) * 100:+.1f}%",
+            'req_per_s': f"{before['req_per_s']} -> {after['req_per_s']}",
+        })
+    print_table(rows, ['route', 'p50_ms', 'p95_ms', 'p95_change', 'req_per_s'], file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', help='Base URL of a running server; omit to start one')
+    parser.add_argument('--admin', default=f'{ADMIN_USERNAME}:{PASSWORD}', help='username:password')
+    parser.add_argument('--user', default=f'perf0:{PASSWORD}', help='username:password')
+    parser.add_argument('--server', choices=('gunicorn', 'runserver'), default='gunicorn',
+                        help='Server to start when --url is not given')
+    parser.add_argument('--users', type=int, default=200, help='Members to seed when starting a server')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--warmup', type=float, default=2, help='Untimed seconds before measuring')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the route choices')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='Earlier JSON report to compare against')
+    args = parser.parse_args()
+
+    workdir = server = None
+    try:
+        if args.url:
+            setup_django()
+            base_url = args.url.rstrip('/')
+        else:
+            workdir = tempfile.mkdtemp(prefix='bench_load_')
+            env = {
+                'DJANGO_SETTINGS_MODULE': SETTINGS_MODULE,
+                'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}",
+                'CACHE_DIR': os.path.join(workdir, 'cache'),
+                'DEBUG': 'False',
+            }
+            prepare_database(env, args.users)
+            port = free_port()
+            server = start_server(args.server, env, port)
+            if not wait_for_server(port):
+                raise SystemExit(f'{args.server} did not start')
+            base_url = f'http://127.0.0.1:{port}'
+
+        from django.urls import reverse
+        admin_username, admin_password = args.admin.split(':', 1)
+        user_username, user_password = args.user.split(':', 1)
+        sessions = {
+            'admin': log_in(base_url, reverse('admin_login'),
+                            {'username': admin_username, 'password': admin_password}),
+            'user': log_in(base_url, reverse('account_login'),
+                           {'login': user_username, 'password': user_password}),
+        }
+        paths = route_paths()
+
+        if args.warmup:
+            run_load(base_url, sessions, paths, args.concurrency, args.warmup, seed=args.seed + 1)
+        results = run_load(base_url, sessions, paths, args.concurrency, args.duration, seed=args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = build_report(results, args, base_url)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Admin search through the SearchTerm index against LIKE scans of the tables
+
+    python -m benchmarks.bench_search [--messages 20000] [--repeat 20]
+
+Seeds a synthetic mess (core/perf_data.py, which also builds the index),
+then times one results page - count plus the first PER_PAGE hits - for
+queries from rare to very common:
+
+- "index" is core.search.search(), as the admin search page runs it; a
+  query whose words are all common only ranks their newest
+  COMMON_WORD_LIMIT matches, so it finds fewer hits
+- "LIKE" is what searching the tables directly would take: every word
+  icontains-matched against every searchable field of messages, groceries
+  and users, each kind counted and its first page fetched
+"""
+import argparse
+from functools import reduce
+from operator import and_, or_
+
+from benchmarks.common import print_table, setup_django, throwaway_database, timed
+
+
+QUERIES = ('subject 1234', 'member12', 'rice', 'dal', 'lorem ipsu')
+
+
+def like_search(query):
+    from django.contrib.auth.models import User
+    from django.db.models import Q
+    from core.models import Grocery, Message
+    from core.search import GROCERY_FIELDS, MESSAGE_FIELDS, PER_PAGE, USER_FIELDS, tokenize
+
+    sources = (
+        (Message.objects.filter(message_type='user'), [field for field, _ in MESSAGE_FIELDS]),
+        (Grocery.objects.all(), [field for field, _ in GROCERY_FIELDS]),
+        (User.objects.all(), [field for field, _ in USER_FIELDS] + ['profile__room_no']),
+    )
+    total = 0
+    for queryset, fields in sources:
+        matches = queryset.filter(reduce(and_, (
+            reduce(or_, (Q(**{f'{field}__icontains': word}) for field in fields))
+            for word in tokenize(query)
+        )))
+        total += matches.count()
+        list(matches[:PER_PAGE])
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--members', type=int, default=500)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from core.models import SearchTerm
+    from core.perf_data import seed_perf_data
+    from core.search import search
+
+    with throwaway_database():
+        seed_perf_data(users=args.members, messages=args.messages, activity_logs=0, prefix='member')
+        print(f'{SearchTerm.objects.count()} index rows\n')
+
+        rows = []
+        for query in QUERIES:
+            hits = search(query).paginator.count
+            index = timed(lambda: search(query), args.repeat)
+            like = timed(lambda: like_search(query), args.repeat)
+            rows.append({
+                'query': query,
+                'hits': hits,
+                'LIKE hits': like_search(query),
+                'index ms': index['median_ms'],
+                'LIKE ms': like['median_ms'],
+            })
+
+        print_table(rows, ['query', 'hits', 'LIKE hits', 'index ms', 'LIKE ms'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Concurrent read/write throughput on SQLite, default settings against the
+SQLITE_TUNING profile (core/sqlite_tuning.py)
+
+    python -m benchmarks.bench_sqlite_tuning [--workers 4] [--duration 10] [--write-ratio 0.2]
+
+Each mode gets its own seeded SQLite file. --workers processes, like gunicorn
+workers, then hammer it for --duration seconds. A read is a member dashboard's
+worth of queries: one month's payments and the latest messages. A write marks
+a payment paid and logs the activity in one transaction, like the admin
+payment views. Errors are almost always "database is locked".
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import BASE_DIR, print_table, setup_django
+
+
+SETTINGS_MODULE = 'benchmarks.server_settings'
+MODES = {'default': 'False', 'tuned': 'True'}
+
+
+def prepare(args):
+    """Migrate and seed the database named by DATABASE_URL"""
+    setup_django(SETTINGS_MODULE)
+    from django.core.management import call_command
+    from core.perf_data import seed_perf_data
+
+    call_command('migrate', verbosity=0)
+    seed_perf_data(users=args.users, months=6, messages=2000, activity_logs=2000)
+
+
+def worker(args):
+    """Run the read/write mix until args.start + args.duration; print JSON"""
+    setup_django(SETTINGS_MODULE)
+    from django.db import DatabaseError, transaction
+    from django.db.models import Sum
+    from core.models import ActivityLog, Message, Payment
+
+    rng = random.Random(args.seed)
+    payment_ids = list(Payment.objects.values_list('id', flat=True))
+    months = list(Payment.objects.values_list('month_year', flat=True).distinct())
+    result = {'reads': [], 'writes': [], 'errors': 0}
+
+    while time.time() < args.start:
+        time.sleep(0.001)
+    deadline = args.start + args.duration
+    while time.time() < deadline:
+        write = rng.random() < args.write_ratio
+        started = time.perf_counter()
+        try:
+            if write:
+                with transaction.atomic():
+                    payment = Payment.objects.select_for_update().get(id=rng.choice(payment_ids))
+                    payment.status = 'paid'
+                    payment.save(update_fields=['status'])
+                    ActivityLog.objects.create(user_id=payment.user_id, action_type='payment',
+                                               description='Benchmark payment',
+                                               related_object_id=payment.id)
+            else:
+                month = rng.choice(months)
+                Payment.objects.filter(month_year=month).aggregate(Sum('amount'))
+                list(Payment.objects.filter(month_year=month).order_by('-id')[:20])
+                list(Message.objects.order_by('-created_at')[:20])
+        except DatabaseError:
+            result['errors'] += 1
+            continue
+        result['writes' if write else 'reads'].append((time.perf_counter() - started) * 1000)
+    print(json.dumps(result))
+
+
+def run_mode(mode, args):
+    workdir = tempfile.mkdtemp(prefix='bench_sqlite_')
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': SETTINGS_MODULE,
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}",
+        'CACHE_DIR': os.path.join(workdir, 'cache'),
+        'SQLITE_TUNING': MODES[mode],
+        'DEBUG': 'False',
+    }
+    script = [sys.executable, '-m', 'benchmarks.bench_sqlite_tuning']
+    common = ['--users', str(args.users), '--duration', str(args.duration),
+              '--write-ratio', str(args.write_ratio)]
+    try:
+        subprocess.run(script + ['--child', 'prepare'] + common, cwd=BASE_DIR, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        start = time.time() + 3  # let every worker finish importing Django
+        workers = [subprocess.Popen(script + ['--child', 'worker', '--start', str(start),
+                                              '--seed', str(n)] + common,
+                                    cwd=BASE_DIR, env=env, text=True,
+                                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                   for n in range(args.workers)]
+        results = [json.loads(process.communicate()[0].strip().splitlines()[-1]) for process in workers]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    reads = sorted(ms for result in results for ms in result['reads'])
+    writes = sorted(ms for result in results for ms in result['writes'])
+
+    def p95(samples):
+        return round(samples[int(len(samples) * 0.95)], 2) if samples else None
+
+    return {
+        'mode': mode,
+        'reads_per_s': round(len(reads) / args.duration, 1),
+        'writes_per_s': round(len(writes) / args.duration, 1),
+        'read_median_ms': round(statistics.median(reads), 2) if reads else None,
+        'read_p95_ms': p95(reads),
+        'write_median_ms': round(statistics.median(writes), 2) if writes else None,
+        'write_p95_ms': p95(writes),
+        'errors': sum(result['errors'] for result in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--users', type=int, default=100, help='Members to seed')
+    parser.add_argument('--child', choices=['prepare', 'worker'], help=argparse.SUPPRESS)
+    parser.add_argument('--start', type=float, help=argparse.SUPPRESS)
+    parser.add_argument('--seed', type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == 'prepare':
+        return prepare(args)
+    if args.child == 'worker':
+        return worker(args)
+
+    rows = [run_mode(mode, args) for mode in MODES]
+    print(f'{args.workers} worker processes, {args.duration:g}s, '
+          f'{args.write_ratio:.0%} writes\n')
+    print_table(rows, ['mode', 'reads_per_s', 'writes_per_s', 'read_median_ms', 'read_p95_ms',
+                       'write_median_ms', 'write_p95_ms', 'errors'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Shared setup for the benchmark scripts
+
+Benchmarks run against a throwaway test database (the same one Django's test
+runner creates), so they never touch db.sqlite3 or a production database.
+
+Run a benchmark from the project root as a module, e.g.
+
+    python -m benchmarks.bench_fragment_cache
+"""
+import os
+import socket
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(settings_module='mess_management.settings'):
+    """Put the project on sys.path and configure Django"""
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+
+    import django
+    django.setup()
+
+
+@contextmanager
+def throwaway_database(keepdb=False):
+    """Create the test database, yield, then destroy it"""
+    from django.db import connection
+    from django.test.utils import (setup_test_environment, teardown_test_environment,
+                                   override_settings)
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    # Pages render {% static %} without a collectstatic manifest
+    static = override_settings(
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    )
+    static.enable()
+    try:
+        yield
+    finally:
+        static.disable()
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def timed(func, repeat=20):
+    """
+    Run func repeat times
+
+    Returns:
+        dict with mean/median/min/max in milliseconds
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'mean_ms': round(statistics.mean(samples), 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'min_ms': round(min(samples), 3),
+        'max_ms': round(max(samples), 3),
+    }
+
+
+def print_table(rows, columns, file=None):
+    """Print a list of dicts as an aligned text table"""
+    widths = {c: max(len(c), *(len(str(r.get(c, ''))) for r in rows)) for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns), file=file)
+    print('  '.join('-' * widths[c] for c in columns), file=file)
+    for row in rows:
+        print('  '.join(str(row.get(c, '')).ljust(widths[c]) for c in columns), file=file)
+
+
+def free_port():
+    """An unused localhost TCP port for a benchmark server"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(port, timeout=30):
+    """Wait until something accepts connections on localhost:port"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
@@ -0,0 +1,13 @@
+"""
+Settings for benchmarks that run the app under a real server (gunicorn)
+
+The database and cache come from DATABASE_URL / CACHE_DIR, which the
+benchmark points at a temporary directory.
+"""
+from mess_management.settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+
+# Pages render {% static %} without a collectstatic manifest
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
@@ -23,32 +23,15 @@ class CustomAccountAdapter(DefaultAccountAdapter):
             
             # Send beautiful HTML welcome email
             from django.core.mail import EmailMultiAlternatives
-            from core.email_templates import get_welcome_email_html
+            from core.email_templates import render_email
             
             try:
                 subject = '🎉 Welcome to Mess Management System!'
-                text_content = f'''
-Dear {user.first_name or user.username},
-
-Congratulations! Your account has been successfully created.
-
-Your Account Details:
-- Username: {user.username}
-- Email: {user.email}
-
-Login here: http://127.0.0.1:8000/accounts/login/
-
-For assistance, contact: pawantripathi802@gmail.com
-
-Best regards,
-Mess Management Team
-                '''
-                
-                html_content = get_welcome_email_html(
-                    user_name=user.first_name or user.username,
-                    email=user.email,
-                    username=user.username
-                )
+                text_content, html_content = render_email('welcome', {
+                    'user_name': user.first_name or user.username,
+                    'email': user.email,
+                    'username': user.username,
+                })
                 
                 msg = EmailMultiAlternatives(
                     subject=subject,
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile, Payment, Grocery, FixedExpense, Message, MealPlan, ActivityLog, UserSettings, MessSettings
+from .models import UserProfile, Payment, Grocery, FixedExpense, Message, MealPlan, ActivityLog, UserSettings, MessSettings, PaymentReminder, MonthlyReport, ReportEmail
 
 
 @admin.register(UserProfile)
@@ -139,3 +139,30 @@ class ActivityLogAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__first_name', 'description')
     ordering = ('-timestamp',)
     readonly_fields = ('timestamp',)
+
+
+@admin.register(PaymentReminder)
+class PaymentReminderAdmin(admin.ModelAdmin):
+    list_display = ('payment', 'tier', 'created_at', 'emailed_at')
+    list_filter = ('tier', 'created_at')
+    search_fields = ('key', 'payment__user__username', 'payment__month_year')
+    ordering = ('-created_at',)
+    readonly_fields = ('key', 'created_at', 'emailed_at')
+
+
+@admin.register(MonthlyReport)
+class MonthlyReportAdmin(admin.ModelAdmin):
+    list_display = ('month_year', 'kind', 'generated_at', 'stale')
+    list_filter = ('kind', 'stale')
+    search_fields = ('month_year',)
+    ordering = ('-month_year', 'kind')
+    readonly_fields = ('generated_at',)
+
+
+@admin.register(ReportEmail)
+class ReportEmailAdmin(admin.ModelAdmin):
+    list_display = ('user', 'month_year', 'status', 'attempts', 'sent_at')
+    list_filter = ('status', 'month_year')
+    search_fields = ('user__username', 'user__email', 'month_year')
+    ordering = ('-month_year', 'id')
+    readonly_fields = ('created_at', 'sent_at', 'attempts', 'last_error')
@@ -0,0 +1,320 @@
+"""
+Read-only JSON API (v1) for dashboards, polling clients and the mobile wrapper
+
+Every endpoint serializes values() rows - no model instances are built - and
+answers with an ETag so unchanged polls get an empty 304. The ETag is made
+from the data versions of the models the endpoint reads (core.cache_versions),
+the user and the query string, so a 304 is decided before any data query
+runs. Long lists use keyset pagination on an indexed column instead of OFFSET.
+"""
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Sum
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+
+from .cache_versions import get_data_versions
+from .meal_calendar import get_meal_plan_version, get_meal_plans_in_range
+from .models import UserProfile, Payment, Grocery, FixedExpense, Message
+
+
+API_DEFAULT_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Longest date range a single meal plan request may cover
+API_MAX_MEAL_DAYS = 92
+
+PAYMENT_FIELDS = ('id', 'month_year', 'amount', 'status', 'transaction_id', 'paid_date', 'created_at')
+MESSAGE_FIELDS = ('id', 'subject', 'message', 'message_type', 'status', 'created_at',
+                  'resolved_at', 'admin_reply', 'replied_at', 'user_reply', 'user_replied_at')
+MEAL_PLAN_FIELDS = ('id', 'date', 'breakfast', 'lunch', 'dinner', 'notes', 'updated_at')
+GROCERY_FIELDS = ('id', 'item_name', 'category', 'quantity', 'price', 'purchase_date')
+FIXED_EXPENSE_FIELDS = ('kitchen_rent', 'maid_salary', 'gas_cylinder', 'other_expenses')
+
+
+class ApiError(Exception):
+    """Bad request parameters; rendered as a JSON error body"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+# ==================== Helpers ====================
+
+def api_view(roles=None, versions=(), validator=None):
+    """
+    Decorator for API views: GET/HEAD only, JSON 401/403 instead of login
+    redirects, and ApiError turned into a JSON error response
+
+    Args:
+        versions: data version names (core.cache_versions) of the models
+            the view reads
+        validator: optional callable(request) returning a cheap stamp of
+            data the versions don't cover
+    """
+    def decorator(view_func):
+        @require_safe
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return JsonResponse({'error': 'Authentication required'}, status=401)
+
+            profile = getattr(request.user, 'profile', None)
+            if profile is None or (roles and profile.role not in roles):
+                return JsonResponse({'error': 'Permission denied'}, status=403)
+
+            try:
+                etag = _api_etag(request, versions, validator)
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+            except ApiError as e:
+                return JsonResponse({'error': e.message}, status=e.status)
+            response['ETag'] = etag
+            # Responses are per-user; clients must revalidate but may keep a copy
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return _wrapped_view
+    return decorator
+
+
+def _api_etag(request, versions, validator):
+    """
+    ETag of a response from what it depends on, without building it
+
+    The date is part of it as endpoints default to the current month or week.
+    """
+    data_versions = get_data_versions()
+    parts = [
+        request.path,
+        request.user.pk,
+        request.user.profile.role,
+        date.today().isoformat(),
+        sorted(request.GET.lists()),
+        [data_versions[name] for name in versions],
+        validator(request) if validator else '',
+    ]
+    return '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def api_response(request, payload):
+    """Serialize payload as the JSON response"""
+    body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return HttpResponse(body, content_type='application/json')
+
+
+def _current_month():
+    return datetime.now().strftime('%Y-%m')
+
+
+def _get_month(request):
+    """?month=YYYY-MM, defaulting to the current month"""
+    month_year = request.GET.get('month') or _current_month()
+    try:
+        datetime.strptime(month_year, '%Y-%m')
+    except ValueError:
+        raise ApiError('month must be in YYYY-MM format')
+    return month_year
+
+
+def _get_date(request, name, default):
+    value = request.GET.get(name)
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(f'{name} must be in YYYY-MM-DD format')
+
+
+def _get_limit(request):
+    try:
+        limit = int(request.GET.get('limit', API_DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError('limit must be an integer')
+    return max(1, min(limit, API_MAX_PAGE_SIZE))
+
+
+def _keyset_page(queryset, key, limit):
+    """
+    Fetch one page of a queryset already filtered past the cursor
+
+    Returns:
+        (rows, next_cursor) - next_cursor is None on the last page
+    """
+    rows = list(queryset[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][key]
+    return rows, None
+
+
+def _month_grocery_total(month_year):
+    return Grocery.objects.filter(month_year=month_year).aggregate(total=Sum('price'))['total'] or 0
+
+
+def _month_fixed_total(month_year):
+    total = FixedExpense.objects.filter(month_year=month_year).aggregate(
+        total=Sum(F('kitchen_rent') + F('maid_salary') + F('gas_cylinder') + F('other_expenses'))
+    )['total']
+    return total or 0
+
+
+# ==================== Endpoints ====================
+
+@api_view(versions=('payment', 'grocery', 'fixedexpense', 'message', 'userprofile'))
+def dashboard_stats(request):
+    """Dashboard numbers for the current month - admin or member view by role"""
+    current_month = _current_month()
+    total_groceries = _month_grocery_total(current_month)
+    total_fixed = _month_fixed_total(current_month)
+
+    if request.user.profile.role == 'admin':
+        payments = Payment.objects.filter(month_year=current_month)
+        payload = {
+            'month': current_month,
+            'total_users': UserProfile.objects.filter(role='user', is_active=True).count(),
+            'total_payments': payments.filter(status='paid').aggregate(total=Sum('amount'))['total'] or 0,
+            'pending_payments': payments.filter(status='pending').count(),
+            'total_groceries': total_groceries,
+            'total_fixed': total_fixed,
+            'total_expenses': total_groceries + total_fixed,
+            'pending_messages': Message.objects.filter(status='pending').count(),
+        }
+    else:
+        payment = (
+            Payment.objects.filter(user=request.user, month_year=current_month)
+            .order_by('pk').values('amount', 'status').first()
+        )
+        payload = {
+            'month': current_month,
+            'payment_status': payment['status'] if payment else None,
+            'payment_amount': payment['amount'] if payment else None,
+            'total_expenses': total_groceries + total_fixed,
+            'recent_messages': list(
+                Message.objects.filter(user=request.user)
+                .order_by('-id').values(*MESSAGE_FIELDS)[:5]
+            ),
+        }
+
+    return api_response(request, payload)
+
+
+@api_view(roles=('user',), versions=('payment',))
+def my_payment(request):
+    """The current member's payment for ?month= (default: current month)"""
+    month_year = _get_month(request)
+    payment = (
+        Payment.objects.filter(user=request.user, month_year=month_year)
+        .order_by('pk').values(*PAYMENT_FIELDS).first()
+    )
+    return api_response(request, {'month': month_year, 'payment': payment})
+
+
+@api_view(versions=('message', 'user'))
+def message_list(request):
+    """
+    Messages, newest first - members see their own, admins see user messages
+    Paginate with ?before=<next_cursor>&limit=N
+    """
+    if request.user.profile.role == 'admin':
+        queryset = Message.objects.filter(message_type='user').values(
+            *MESSAGE_FIELDS, 'user_id', user_first_name=F('user__first_name'),
+            user_last_name=F('user__last_name'),
+        )
+        status = request.GET.get('status')
+        if status:
+            queryset = queryset.filter(status=status)
+    else:
+        queryset = Message.objects.filter(user=request.user).values(*MESSAGE_FIELDS)
+
+    before = request.GET.get('before')
+    if before:
+        try:
+            queryset = queryset.filter(id__lt=int(before))
+        except ValueError:
+            raise ApiError('before must be an integer cursor')
+
+    # id follows insertion order, so it stands in for created_at on the PK index
+    rows, next_cursor = _keyset_page(queryset.order_by('-id'), 'id', _get_limit(request))
+    return api_response(request, {'results': rows, 'next_cursor': next_cursor})
+
+
+def _get_meal_range(request):
+    """?start=&end= (inclusive dates, default: the next 7 days)"""
+    start = _get_date(request, 'start', date.today())
+    end = _get_date(request, 'end', start + timedelta(days=6))
+    if end < start:
+        raise ApiError('end must be on or after start')
+    if (end - start).days + 1 > API_MAX_MEAL_DAYS:
+        raise ApiError(f'date range cannot exceed {API_MAX_MEAL_DAYS} days')
+    return start, end
+
+
+def _meal_plan_stamp(request):
+    # MealPlan has no data version; one aggregate over the range stands in
+    start, end = _get_meal_range(request)
+    return get_meal_plan_version(start, end + timedelta(days=1))
+
+
+@api_view(validator=_meal_plan_stamp)
+def meal_plan_list(request):
+    """
+    Meal plans for ?start=&end= (inclusive dates, default: the next 7 days)
+    Paginate with ?after=<next_cursor>&limit=N
+    """
+    start, end = _get_meal_range(request)
+
+    queryset = get_meal_plans_in_range(start, end + timedelta(days=1))
+    after = _get_date(request, 'after', None)
+    if after:
+        queryset = queryset.filter(date__gt=after)
+
+    rows, next_cursor = _keyset_page(
+        queryset.order_by('date').values(*MEAL_PLAN_FIELDS), 'date', _get_limit(request)
+    )
+    return api_response(request, {
+        'start': start,
+        'end': end,
+        'results': rows,
+        'next_cursor': next_cursor,
+    })
+
+
+@api_view(versions=('grocery', 'fixedexpense', 'payment', 'user'))
+def transparent_data(request):
+    """Groceries, fixed expenses and payments for ?month= (default: current month)"""
+    month_year = _get_month(request)
+
+    groceries = list(
+        Grocery.objects.filter(month_year=month_year)
+        .order_by('-purchase_date', '-id').values(*GROCERY_FIELDS)
+    )
+    fixed_expense = (
+        FixedExpense.objects.filter(month_year=month_year)
+        .order_by('pk').values(*FIXED_EXPENSE_FIELDS).first()
+    )
+    if fixed_expense:
+        fixed_expense['total'] = sum(fixed_expense[field] for field in FIXED_EXPENSE_FIELDS)
+
+    payments = list(
+        Payment.objects.filter(month_year=month_year)
+        .order_by('user__first_name', 'id')
+        .values('amount', 'status', first_name=F('user__first_name'), last_name=F('user__last_name'))
+    )
+
+    return api_response(request, {
+        'month': month_year,
+        'groceries': groceries,
+        'total_grocery': sum((g['price'] for g in groceries), 0),
+        'fixed_expense': fixed_expense,
+        'payments': payments,
+        'total_collected': sum((p['amount'] for p in payments if p['status'] == 'paid'), 0),
+    })
@@ -9,4 +9,8 @@ class CoreConfig(AppConfig):
         """Import signal handlers when app is ready"""
         import core.signals  # User profile signals
         import core.password_reset_signals  # Password reset confirmation emails
+        import core.request_timing  # Per-request query counting on every connection
+        import core.nplusone  # Repeated-query detection on every connection
+        import core.sqlite_tuning  # Opt-in SQLite PRAGMAs on every connection
+        import core.login_throttle  # Failed-login counters and lockouts
 
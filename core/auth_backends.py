@@ -4,6 +4,8 @@ Custom authentication backend to enforce role-based login
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import User
 
+from .login_throttle import LoginLockedOut, check_login_allowed
+
 
 class RoleBasedAuthBackend(ModelBackend):
     """
@@ -16,6 +18,16 @@ class RoleBasedAuthBackend(ModelBackend):
         Authenticate user and check role-based access
         Only applies role checking during LOGIN, not signup
         """
+        # Refuse locked-out usernames and IPs before any password is hashed.
+        # Raising stops authenticate() from trying the other backends too.
+        if password is not None:
+            try:
+                check_login_allowed(request, username or kwargs.get('email'))
+            except LoginLockedOut as lockout:
+                if request is not None:
+                    request.login_lockout = lockout
+                raise
+        
         # First, use default authentication
         user = super().authenticate(request, username=username, password=password, **kwargs)
         
@@ -2,6 +2,7 @@
 Custom form to show helpful error messages for role-based login
 """
 from allauth.account.forms import LoginForm as AllauthLoginForm
+from django import forms
 from django.contrib import messages
 from django.contrib.auth.models import User
 
@@ -12,7 +13,15 @@ class UserLoginForm(AllauthLoginForm):
     """
     
     def clean(self):
-        cleaned_data = super().clean()
+        try:
+            cleaned_data = super().clean()
+        except forms.ValidationError:
+            lockout = getattr(self.request, 'login_lockout', None)
+            if lockout is not None:
+                raise forms.ValidationError(
+                    f'Too many failed login attempts. Please try again in {lockout.minutes} minutes.'
+                )
+            raise
         
         # Check if user exists and is admin
         login_value = cleaned_data.get('login', '')
@@ -0,0 +1,60 @@
+"""
+Per-model data version counters for precise cache invalidation
+
+Cached template fragments include the versions of the models they render in
+their cache key, and the JSON API builds its ETags from them. Saving or deleting a row bumps that model's counter (see
+core.signals), so the next render misses and rebuilds while every other
+fragment stays cached - no TTL guessing.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+VERSIONED_MODELS = ('payment', 'grocery', 'fixedexpense', 'message', 'user', 'userprofile')
+
+VERSION_KEY = 'data_version:{}'
+
+
+def _initial_version():
+    # A counter lost to eviction restarts from the clock, so it can never
+    # collide with a version an older fragment was cached under.
+    return time.time_ns()
+
+
+def get_data_versions():
+    """
+    Get the current version of every tracked model in one cache round trip
+
+    Returns:
+        dict mapping model name ('payment', 'grocery', ...) to its version
+    """
+    keys = {VERSION_KEY.format(name): name for name in VERSIONED_MODELS}
+    found = cache.get_many(keys)
+
+    versions = {}
+    for key, name in keys.items():
+        if key not in found:
+            cache.add(key, _initial_version(), timeout=None)
+            found[key] = cache.get(key)
+        versions[name] = found[key]
+    return versions
+
+
+def bump_data_version(model_name):
+    """
+    Invalidate every fragment keyed on model_name
+
+    The bump waits for the surrounding transaction to commit; otherwise a
+    concurrent request could cache the old rows under the new version.
+    """
+    key = VERSION_KEY.format(model_name)
+
+    def _bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_version(), timeout=None)
+
+    transaction.on_commit(_bump)
@@ -0,0 +1,65 @@
+"""
+Run a page's independent queries one after another (sync views) or all at
+once (async views)
+
+Django's async ORM methods (acount(), aaggregate(), ...) all execute on one
+shared thread, so gathering them would still run the queries one at a time.
+gather_queries() instead runs plain ORM calls on a small pool of threads that
+each keep their own database connection, which is what lets them overlap.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+
+# Upper bound on extra database connections opened by the pool
+ASYNC_QUERY_THREADS = getattr(settings, 'ASYNC_QUERY_THREADS', 8)
+
+_query_pool = ThreadPoolExecutor(max_workers=ASYNC_QUERY_THREADS,
+                                 thread_name_prefix='async-query')
+
+
+def run_queries(queries):
+    """
+    Run zero-argument query callables in order
+
+    Returns:
+        dict mapping each name to its callable's result
+    """
+    return {name: query() for name, query in queries.items()}
+
+
+def _run_pooled(query):
+    # Same housekeeping as the request_started/request_finished signals, so
+    # pool connections honour CONN_MAX_AGE and the health checks
+    close_old_connections()
+    try:
+        return query()
+    finally:
+        close_old_connections()
+
+
+async def gather_queries(queries):
+    """
+    Run zero-argument query callables concurrently
+
+    With ASYNC_QUERIES_IN_PARALLEL off (tests run inside one transaction on
+    one connection) the callables share the request's connection instead.
+
+    Returns:
+        dict mapping each name to its callable's result
+    """
+    if getattr(settings, 'ASYNC_QUERIES_IN_PARALLEL', True):
+        loop = asyncio.get_running_loop()
+        # Copy the context so pooled queries count towards the request's metrics
+        calls = [loop.run_in_executor(_query_pool, contextvars.copy_context().run, _run_pooled, query)
+                 for query in queries.values()]
+    else:
+        calls = [sync_to_async(query)() for query in queries.values()]
+
+    results = await asyncio.gather(*calls)
+    return dict(zip(queries, results))
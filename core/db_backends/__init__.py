@@ -0,0 +1,7 @@
+"""
+Pooled variants of Django's database backends (see core/db_pool.py)
+
+    DATABASES['default']['ENGINE'] = 'core.db_backends.mysql'  # or .sqlite3
+    DATABASES['default']['POOL'] = {'min_size': 1, 'max_size': 10, ...}
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # hand back to the pool per request
+"""
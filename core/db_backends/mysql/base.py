@@ -0,0 +1,30 @@
+"""
+MySQL backend with pooled, health-checked connections
+
+Uses mysqlclient (the C driver) when it is installed and falls back to
+PyMySQL, the pure-Python driver in requirements.txt, otherwise.
+"""
+try:
+    import MySQLdb  # noqa: F401
+    USING_PYMYSQL = False
+except ImportError:
+    import pymysql
+
+    pymysql.install_as_MySQLdb()
+    USING_PYMYSQL = True
+
+from django.db.backends.mysql import base  # noqa: E402
+
+from core.db_backends.pooled import PooledDatabaseWrapperMixin  # noqa: E402
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    @staticmethod
+    def check_raw_connection(connection):
+        # COM_PING: one round trip, no query parsing. PyMySQL reconnects
+        # silently by default, which would drop the session settings.
+        if USING_PYMYSQL:
+            connection.ping(reconnect=False)
+        else:
+            connection.ping()
@@ -0,0 +1,52 @@
+"""
+Database wrapper mixin that borrows connections from a ConnectionPool
+"""
+import time
+
+from core.db_pool import ConnectionPool, PoolTimeout, get_pool
+from core.request_timing import get_request_metrics
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mix in before a backend's DatabaseWrapper
+
+    Backends provide check_raw_connection(connection), which must raise if
+    the raw connection is unusable.
+    """
+
+    pool = None
+
+    def get_new_connection(self, conn_params):
+        def connect():
+            return super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params)
+
+        self.pool = get_pool(self.alias, lambda: ConnectionPool(
+            connect, self.check_raw_connection, **self.settings_dict.get('POOL', {})
+        ))
+        start = time.perf_counter()
+        try:
+            connection, self.pooled_connection_is_new = self.pool.checkout()
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+
+        metrics = get_request_metrics()
+        if metrics is not None:
+            metrics.add_timing('db_checkout', (time.perf_counter() - start) * 1000)
+        return connection
+
+    def init_connection_state(self):
+        # Session settings survive in the pool; only new connections need them
+        if self.pooled_connection_is_new:
+            super().init_connection_state()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Closing inside an atomic block leaves self.connection in place
+        # (Django marks it closed_in_transaction), so it must not be shared
+        discard = self.in_atomic_block or (self.errors_occurred and not self.is_usable())
+        if not discard and not self.get_autocommit():
+            with self.wrap_database_errors:
+                self.connection.rollback()
+        self.pool.release(self.connection, discard=discard)
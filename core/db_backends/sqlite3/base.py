@@ -0,0 +1,22 @@
+"""
+SQLite backend with pooled connections
+
+A stand-in for exercising the pool locally and in tests; SQLite connections
+are cheap, so it brings little in production.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+from core.db_backends.pooled import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        if self.is_in_memory_db():
+            raise ImproperlyConfigured('Pooled SQLite needs a database file, not :memory:')
+        return super().get_new_connection(conn_params)
+
+    @staticmethod
+    def check_raw_connection(connection):
+        connection.execute('SELECT 1').fetchone()
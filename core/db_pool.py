@@ -0,0 +1,251 @@
+"""
+Process-wide database connection pool
+
+Django keeps one connection per thread and, with CONN_MAX_AGE, holds it for
+the life of the thread whether it is busy or not: gthread workers, the async
+query pool and the readiness probe each pin their own. The pooled backends
+in core/db_backends instead check a connection out when a thread first
+touches the database and return it when Django closes it at the end of the
+request, so all threads of a process share at most max_size connections.
+
+- connections are created lazily; min_size of them are kept even when idle
+- a connection idle for more than check_after seconds is health checked on
+  checkout, and replaced if the check fails
+- connections are recycled after max_lifetime seconds and closed after
+  max_idle seconds unused (beyond min_size)
+- checkout waits up to timeout seconds for a free connection, then raises
+  PoolTimeout
+
+Checkout latency and connection churn are kept in ConnectionPool.stats()
+and shown on the request timings page; each request's checkout time is
+reported as `db_checkout` in its Server-Timing header.
+"""
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool's timeout"""
+
+
+class _Entry:
+    __slots__ = ('connection', 'created_at', 'last_used')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of DB-API connections
+
+    Args:
+        connect: opens a new raw connection
+        check: raises if a raw connection is unusable
+        close: closes a raw connection
+    """
+
+    def __init__(self, connect, check, close=lambda connection: connection.close(),
+                 min_size=1, max_size=10, timeout=10, max_lifetime=600, max_idle=300,
+                 check_after=1.0):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError('Pool sizes need 0 <= min_size <= max_size and max_size >= 1')
+        self._connect = connect
+        self._check = check
+        self._close = close
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_after = check_after
+
+        self._idle = deque()      # most recently returned on the right
+        self._in_use = {}         # id(connection) -> _Entry
+        self._size = 0            # idle + in use + being opened
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0, 'waits': 0, 'timeouts': 0,
+            'checkout_ms_total': 0.0, 'checkout_ms_max': 0.0,
+            'created': 0, 'closed_expired': 0, 'closed_idle': 0, 'closed_broken': 0,
+            'health_checks': 0, 'health_check_failures': 0,
+        }
+
+    # ==================== Checkout / Release ====================
+
+    def checkout(self):
+        """
+        Borrow a connection, opening one if the pool has room
+
+        Returns:
+            (raw connection, True if it was newly opened)
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            entry, create, stale = self._reserve(deadline)
+            self._close_entries(stale)
+            if entry is None and not create:
+                raise PoolTimeout(f'No database connection free within {self.timeout}s '
+                                  f'({self.max_size} in use)')
+            if create:
+                entry = self._open()
+            elif time.monotonic() - entry.last_used > self.check_after and not self._healthy(entry):
+                continue
+            break
+
+        elapsed_ms = (time.monotonic() - start) * 1000
+        with self._cond:
+            self._in_use[id(entry.connection)] = entry
+            self._stats['checkouts'] += 1
+            self._stats['checkout_ms_total'] += elapsed_ms
+            self._stats['checkout_ms_max'] = max(self._stats['checkout_ms_max'], elapsed_ms)
+        return entry.connection, create
+
+    def release(self, connection, discard=False):
+        """Return a borrowed connection; discard=True closes it instead"""
+        with self._cond:
+            entry = self._in_use.pop(id(connection), None)
+            if entry is None:
+                return
+            now = time.monotonic()
+            expired = now - entry.created_at > self.max_lifetime
+            if not (discard or expired):
+                entry.last_used = now
+                self._idle.append(entry)
+                self._cond.notify()
+                return
+            self._size -= 1
+            self._stats['closed_broken' if discard else 'closed_expired'] += 1
+            self._cond.notify()
+        self._close_quietly(entry.connection)
+
+    def close_all(self):
+        """Close every idle connection (borrowed ones close on release)"""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_quietly(entry.connection)
+
+    # ==================== Internals ====================
+
+    def _reserve(self, deadline):
+        """
+        Take an idle entry or a slot to open one
+
+        Returns:
+            (entry, create, stale entries to close); (None, False, ...) on timeout
+        """
+        stale = []
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    entry = self._idle.pop()
+                    if now - entry.created_at > self.max_lifetime:
+                        self._size -= 1
+                        self._stats['closed_expired'] += 1
+                        stale.append(entry)
+                        continue
+                    stale.extend(self._trim_idle(now))
+                    return entry, False, stale
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, True, stale
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    return None, False, stale
+                self._stats['waits'] += 1
+                self._cond.wait(remaining)
+
+    def _trim_idle(self, now):
+        # Oldest-returned connections sit on the left; drop those unused for
+        # max_idle while keeping min_size connections open
+        trimmed = []
+        while (self._idle and self._size > self.min_size
+               and now - self._idle[0].last_used > self.max_idle):
+            trimmed.append(self._idle.popleft())
+            self._size -= 1
+            self._stats['closed_idle'] += 1
+        return trimmed
+
+    def _open(self):
+        try:
+            entry = _Entry(self._connect())
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats['created'] += 1
+        return entry
+
+    def _healthy(self, entry):
+        try:
+            self._check(entry.connection)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._stats['health_checks'] += 1
+                self._stats['health_check_failures'] += 1
+                self._cond.notify()
+            self._close_quietly(entry.connection)
+            return False
+        with self._cond:
+            self._stats['health_checks'] += 1
+        return True
+
+    def _close_entries(self, entries):
+        for entry in entries:
+            self._close_quietly(entry.connection)
+        entries.clear()
+
+    def _close_quietly(self, connection):
+        try:
+            self._close(connection)
+        except Exception:
+            pass
+
+    # ==================== Instrumentation ====================
+
+    def stats(self):
+        """Current size and cumulative checkout/churn counters"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(size=self._size, idle=len(self._idle), in_use=len(self._in_use),
+                         min_size=self.min_size, max_size=self.max_size)
+        checkouts = stats['checkouts']
+        stats['checkout_ms_avg'] = stats['checkout_ms_total'] / checkouts if checkouts else 0.0
+        return stats
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, create):
+    """The pool for a database alias, made by create() on first use"""
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = create()
+        return _pools[alias]
+
+
+def pool_stats():
+    """dict mapping each pooled database alias to its ConnectionPool.stats()"""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
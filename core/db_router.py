@@ -0,0 +1,129 @@
+"""
+Read-replica routing for read-only pages
+
+When a `replica` database is configured (DATABASE_REPLICA_URL), views
+decorated with @replica_reads (core/decorators.py) and code inside
+read_from_replica() send their reads to it; everything else, and every
+write, uses the primary.
+
+Reads go back to the primary when:
+
+- the browser wrote something in the last REPLICA_PIN_SECONDS, so a member
+  who just paid sees the payment even if the replica lags
+  (ReplicaPinMiddleware sets a short-lived cookie after any write)
+- the current request already wrote
+- the replica can't be reached; it is then left alone for
+  REPLICA_RETRY_SECONDS
+
+A data version (core/cache_versions.py) is bumped as soon as the primary
+commits, but a replica page's rows may predate it; so cache entries keyed
+by data version that such a page fills expire after REPLICA_CACHE_SECONDS instead of lasting until the
+next change (versioned_cache_timeout()).
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DB_ALIAS = 'replica'
+PIN_COOKIE = 'db_pin'
+
+_use_replica = ContextVar('use_replica', default=False)
+_request_state = ContextVar('replica_request_state', default=None)
+
+# Monotonic time until which the replica is treated as down (process-wide)
+_replica_down_until = 0.0
+
+
+class RequestRoutingState:
+    """Whether the current request must read from the primary"""
+
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in connections.settings
+
+
+def start_request_routing(pinned):
+    """Begin tracking writes for the current request; returns (state, reset token)"""
+    state = RequestRoutingState(pinned)
+    return state, _request_state.set(state)
+
+
+def stop_request_routing(token):
+    _request_state.reset(token)
+
+
+def _replica_available():
+    global _replica_down_until
+    if time.monotonic() < _replica_down_until:
+        return False
+    try:
+        connections[REPLICA_DB_ALIAS].ensure_connection()
+    except DatabaseError as exc:
+        _replica_down_until = time.monotonic() + getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+        logger.warning('Read replica unavailable, reading from the primary: %s', exc)
+        return False
+    return True
+
+
+def replica_alias():
+    """The alias replica reads should use right now"""
+    if not replica_configured():
+        return DEFAULT_DB_ALIAS
+    state = _request_state.get()
+    if state is not None and (state.pinned or state.wrote):
+        return DEFAULT_DB_ALIAS
+    return REPLICA_DB_ALIAS if _replica_available() else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def read_from_replica():
+    """Send the block's reads to the replica (when configured and safe)"""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def versioned_cache_timeout():
+    """Timeout for a cache entry keyed by data version: none, unless filled from the replica"""
+    if _use_replica.get() and replica_alias() == REPLICA_DB_ALIAS:
+        return getattr(settings, 'REPLICA_CACHE_SECONDS', 30)
+    return None
+
+
+class ReplicaRouter:
+    """Reads inside read_from_replica() go to the replica, all writes to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Saving the session isn't a data change a page could miss
+        state = _request_state.get()
+        if state is not None and model._meta.app_label != 'sessions':
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema by replication
+        return db != REPLICA_DB_ALIAS
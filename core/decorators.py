@@ -1,7 +1,13 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import user_passes_test
+from django.contrib.auth.views import redirect_to_login
 from django.shortcuts import redirect
 from functools import wraps
 
+from .db_router import read_from_replica
+
 
 def admin_required(function=None):
     """
@@ -36,18 +42,51 @@ def role_required(*roles):
     Decorator that checks if user has one of the specified roles
     Usage: @role_required('admin', 'user')
     """
+    def check_role(user):
+        return user.is_authenticated and hasattr(user, 'profile') and user.profile.role in roles
+    
+    return user_passes_test(check_role, login_url='login')
+
+
+def async_role_required(*roles):
+    """
+    Decorator for async views with the same checks and login redirect as
+    admin_required / user_required / role_required
+    Usage: @async_role_required('admin')
+    """
     def decorator(view_func):
         @wraps(view_func)
-        def _wrapped_view(request, *args, **kwargs):
-            if not request.user.is_authenticated:
-                return redirect('login')
+        async def _wrapped_view(request, *args, **kwargs):
+            user = await request.auser()
+            # Load the profile now; templates rendered later read it from the
+            # same user object instead of querying again
+            profile = await sync_to_async(getattr)(user, 'profile', None) if user.is_authenticated else None
             
-            if not hasattr(request.user, 'profile'):
-                return redirect('login')
+            if profile is None or profile.role not in roles:
+                return redirect_to_login(request.get_full_path(), 'login')
             
-            if request.user.profile.role not in roles:
-                return redirect('login')
-            
-            return view_func(request, *args, **kwargs)
+            request.user = user
+            return await view_func(request, *args, **kwargs)
         return _wrapped_view
     return decorator
+
+
+
+def replica_reads(view_func):
+    """
+    Decorator for read-only views: their queries go to the read replica
+    when one is configured (see core/db_router.py)
+    Usage: @admin_required then @replica_reads
+    """
+    if asyncio.iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_async_view(request, *args, **kwargs):
+            with read_from_replica():
+                return await view_func(request, *args, **kwargs)
+        return _wrapped_async_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        with read_from_replica():
+            return view_func(request, *args, **kwargs)
+    return _wrapped_view
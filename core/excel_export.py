@@ -1,12 +1,16 @@
 """
 Excel export helper functions for mess management system
 """
+from io import BytesIO
+
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 from django.http import HttpResponse
 from datetime import datetime
 
+from .request_timing import timed
+
 
 def create_excel_response(filename):
     """Create an HTTP response for Excel file download"""
@@ -45,6 +49,7 @@ def auto_adjust_column_width(worksheet):
         worksheet.column_dimensions[column_letter].width = adjusted_width
 
 
+@timed('excel')
 def export_payments_to_excel(payments, month_year):
     """
     Export payments to Excel file
@@ -91,6 +96,7 @@ def export_payments_to_excel(payments, month_year):
     return response
 
 
+@timed('excel')
 def export_groceries_to_excel(groceries, month_year):
     """Export groceries to Excel file"""
     wb = Workbook()
@@ -126,8 +132,15 @@ def export_groceries_to_excel(groceries, month_year):
     return response
 
 
-def export_monthly_report_to_excel(month_year, payments, groceries, fixed_expense):
-    """Export comprehensive monthly report to Excel"""
+@timed('excel')
+def build_monthly_report_excel(month_year, payments, groceries, fixed_expense,
+                               include_payment_details=True, include_grocery_details=True):
+    """
+    Build the comprehensive monthly report as .xlsx bytes
+
+    The Payments and Groceries sheets are left out when their
+    include_*_details flag is off; the Summary sheet is always there.
+    """
     wb = Workbook()
     
     # Summary Sheet
@@ -165,22 +178,23 @@ def export_monthly_report_to_excel(month_year, payments, groceries, fixed_expens
     auto_adjust_column_width(ws_summary)
     
     # Payments Sheet
-    ws_payments = wb.create_sheet("Payments")
-    headers = ['User', 'Amount (₹)', 'Status', 'Transaction ID']
-    ws_payments.append(headers)
-    style_header_row(ws_payments)
-    
-    for payment in payments:
-        ws_payments.append([
-            payment.user.get_full_name(),
-            float(payment.amount),
-            payment.get_status_display(),
-            payment.transaction_id or 'N/A'
-        ])
-    auto_adjust_column_width(ws_payments)
+    if include_payment_details:
+        ws_payments = wb.create_sheet("Payments")
+        headers = ['User', 'Amount (₹)', 'Status', 'Transaction ID']
+        ws_payments.append(headers)
+        style_header_row(ws_payments)
+        
+        for payment in payments:
+            ws_payments.append([
+                payment.user.get_full_name(),
+                float(payment.amount),
+                payment.get_status_display(),
+                payment.transaction_id or 'N/A'
+            ])
+        auto_adjust_column_width(ws_payments)
     
     # Groceries Sheet
-    if groceries:
+    if include_grocery_details and groceries:
         ws_groceries = wb.create_sheet("Groceries")
         headers = ['Item', 'Category', 'Quantity', 'Price (₹)']
         ws_groceries.append(headers)
@@ -195,6 +209,15 @@ def export_monthly_report_to_excel(month_year, payments, groceries, fixed_expens
             ])
         auto_adjust_column_width(ws_groceries)
     
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def export_monthly_report_to_excel(month_year, payments, groceries, fixed_expense,
+                                   include_payment_details=True, include_grocery_details=True):
+    """Export comprehensive monthly report to Excel"""
     response = create_excel_response(f'monthly_report_{month_year}.xlsx')
-    wb.save(response)
+    response.write(build_monthly_report_excel(month_year, payments, groceries, fixed_expense,
+                                              include_payment_details, include_grocery_details))
     return response
@@ -50,10 +50,21 @@ class UserEditForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if self.instance and self.instance.pk:
-            profile = self.instance.userprofile
+            profile = self.instance.profile
             self.fields['phone'].initial = profile.phone
             self.fields['room_no'].initial = profile.room_no
             self.fields['role'].initial = profile.role
+    
+    def save(self, commit=True):
+        user = super().save(commit=commit)
+        if commit:
+            # A real save, so the profile's signals (search index) see the change
+            profile = user.profile
+            profile.phone = self.cleaned_data['phone']
+            profile.room_no = self.cleaned_data['room_no']
+            profile.role = self.cleaned_data['role']
+            profile.save(update_fields=['phone', 'room_no', 'role'])
+        return user
 
 
 class PaymentForm(forms.ModelForm):
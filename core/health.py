@@ -0,0 +1,87 @@
+"""
+Liveness and readiness checks for the platform health probe
+
+HealthCheckMiddleware (core/middleware.py) answers /healthz and /readyz
+before any other middleware runs, so probes never open a session, hit the
+auth tables or get redirected to HTTPS.
+
+- /healthz: the process is up and serving requests; touches nothing
+- /readyz:  one `SELECT 1` and a cache round trip, together bounded by
+            READINESS_TIMEOUT seconds
+"""
+import logging
+import os
+import time
+from uuid import uuid4
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+
+
+logger = logging.getLogger(__name__)
+
+READINESS_TIMEOUT = getattr(settings, 'READINESS_TIMEOUT', 2)
+
+CACHE_PING_PREFIX = 'health:ping'
+
+# The checks run on their own thread so a database or cache that hangs can't
+# hold the probe past READINESS_TIMEOUT. One thread: a stuck check makes the
+# following probes time out too, instead of piling up connections.
+_check_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='readiness')
+
+
+def check_database():
+    # Same housekeeping as a request, so the probe thread honours
+    # CONN_MAX_AGE and reconnects after the database restarts
+    close_old_connections()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def check_cache():
+    # A key of its own: the cache is shared by every worker, and two probes
+    # writing the same key could each read back the other's value
+    key = f'{CACHE_PING_PREFIX}:{os.getpid()}:{uuid4().hex}'
+    cache.set(key, 1, timeout=10)
+    try:
+        if cache.get(key) != 1:
+            raise RuntimeError('cache did not return the value just written')
+    finally:
+        cache.delete(key)
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+}
+
+
+def run_readiness_checks(timeout=None):
+    """
+    Run every readiness check, all within timeout seconds together
+
+    The probe is unauthenticated, so failures are reported as a bare
+    'error'; the exception (hostnames, users, driver messages) only goes
+    to the log.
+
+    Returns:
+        (ready, dict mapping check name to 'ok', 'timed out' or 'error')
+    """
+    timeout = READINESS_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    results = {}
+    for name, check in CHECKS.items():
+        try:
+            _check_pool.submit(check).result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            logger.error('Readiness check %s timed out after %ss', name, timeout)
+            results[name] = 'timed out'
+        except Exception:
+            logger.exception('Readiness check %s failed', name)
+            results[name] = 'error'
+        else:
+            results[name] = 'ok'
+    return all(result == 'ok' for result in results.values()), results
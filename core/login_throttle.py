@@ -0,0 +1,232 @@
+"""
+Login throttling: MessSettings.max_login_attempts and lockout_duration_minutes
+
+Failed logins are counted in the cache, per account and per client IP,
+over a sliding window of lockout_duration_minutes (two fixed buckets,
+the previous one weighted by how much of it still overlaps the window).
+An account is counted once whether its username or its email is typed
+(a login matching no account is counted as typed). An account that
+reaches max_login_attempts failures, or an IP that reaches
+LOGIN_THROTTLE_IP_FAILURES (higher: a hostel's members share one
+address), is locked out for lockout_duration_minutes.
+
+RoleBasedAuthBackend checks the lock before anything else, so a
+locked-out attempt costs an account lookup and one cache round trip
+instead of a PBKDF2 hash, and the request is turned away before any
+other backend tries the password. A successful login clears the
+account's failures.
+
+Lockouts are written to ActivityLog (for known users) in batches of
+LOCKOUT_LOG_BATCH, or at least every LOCKOUT_LOG_INTERVAL seconds, so a
+flood of them doesn't mean a flood of inserts.
+"""
+import atexit
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+
+
+logger = logging.getLogger(__name__)
+
+LOCKOUT_LOG_BATCH = 20
+LOCKOUT_LOG_INTERVAL = 60
+
+_pending_lockouts = []
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+class LoginLockedOut(PermissionDenied):
+    """Raised by the auth backend for a locked-out username or IP"""
+
+    def __init__(self, retry_after):
+        super().__init__('Too many failed login attempts')
+        self.retry_after = retry_after
+
+    @property
+    def minutes(self):
+        return max(1, math.ceil(self.retry_after / 60))
+
+
+# ==================== Keys ====================
+
+def client_ip(request):
+    # Each proxy appends the address it was reached from, so the client is
+    # the entry TRUSTED_PROXY_COUNT from the right; anything further left
+    # was sent by the client and can be forged
+    proxies = getattr(settings, 'TRUSTED_PROXY_COUNT', 1)
+    forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    if proxies and len(forwarded) >= proxies:
+        return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _ident(value):
+    # Usernames are user input; hash them into safe, fixed-length keys
+    return hashlib.md5(value.strip().lower().encode(), usedforsecurity=False).hexdigest()
+
+
+def _account_ident(login):
+    """The same identifier for an account's username and email"""
+    from django.contrib.auth.models import User
+
+    login = login.strip()
+    user_id = (User.objects.filter(Q(username__iexact=login) | Q(email__iexact=login))
+               .order_by('pk').values_list('pk', flat=True).first())
+    return f'id:{user_id}' if user_id is not None else _ident(login)
+
+
+def _scopes(request, username):
+    """(scope, identifier) pairs an attempt counts against"""
+    scopes = []
+    if username:
+        scopes.append(('user', _account_ident(username)))
+    if request is not None:
+        ip = client_ip(request)
+        if ip:
+            scopes.append(('ip', _ident(ip)))
+    return scopes
+
+
+def _lock_key(scope, ident):
+    return f'login_lock:{scope}:{ident}'
+
+
+def _limits():
+    from .models import MessSettings
+
+    mess_settings = MessSettings.get_cached()
+    window = max(1, mess_settings.lockout_duration_minutes) * 60
+    return window, {
+        'user': max(1, mess_settings.max_login_attempts),
+        'ip': getattr(settings, 'LOGIN_THROTTLE_IP_FAILURES', 50),
+    }
+
+
+# ==================== Checking ====================
+
+def check_login_allowed(request, username):
+    """
+    Raise LoginLockedOut if the login's account or the client IP is locked out
+
+    One indexed query and one cache round trip, whatever the outcome.
+    """
+    keys = [_lock_key(scope, ident) for scope, ident in _scopes(request, username)]
+    if not keys:
+        return
+    locked_until = cache.get_many(keys).values()
+    if locked_until:
+        retry_after = max(locked_until) - time.time()
+        if retry_after > 0:
+            raise LoginLockedOut(retry_after)
+
+
+def _sliding_count(scope, ident, window, now):
+    """Count this failure; returns the failures in the last `window` seconds"""
+    bucket = int(now // window)
+    current = f'login_fail:{scope}:{ident}:{bucket}'
+    previous = f'login_fail:{scope}:{ident}:{bucket - 1}'
+    # add() then incr(): only the first failure of a bucket creates it
+    cache.add(current, 0, timeout=2 * window)
+    try:
+        count = cache.incr(current)
+    except ValueError:
+        # Evicted or expired in between
+        cache.add(current, 1, timeout=2 * window)
+        count = 1
+    overlap = 1 - (now % window) / window
+    return count + cache.get(previous, 0) * overlap
+
+
+def record_login_failure(request, username):
+    """Count a failed login; lock out whatever reached its limit"""
+    window, limits = _limits()
+    now = time.time()
+    for scope, ident in _scopes(request, username):
+        if _sliding_count(scope, ident, window, now) >= limits[scope]:
+            if cache.add(_lock_key(scope, ident), now + window, timeout=window):
+                _queue_lockout(scope, username, client_ip(request) if request is not None else '', window)
+
+
+def clear_login_failures(user):
+    """Forget the failures of a user who just logged in"""
+    bucket = int(time.time() // _limits()[0])
+    ident = f'id:{user.pk}'
+    cache.delete_many([f'login_fail:user:{ident}:{bucket}', f'login_fail:user:{ident}:{bucket - 1}',
+                       _lock_key('user', ident)])
+
+
+# ==================== Lockout log ====================
+
+def _queue_lockout(scope, username, ip, window):
+    global _last_flush
+    logger.warning('Login locked out for %d minutes: %s %s (IP %s)', window // 60, scope,
+                   username or '-', ip or '-')
+    with _pending_lock:
+        _pending_lockouts.append((scope, username, ip, window))
+        due = (len(_pending_lockouts) >= LOCKOUT_LOG_BATCH
+               or time.monotonic() - _last_flush >= LOCKOUT_LOG_INTERVAL)
+    if due:
+        flush_lockout_log()
+
+
+def flush_lockout_log():
+    """Write the queued lockouts to ActivityLog in one insert"""
+    global _last_flush
+    from django.contrib.auth.models import User
+    from .models import ActivityLog
+
+    with _pending_lock:
+        lockouts = _pending_lockouts[:]
+        _pending_lockouts.clear()
+        _last_flush = time.monotonic()
+    if not lockouts:
+        return 0
+
+    try:
+        # ActivityLog needs a user, so lockouts of unknown logins are only
+        # logged above. Members may log in with their email address.
+        logins = {username for _, username, _, _ in lockouts if username}
+        users = {}
+        for user in User.objects.filter(Q(username__in=logins) | Q(email__in=logins)):
+            users[user.username.lower()] = users[user.email.lower()] = user
+        logs = [
+            ActivityLog(user=users[username.lower()], action_type='login',
+                        description=f'Login locked out for {window // 60} minutes after too many '
+                                    f'failed attempts ({"this account" if scope == "user" else "IP " + ip})')
+            for scope, username, ip, window in lockouts
+            if username and username.lower() in users
+        ]
+        ActivityLog.objects.bulk_create(logs)
+    except Exception:
+        logger.exception('Could not write %d lockouts to the activity log', len(lockouts))
+        return 0
+    return len(logs)
+
+
+atexit.register(flush_lockout_log)
+
+
+# ==================== Signals ====================
+
+def _login_failed(sender, credentials, request=None, **kwargs):
+    # A locked-out attempt was never tried, so it doesn't count again
+    if request is not None and getattr(request, 'login_lockout', None):
+        return
+    record_login_failure(request, credentials.get('username') or credentials.get('email'))
+
+
+def _logged_in(sender, request, user, **kwargs):
+    clear_login_failures(user)
+
+
+user_login_failed.connect(_login_failed, dispatch_uid='login_throttle_failed')
+user_logged_in.connect(_logged_in, dispatch_uid='login_throttle_logged_in')
@@ -0,0 +1,50 @@
+import re
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import MessSettings
+from core.monthly_reports import build_reports, generation_due, previous_month
+
+
+class Command(BaseCommand):
+    help = ("Render the previous month's PDF and Excel reports ahead of time, once "
+            "MessSettings.report_generation_day has come. Run it daily.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Act as if today were this date (YYYY-MM-DD)')
+        parser.add_argument('--month', help='Render this month (YYYY-MM) now, whatever the schedule says')
+        parser.add_argument('--force', action='store_true', help='Render again even if the stored reports are current')
+
+    def handle(self, *args, **options):
+        try:
+            today = date.fromisoformat(options['date']) if options['date'] else timezone.localdate()
+        except ValueError:
+            raise CommandError(f'--date must be YYYY-MM-DD, not {options["date"]!r}')
+
+        mess_settings = MessSettings.get_settings()
+        month_year = options['month']
+        if month_year:
+            if not re.fullmatch(r'\d{4}-(0[1-9]|1[0-2])', month_year):
+                raise CommandError(f'--month must be YYYY-MM, not {month_year!r}')
+        elif not mess_settings.auto_generate_monthly_report:
+            self.stdout.write('Automatic monthly reports are off in the mess settings; nothing to do')
+            return
+        elif not generation_due(today, mess_settings):
+            self.stdout.write(f'Reports are generated from day {mess_settings.report_generation_day}; nothing to do')
+            return
+        else:
+            month_year = previous_month(today)
+
+        start = time.perf_counter()
+        built = build_reports(month_year, mess_settings, force=options['force'])
+        elapsed = time.perf_counter() - start
+
+        if built:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {month_year}: rendered {", ".join(built)} in {elapsed:.1f}s'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ {month_year}: stored reports are current'))
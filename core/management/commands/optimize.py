@@ -0,0 +1,73 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Database maintenance: VACUUM to reclaim space and ANALYZE to refresh query planner statistics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to optimize')
+        parser.add_argument('--skip-vacuum', action='store_true',
+                            help='Only ANALYZE; VACUUM rewrites the whole database and blocks writers')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.in_atomic_block:
+            raise CommandError('VACUUM cannot run inside a transaction')
+
+        steps = {
+            'sqlite': self.sqlite_steps,
+            'postgresql': self.postgresql_steps,
+            'mysql': self.mysql_steps,
+        }.get(connection.vendor)
+        if steps is None:
+            raise CommandError(f'No maintenance steps for {connection.vendor}')
+
+        size_before = self.database_size(connection)
+        for label, statements in steps(connection, vacuum=not options['skip_vacuum']):
+            start = time.perf_counter()
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+            self.stdout.write(f'   {label:<28}{(time.perf_counter() - start) * 1000:>10.1f} ms')
+
+        size_after = self.database_size(connection)
+        if size_before is not None:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {connection.alias} optimized: {size_before / 1024 / 1024:.1f} MB -> '
+                f'{size_after / 1024 / 1024:.1f} MB'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ {connection.alias} optimized'))
+
+    # ==================== Vendors ====================
+
+    def sqlite_steps(self, connection, vacuum):
+        # Fold the WAL back into the database file first, so VACUUM sees
+        # every page and the WAL file shrinks to nothing
+        yield 'checkpoint WAL', ['PRAGMA wal_checkpoint(TRUNCATE)']
+        if vacuum:
+            yield 'VACUUM', ['VACUUM']
+        yield 'ANALYZE', ['ANALYZE', 'PRAGMA optimize']
+
+    def postgresql_steps(self, connection, vacuum):
+        yield ('VACUUM ANALYZE' if vacuum else 'ANALYZE'), ['VACUUM ANALYZE' if vacuum else 'ANALYZE']
+
+    def mysql_steps(self, connection, vacuum):
+        tables = ', '.join(connection.ops.quote_name(table)
+                           for table in connection.introspection.table_names())
+        # OPTIMIZE TABLE rebuilds InnoDB tables and refreshes their statistics
+        if vacuum:
+            yield 'OPTIMIZE TABLE', [f'OPTIMIZE TABLE {tables}']
+        else:
+            yield 'ANALYZE TABLE', [f'ANALYZE TABLE {tables}']
+
+    def database_size(self, connection):
+        """Size in bytes of a SQLite database file and its WAL, else None"""
+        if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+            return None
+        name = str(connection.settings_dict['NAME'])
+        return sum(os.path.getsize(path) for path in (name, name + '-wal') if os.path.exists(path))
@@ -0,0 +1,46 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.reminders import send_due_reminders
+
+
+class Command(BaseCommand):
+    help = ('Send the payment reminders due today: in-app messages and emails, '
+            'each reminder tier at most once per payment. Run it daily.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Act as if today were this date (YYYY-MM-DD)')
+        parser.add_argument('--no-email', action='store_true', help='Create the in-app messages only')
+        parser.add_argument('--dry-run', action='store_true', help='List the reminders due without sending them')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f'--date must be YYYY-MM-DD, not {options["date"]!r}')
+
+        start = time.perf_counter()
+        result = send_due_reminders(today=today, send_email=not options['no_email'],
+                                    dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - start
+
+        if options['dry_run'] or options['verbosity'] > 1:
+            for reminder in result['reminders']:
+                self.stdout.write(f'   {reminder.tier:<8} {reminder.payment.month_year}  '
+                                  f'{reminder.payment.user.username}')
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{result["due"]} reminders due (dry run, nothing sent)'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {result["created"]} reminders sent in {elapsed:.1f}s: {result["emailed"]} emailed, '
+            f'{result["email_skipped"]} opted out or without an email address'
+        ))
+        if result['email_retried']:
+            self.stdout.write(f'   {result["email_retried"]} of the emails retried from earlier runs')
+        if result['email_failed']:
+            self.stdout.write(self.style.ERROR(f'   {result["email_failed"]} emails failed; see the log'))
@@ -0,0 +1,60 @@
+import re
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.perf_data import CHUNK_SIZE, seed_perf_data, synthetic_groceries
+
+
+class Command(BaseCommand):
+    help = 'Generate a large synthetic dataset for load and performance testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Members to create')
+        parser.add_argument('--months', type=int, default=24, help='Months of payments, groceries and expenses')
+        parser.add_argument('--groceries-per-month', type=int, default=40)
+        parser.add_argument('--messages', type=int, default=10000)
+        parser.add_argument('--activity-logs', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--prefix', default='perf', help='Member usernames are <prefix><n>')
+        parser.add_argument('--password', default='perf-pass', help='Password shared by every member')
+        parser.add_argument('--batch-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--clear', action='store_true',
+                            help='First delete an earlier run with the same prefix: its members, '
+                                 'with their payments, messages and activity logs, and its groceries')
+
+    def handle(self, *args, **options):
+        previous = User.objects.filter(username__regex=rf'^{re.escape(options["prefix"])}[0-9]+$')
+        previous_groceries = synthetic_groceries(options['prefix'])
+        if previous.exists() or previous_groceries.exists():
+            if not options['clear']:
+                raise CommandError(f'Data from an earlier run with prefix {options["prefix"]!r} already exists; '
+                                   'pass --clear to replace it or choose another --prefix')
+            deleted = previous.delete()[0] + previous_groceries.delete()[0]
+            self.stdout.write(self.style.WARNING(f'Deleted {deleted} rows from the previous run'))
+
+        start = time.perf_counter()
+        counts = seed_perf_data(
+            users=options['users'],
+            months=options['months'],
+            groceries_per_month=options['groceries_per_month'],
+            messages=options['messages'],
+            activity_logs=options['activity_logs'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            password=options['password'],
+            batch_size=options['batch_size'],
+        )
+        elapsed = time.perf_counter() - start
+
+        for model_name, count in counts.items():
+            self.stdout.write(f'   {model_name:<14}{count:>10}')
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Generated {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)'
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f'   Members log in as {options["prefix"]}0..{options["prefix"]}{options["users"] - 1} '
+            f'with password {options["password"]}'
+        ))
@@ -0,0 +1,56 @@
+import re
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import MessSettings
+from core.monthly_reports import generation_due, previous_month
+from core.report_mailer import queue_report_emails, send_report_emails
+
+
+class Command(BaseCommand):
+    help = ("Email every member the previous month's report with their receipt attached, "
+            "once MessSettings.report_generation_day has come. Run it daily; an "
+            "interrupted mailing carries on where it stopped.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Act as if today were this date (YYYY-MM-DD)')
+        parser.add_argument('--month', help='Email this month (YYYY-MM) now, whatever the schedule says')
+        parser.add_argument('--limit', type=int, help='Send at most this many emails (e.g. to stay under a daily quota)')
+
+    def handle(self, *args, **options):
+        try:
+            today = date.fromisoformat(options['date']) if options['date'] else timezone.localdate()
+        except ValueError:
+            raise CommandError(f'--date must be YYYY-MM-DD, not {options["date"]!r}')
+
+        mess_settings = MessSettings.get_settings()
+        month_year = options['month']
+        if month_year:
+            if not re.fullmatch(r'\d{4}-(0[1-9]|1[0-2])', month_year):
+                raise CommandError(f'--month must be YYYY-MM, not {month_year!r}')
+        elif not mess_settings.auto_email_reports:
+            self.stdout.write('Report emails are off in the mess settings; nothing to do')
+            return
+        elif not generation_due(today, mess_settings):
+            self.stdout.write(f'Reports are emailed from day {mess_settings.report_generation_day}; nothing to do')
+            return
+        else:
+            month_year = previous_month(today)
+
+        queued = queue_report_emails(month_year)
+        if queued:
+            self.stdout.write(f'   queued {queued} report emails for {month_year}')
+
+        start = time.perf_counter()
+        result = send_report_emails(month_year, limit=options['limit'])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {month_year}: {result["sent"]} report emails sent in {elapsed:.1f}s, '
+            f'{result["remaining"]} still pending'
+        ))
+        if result['failed']:
+            self.stdout.write(self.style.ERROR(f'   {result["failed"]} emails failed; see the log'))
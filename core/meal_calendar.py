@@ -0,0 +1,249 @@
+"""
+Meal calendar helpers - the cached month builder shared by the admin and
+user calendar views, and bulk templating of meal plans
+"""
+import calendar
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Max
+
+from .models import MealPlan
+
+
+# Built months are cached until a MealPlan in that month changes, so a long
+# timeout is safe - the version in the key does the invalidation.
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+
+MEAL_PLAN_FIELDS = ('id', 'date', 'breakfast', 'lunch', 'dinner', 'notes')
+
+# Week rows start on Sunday to match the calendar table headers
+_month_calendar = calendar.Calendar(firstweekday=calendar.SUNDAY)
+
+
+def month_bounds(year, month):
+    """
+    Get the half-open date range [start, end) covering a month
+
+    Filtering on date__gte/date__lt keeps the query on the unique index on
+    MealPlan.date instead of wrapping the column in YEAR()/MONTH().
+    """
+    start = date(year, month, 1)
+    if month == 12:
+        end = date(year + 1, 1, 1)
+    else:
+        end = date(year, month + 1, 1)
+    return start, end
+
+
+def adjacent_months(year, month):
+    """Return ((prev_year, prev_month), (next_year, next_month))"""
+    if month == 1:
+        prev = (year - 1, 12)
+    else:
+        prev = (year, month - 1)
+
+    if month == 12:
+        next_ = (year + 1, 1)
+    else:
+        next_ = (year, month + 1)
+    return prev, next_
+
+
+def get_meal_plans_in_range(start, end):
+    """MealPlan rows with start <= date < end"""
+    return MealPlan.objects.filter(date__gte=start, date__lt=end)
+
+
+def get_meal_plan_stats(start, end):
+    """Newest updated_at ('last_updated') and row count ('total') in a date range"""
+    return get_meal_plans_in_range(start, end).aggregate(
+        last_updated=Max('updated_at'),
+        total=Count('id'),
+    )
+
+
+def get_meal_plan_version(start, end):
+    """
+    Version stamp for the meal plans in a date range
+
+    The newest updated_at catches inserts and edits, the row count catches
+    deletes of anything but the newest row.
+    """
+    stats = get_meal_plan_stats(start, end)
+    last_updated = stats['last_updated']
+    stamp = last_updated.timestamp() if last_updated else 0
+    return f"{stamp}-{stats['total']}"
+
+
+def _build_month(year, month):
+    """Build the calendar context for one month (uncached)"""
+    start, end = month_bounds(year, month)
+
+    meal_by_day = {
+        plan['date'].day: plan
+        for plan in get_meal_plans_in_range(start, end).order_by().values(*MEAL_PLAN_FIELDS)
+    }
+
+    # Flat list of cells, one per table slot; 7 cells per week row
+    cells = []
+    for week in _month_calendar.monthdayscalendar(year, month):
+        for day in week:
+            if day == 0:
+                cells.append({'day': 0, 'date': None, 'meal': None})
+            else:
+                cells.append({
+                    'day': day,
+                    'date': date(year, month, day),
+                    'meal': meal_by_day.get(day),
+                })
+
+    (prev_year, prev_month), (next_year, next_month) = adjacent_months(year, month)
+
+    return {
+        'cells': cells,
+        'year': year,
+        'month': month,
+        'month_name': calendar.month_name[month],
+        'prev_month': prev_month,
+        'prev_year': prev_year,
+        'next_month': next_month,
+        'next_year': next_year,
+    }
+
+
+def get_month_calendar(year, month):
+    """
+    Get the calendar context for a month, cached per MealPlan version
+
+    Args:
+        year: Calendar year
+        month: Calendar month (1-12)
+
+    Returns:
+        dict with 'cells' (flat list of {'day', 'date', 'meal'}), month name
+        and prev/next navigation values
+    """
+    start, end = month_bounds(year, month)
+    version = get_meal_plan_version(start, end)
+    cache_key = f'meal_calendar:{year}-{month:02d}:{version}'
+
+    data = cache.get(cache_key)
+    if data is None:
+        data = _build_month(year, month)
+        cache.set(cache_key, data, CALENDAR_CACHE_TIMEOUT)
+    return data
+
+
+# ==================== Bulk Templating ====================
+
+MEAL_PLAN_COPY_FIELDS = ('breakfast', 'lunch', 'dinner', 'notes')
+
+
+def week_start(day):
+    """Sunday on or before the given date"""
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def _date_range(start, end):
+    """Dates from start to end, inclusive"""
+    for offset in range((end - start).days + 1):
+        yield start + timedelta(days=offset)
+
+
+def _week_rotation_sources(source_date, rotation_weeks, target_start, target_end):
+    """
+    Map each target date to a source date in a block of whole weeks
+
+    The block starts on the Sunday of source_date's week and the rotation is
+    anchored on the Sunday of target_start's week, so weekdays always line up.
+    """
+    source_start = week_start(source_date)
+    anchor = week_start(target_start)
+    block_days = 7 * rotation_weeks
+    return {
+        day: source_start + timedelta(days=(day - anchor).days % block_days)
+        for day in _date_range(target_start, target_end)
+    }, (source_start, source_start + timedelta(days=block_days))
+
+
+def _month_sources(source_date, target_start, target_end):
+    """Map each target date to the same day of the source month (if it exists)"""
+    source_start, source_end = month_bounds(source_date.year, source_date.month)
+    last_day = (source_end - timedelta(days=1)).day
+    return {
+        day: source_start.replace(day=day.day)
+        for day in _date_range(target_start, target_end)
+        if day.day <= last_day
+    }, (source_start, source_end)
+
+
+@transaction.atomic
+def apply_meal_plan_template(source, source_date, target_start, target_end,
+                             rotation_weeks=1, overwrite=True):
+    """
+    Fill [target_start, target_end] with meal plans copied from a source range
+
+    All rows are written by a single bulk_create that upserts on the unique
+    date column, so a month is one INSERT instead of one form post per day.
+
+    Args:
+        source: 'week' (rotate through rotation_weeks weeks) or 'month'
+        source_date: Any day in the first source week / the source month
+        target_start: First target date
+        target_end: Last target date (inclusive)
+        rotation_weeks: Weeks in the rotation block (week source only)
+        overwrite: Replace existing target plans; when False they are kept
+
+    Returns:
+        dict with 'created', 'updated', 'skipped' (no source plan or kept)
+        and 'days' (size of the target range)
+    """
+    if source == 'month':
+        mapping, (source_start, source_end) = _month_sources(source_date, target_start, target_end)
+    else:
+        mapping, (source_start, source_end) = _week_rotation_sources(
+            source_date, rotation_weeks, target_start, target_end
+        )
+
+    source_plans = (
+        get_meal_plans_in_range(source_start, source_end)
+        .order_by()
+        .values('date', *MEAL_PLAN_COPY_FIELDS)
+    )
+    templates = {plan['date']: plan for plan in source_plans}
+    existing = set(
+        get_meal_plans_in_range(target_start, target_end + timedelta(days=1))
+        .order_by().values_list('date', flat=True)
+    )
+
+    plans = []
+    for day, source_day in mapping.items():
+        template = templates.get(source_day)
+        if template is None or day == source_day:
+            continue
+        if day in existing and not overwrite:
+            continue
+        plans.append(MealPlan(date=day, **{f: template[f] for f in MEAL_PLAN_COPY_FIELDS}))
+
+    if plans:
+        upsert = {'ignore_conflicts': True}
+        if overwrite:
+            upsert = {
+                'update_conflicts': True,
+                'update_fields': [*MEAL_PLAN_COPY_FIELDS, 'updated_at'],
+            }
+            # MySQL's ON DUPLICATE KEY UPDATE cannot name a conflict target
+            if connection.features.supports_update_conflicts_with_target:
+                upsert['unique_fields'] = ['date']
+        MealPlan.objects.bulk_create(plans, batch_size=500, **upsert)
+
+    updated = sum(1 for plan in plans if plan.date in existing)
+    days = (target_end - target_start).days + 1
+    return {
+        'created': len(plans) - updated,
+        'updated': updated,
+        'skipped': days - len(plans),
+        'days': days,
+    }
@@ -0,0 +1,185 @@
+"""
+iCalendar (.ics) feed of the meal plan for calendar apps
+
+Each member gets a signed feed token, so calendar apps can poll the feed
+without a session. Events are streamed from a bounded date window rather
+than loading the whole MealPlan table.
+"""
+import hashlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.utils import timezone
+
+from .meal_calendar import get_meal_plans_in_range, get_meal_plan_stats
+
+
+FEED_TOKEN_SALT = 'core.meal_feed'
+
+# Window of meal plans served by the feed, relative to today
+MEAL_FEED_DAYS_BACK = getattr(settings, 'MEAL_FEED_DAYS_BACK', 7)
+MEAL_FEED_DAYS_AHEAD = getattr(settings, 'MEAL_FEED_DAYS_AHEAD', 60)
+
+# How long calendar apps may reuse a response before revalidating (seconds)
+MEAL_FEED_MAX_AGE = getattr(settings, 'MEAL_FEED_MAX_AGE', 15 * 60)
+
+# Local start time (hour, minute) and length of each meal event
+MEAL_FEED_TIMES = getattr(settings, 'MEAL_FEED_TIMES', {
+    'breakfast': (8, 0),
+    'lunch': (13, 0),
+    'dinner': (20, 0),
+})
+MEAL_FEED_EVENT_MINUTES = getattr(settings, 'MEAL_FEED_EVENT_MINUTES', 60)
+
+MEAL_TITLES = {
+    'breakfast': 'Breakfast',
+    'lunch': 'Lunch',
+    'dinner': 'Dinner',
+}
+
+
+# ==================== Feed Tokens ====================
+
+def make_feed_token(user):
+    """Signed, URL-safe feed token for a user"""
+    return signing.Signer(salt=FEED_TOKEN_SALT).sign(str(user.pk))
+
+
+def get_feed_user_id(token):
+    """
+    Resolve a feed token to an active member's user id
+
+    Returns:
+        User id, or None if the token is forged or the member is inactive
+    """
+    try:
+        user_id = int(signing.Signer(salt=FEED_TOKEN_SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+    is_active = User.objects.filter(
+        pk=user_id, is_active=True, profile__is_active=True
+    ).exists()
+    return user_id if is_active else None
+
+
+# ==================== Window and Versioning ====================
+
+def get_feed_window(today=None):
+    """Half-open [start, end) date range served by the feed"""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=MEAL_FEED_DAYS_BACK)
+    end = today + timedelta(days=MEAL_FEED_DAYS_AHEAD + 1)
+    return start, end
+
+
+def get_feed_validators(start, end):
+    """
+    Compute (etag, last_modified) for the feed window
+
+    The window itself slides every day, bringing older plans into range, so
+    the start of the window is folded into both validators alongside the
+    newest MealPlan.updated_at.
+    """
+    stats = get_meal_plan_stats(start, end)
+    window_start = datetime.combine(start, time(), tzinfo=_local_tz())
+    last_modified = max(filter(None, [stats['last_updated'], window_start]))
+
+    raw = f"{start}:{end}:{stats['last_updated']}:{stats['total']}"
+    etag = '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+    return etag, last_modified
+
+
+# ==================== Serialization ====================
+
+def _local_tz():
+    return ZoneInfo(settings.TIME_ZONE)
+
+
+def _format_utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _escape(text):
+    """Escape TEXT values per RFC 5545"""
+    return (
+        text.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Fold a content line to 75 octets, as RFC 5545 requires"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    limit = 75
+    while encoded:
+        # Step back so a multi-byte character is never split
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _meal_events(plan, host, tz):
+    """Yield the VEVENT lines for one meal plan row"""
+    stamp = _format_utc(plan['updated_at'])
+    duration = timedelta(minutes=MEAL_FEED_EVENT_MINUTES)
+
+    for meal, (hour, minute) in MEAL_FEED_TIMES.items():
+        menu = plan.get(meal)
+        if not menu:
+            continue
+        start = datetime.combine(plan['date'], time(hour, minute), tzinfo=tz)
+        lines = [
+            'BEGIN:VEVENT',
+            f"UID:mealplan-{plan['id']}-{meal}@{host}",
+            f'DTSTAMP:{stamp}',
+            f'DTSTART:{_format_utc(start)}',
+            f'DTEND:{_format_utc(start + duration)}',
+            f'SUMMARY:{_escape(MEAL_TITLES.get(meal, meal.title()))}: {_escape(menu)}',
+        ]
+        if plan.get('notes'):
+            lines.append(f"DESCRIPTION:{_escape(plan['notes'])}")
+        lines.append('END:VEVENT')
+        yield ''.join(_fold(line) for line in lines)
+
+
+def iter_meal_plan_ics(start, end, host='mess-management', calendar_name='Mess Meal Plan'):
+    """
+    Stream an iCalendar document for the meal plans in [start, end)
+
+    Rows are read with values().iterator() so only one chunk of the window
+    is held in memory at a time.
+    """
+    tz = _local_tz()
+    yield ''.join(_fold(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Mess Management//Meal Plan//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(calendar_name)}',
+    ])
+
+    plans = (
+        get_meal_plans_in_range(start, end)
+        .order_by('date')
+        .values('id', 'date', 'breakfast', 'lunch', 'dinner', 'notes', 'updated_at')
+    )
+    for plan in plans.iterator(chunk_size=200):
+        yield from _meal_events(plan, host, tz)
+
+    yield 'END:VCALENDAR\r\n'
@@ -14,3 +14,40 @@ class MealPlanForm(forms.ModelForm):
             'dinner': forms.Textarea(attrs={'rows': 3, 'placeholder': 'Dinner items...'}),
             'notes': forms.Textarea(attrs={'rows': 2, 'placeholder': 'Additional notes...'}),
         }
+
+
+class MealPlanBulkForm(forms.Form):
+    """Form for filling a date range from an existing week or month of meal plans"""
+    SOURCE_CHOICES = (
+        ('week', 'Weekly rotation - repeat a week (or several weeks)'),
+        ('month', 'Month - copy by day of month'),
+    )
+    MAX_TARGET_DAYS = 366
+    
+    source = forms.ChoiceField(choices=SOURCE_CHOICES, initial='week')
+    source_date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date'}),
+        help_text="Any day in the first source week, or in the source month"
+    )
+    rotation_weeks = forms.IntegerField(
+        min_value=1, max_value=6, initial=1,
+        help_text="Number of consecutive source weeks to cycle through (weekly rotation only)"
+    )
+    target_start = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    target_end = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    overwrite = forms.BooleanField(
+        required=False, initial=True,
+        help_text="Replace meal plans that already exist in the target range"
+    )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        target_start = cleaned_data.get('target_start')
+        target_end = cleaned_data.get('target_end')
+        
+        if target_start and target_end:
+            if target_end < target_start:
+                raise forms.ValidationError('Target end date must be on or after the start date.')
+            if (target_end - target_start).days + 1 > self.MAX_TARGET_DAYS:
+                raise forms.ValidationError(f'Target range cannot exceed {self.MAX_TARGET_DAYS} days.')
+        return cleaned_data
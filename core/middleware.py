@@ -0,0 +1,149 @@
+"""
+Custom middleware for mess management system
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse
+
+from .db_router import (PIN_COOKIE, replica_configured, start_request_routing,
+                        stop_request_routing)
+from .health import run_readiness_checks
+from .nplusone import get_mode, get_tracker, start_tracking, stop_tracking
+from .request_timing import (start_request_metrics, stop_request_metrics,
+                             record_view_stats)
+
+
+timing_logger = logging.getLogger('core.request_timing')
+
+
+class HealthCheckMiddleware:
+    """
+    Answer the platform health probes before the rest of the stack runs
+
+    Listed first in MIDDLEWARE: no session, auth, CSRF, HTTPS redirect or
+    ALLOWED_HOSTS check (the probe's Host header is the platform's, not
+    ours), and no timing log line for every probe.
+    """
+
+    LIVENESS_PATHS = ('/healthz', '/healthz/')
+    READINESS_PATHS = ('/readyz', '/readyz/')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        path = request.path_info
+        if path in self.LIVENESS_PATHS:
+            response = HttpResponse('ok', content_type='text/plain')
+        elif path in self.READINESS_PATHS:
+            ready, checks = run_readiness_checks()
+            response = JsonResponse({'status': 'ok' if ready else 'unavailable', 'checks': checks},
+                                    status=200 if ready else 503)
+        else:
+            return self.get_response(request)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class RequestTimingMiddleware:
+    """
+    Measure every request and report it three ways:
+
+    - a Server-Timing header (visible in the browser's network panel)
+    - one JSON log line on the 'core.request_timing' logger, keyed by URL name
+    - per-view totals for the DEBUG-only summary page (request_timings view)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics, token = start_request_metrics()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_request_metrics(token)
+
+        total_ms = metrics.total_ms
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else None
+
+        response['Server-Timing'] = self.server_timing(metrics, total_ms)
+
+        if timing_logger.isEnabledFor(logging.INFO):
+            timing_logger.info(json.dumps({
+                'event': 'request_timing',
+                'view': view_name,
+                'method': request.method,
+                'status': response.status_code,
+                'total_ms': round(total_ms, 2),
+                'queries': metrics.queries,
+                'db_ms': round(metrics.db_ms, 2),
+                **{f'{name}_ms': round(ms, 2) for name, ms in metrics.timings.items()},
+            }))
+
+        if settings.DEBUG and view_name:
+            record_view_stats(view_name, metrics, total_ms)
+
+        return response
+
+    @staticmethod
+    def server_timing(metrics, total_ms):
+        entries = [f'db;dur={metrics.db_ms:.2f};desc="{metrics.queries} queries"']
+        for name, ms in metrics.timings.items():
+            entries.append(f'{name};dur={ms:.2f}')
+        entries.append(f'total;dur={total_ms:.2f}')
+        return ', '.join(entries)
+
+
+class NPlusOneMiddleware:
+    """
+    Scope N+1 query detection (core/nplusone.py) to each request; raises
+    NPlusOneError in tests and logs a sampled warning in production
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if get_mode() == 'off':
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        token = start_tracking()
+        try:
+            return self.get_response(request)
+        finally:
+            stop_tracking(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        tracker = get_tracker()
+        if tracker is not None:
+            tracker.view_name = request.resolver_match.view_name
+
+
+
+class ReplicaPinMiddleware:
+    """
+    Read-your-writes for the read replica (core/db_router.py): after a
+    request that writes, the browser reads from the primary for
+    REPLICA_PIN_SECONDS, longer than the replica normally lags
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not replica_configured():
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        state, token = start_request_routing(pinned=PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_request_routing(token)
+
+        if state.wrote:
+            response.set_cookie(PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 5),
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_remove_messsettings_current_month_year_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='payment:<id>:<tier>, never reused', max_length=64, unique=True)),
+                ('tier', models.CharField(choices=[('first', 'First Reminder'), ('second', 'Second Reminder'), ('final', 'Final Reminder'), ('overdue', 'Overdue')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('emailed_at', models.DateTimeField(blank=True, help_text='When the reminder email went out', null=True)),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='core.payment')),
+            ],
+            options={
+                'verbose_name': 'Payment Reminder',
+                'verbose_name_plural': 'Payment Reminders',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
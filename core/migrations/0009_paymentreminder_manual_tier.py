@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_paymentreminder'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymentreminder',
+            name='key',
+            field=models.CharField(help_text='payment:<id>:<tier>[:<date>], never reused', max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='paymentreminder',
+            name='tier',
+            field=models.CharField(choices=[('first', 'First Reminder'), ('second', 'Second Reminder'), ('final', 'Final Reminder'), ('overdue', 'Overdue'), ('manual', 'Sent by Admin')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_paymentreminder_manual_tier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month_year', models.CharField(help_text='Format: YYYY-MM', max_length=7)),
+                ('kind', models.CharField(choices=[('pdf', 'PDF'), ('xlsx', 'Excel')], max_length=4)),
+                ('file', models.FileField(upload_to='reports/')),
+                ('include_payment_details', models.BooleanField(default=True)),
+                ('include_grocery_details', models.BooleanField(default=True)),
+                ('stale', models.BooleanField(default=False, help_text="The month's data changed after the file was rendered")),
+                ('generated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Monthly Report',
+                'verbose_name_plural': 'Monthly Reports',
+                'ordering': ['-month_year', 'kind'],
+                'unique_together': {('month_year', 'kind')},
+            },
+        ),
+    ]
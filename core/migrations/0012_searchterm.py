@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_reportemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('kind', models.CharField(choices=[('message', 'Message'), ('grocery', 'Grocery'), ('user', 'User')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('weight', models.PositiveSmallIntegerField(default=1, help_text='How strongly the term describes the object')),
+            ],
+            options={
+                'verbose_name': 'Search Term',
+                'verbose_name_plural': 'Search Terms',
+                'indexes': [models.Index(fields=['term', 'kind'], name='core_search_term_idx')],
+                'unique_together': {('kind', 'object_id', 'term')},
+            },
+        ),
+    ]
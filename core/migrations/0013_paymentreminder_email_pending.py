@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_searchterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentreminder',
+            name='email_pending',
+            field=models.BooleanField(default=False, help_text="Its email is due but hasn't gone out yet"),
+        ),
+    ]
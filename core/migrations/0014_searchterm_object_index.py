@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_paymentreminder_email_pending'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='searchterm',
+            name='core_search_term_idx',
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['term', 'object_id', 'kind'], name='core_search_term_object_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from datetime import datetime
 
@@ -319,10 +320,13 @@ class MessSettings(models.Model):
         verbose_name = 'Mess Settings'
         verbose_name_plural = 'Mess Settings'
     
+    CACHE_KEY = 'mess_settings'
+    
     def save(self, *args, **kwargs):
         # Singleton pattern - only one instance allowed
         self.pk = 1
         super().save(*args, **kwargs)
+        transaction.on_commit(lambda: cache.delete(self.CACHE_KEY))
     
     def delete(self, *args, **kwargs):
         # Prevent deletion
@@ -334,5 +338,123 @@ class MessSettings(models.Model):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
     
+    @classmethod
+    def get_cached(cls):
+        """Get the settings instance from the shared cache (read-only use)"""
+        obj = cache.get(cls.CACHE_KEY)
+        if obj is None:
+            obj = cls.get_settings()
+            cache.set(cls.CACHE_KEY, obj, timeout=None)
+        return obj
+    
     def __str__(self):
         return f"Mess Settings: {self.mess_name}"
+
+
+class PaymentReminder(models.Model):
+    """One reminder tier sent for one payment; its key makes sending idempotent"""
+    TIER_CHOICES = (
+        ('first', 'First Reminder'),
+        ('second', 'Second Reminder'),
+        ('final', 'Final Reminder'),
+        ('overdue', 'Overdue'),
+        ('manual', 'Sent by Admin'),
+    )
+    
+    key = models.CharField(max_length=64, unique=True, help_text="payment:<id>:<tier>[:<date>], never reused")
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='reminders')
+    tier = models.CharField(max_length=10, choices=TIER_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    emailed_at = models.DateTimeField(blank=True, null=True, help_text="When the reminder email went out")
+    email_pending = models.BooleanField(default=False, help_text="Its email is due but hasn't gone out yet")
+    
+    @staticmethod
+    def make_key(payment_id, tier, on=None):
+        # Scheduled tiers go out once per payment, admin reminders once a day
+        key = f"payment:{payment_id}:{tier}"
+        return f"{key}:{on.isoformat()}" if on else key
+    
+    def __str__(self):
+        return f"{self.payment} - {self.get_tier_display()}"
+    
+    class Meta:
+        verbose_name = 'Payment Reminder'
+        verbose_name_plural = 'Payment Reminders'
+        ordering = ['-created_at']
+
+
+class MonthlyReport(models.Model):
+    """A monthly report rendered ahead of time by generate_monthly_reports"""
+    KIND_CHOICES = (
+        ('pdf', 'PDF'),
+        ('xlsx', 'Excel'),
+    )
+    
+    month_year = models.CharField(max_length=7, help_text="Format: YYYY-MM")
+    kind = models.CharField(max_length=4, choices=KIND_CHOICES)
+    file = models.FileField(upload_to='reports/')
+    include_payment_details = models.BooleanField(default=True)
+    include_grocery_details = models.BooleanField(default=True)
+    stale = models.BooleanField(default=False, help_text="The month's data changed after the file was rendered")
+    generated_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"{self.month_year} - {self.get_kind_display()}"
+    
+    class Meta:
+        verbose_name = 'Monthly Report'
+        verbose_name_plural = 'Monthly Reports'
+        unique_together = ('month_year', 'kind')
+        ordering = ['-month_year', 'kind']
+
+
+class ReportEmail(models.Model):
+    """One member's monthly report email; the rows are the report mailer's progress"""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    
+    month_year = models.CharField(max_length=7, help_text="Format: YYYY-MM")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_emails')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.month_year} - {self.status}"
+    
+    class Meta:
+        verbose_name = 'Report Email'
+        verbose_name_plural = 'Report Emails'
+        unique_together = ('month_year', 'user')
+        ordering = ['-month_year', 'id']
+
+
+class SearchTerm(models.Model):
+    """One word of a searchable object: a posting of the admin search index (core/search.py)"""
+    KIND_CHOICES = (
+        ('message', 'Message'),
+        ('grocery', 'Grocery'),
+        ('user', 'User'),
+    )
+    
+    term = models.CharField(max_length=64)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    weight = models.PositiveSmallIntegerField(default=1, help_text="How strongly the term describes the object")
+    
+    def __str__(self):
+        return f"{self.term} - {self.kind} {self.object_id}"
+    
+    class Meta:
+        verbose_name = 'Search Term'
+        verbose_name_plural = 'Search Terms'
+        # The unique index also serves reindexing, which replaces one object's terms
+        unique_together = ('kind', 'object_id', 'term')
+        # Ordered by object within a term, so a common word's newest objects
+        # are a range of it (core.search.COMMON_WORD_LIMIT)
+        indexes = [models.Index(fields=['term', 'object_id', 'kind'], name='core_search_term_object_idx')]
@@ -0,0 +1,174 @@
+"""
+Monthly reports rendered ahead of time
+
+`manage.py generate_monthly_reports` (run it daily) renders the previous
+month's PDF and Excel reports once MessSettings.report_generation_day has
+come, if auto_generate_monthly_report is on, and stores them as
+MonthlyReport files. The monthly_report and export_monthly_report_excel
+views then stream the stored file instead of rendering one.
+
+A stored file is only served while it still matches what a live render
+would produce:
+
+- saving or deleting a payment, grocery or fixed expense of the month marks
+  the month's reports stale (core.signals), and the next run renders them
+  again
+- a report rendered with other include_payment_details /
+  include_grocery_details flags than the current ones is ignored
+- a report whose data changed while it rendered is stored stale. Such a
+  change may have found no row to mark, so the payment, grocery and fixed
+  expense data versions (core.cache_versions) are compared before and after
+
+Anything else falls back to rendering during the request, as before.
+"""
+import calendar
+import logging
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.db import DEFAULT_DB_ALIAS
+from django.http import FileResponse
+from django.utils import timezone
+
+from .cache_versions import get_data_versions
+from .models import FixedExpense, Grocery, MonthlyReport, Payment
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# The models a report shows; saving any of them bumps its data version
+REPORT_MODELS = ('payment', 'grocery', 'fixedexpense')
+
+FILENAMES = {
+    'pdf': 'mess_report_{month_year}.pdf',
+    'xlsx': 'monthly_report_{month_year}.xlsx',
+}
+
+
+# ==================== Schedule ====================
+
+def previous_month(today):
+    return (today.replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+
+
+def generation_due(today, mess_settings):
+    """Whether today is on or after this month's report generation day"""
+    last_day = calendar.monthrange(today.year, today.month)[1]
+    return today.day >= max(1, min(mess_settings.report_generation_day, last_day))
+
+
+# ==================== Rendering ====================
+
+def month_data(month_year):
+    """The payments, groceries and fixed expense a monthly report shows"""
+    payments = Payment.objects.filter(month_year=month_year).select_related('user')
+    groceries = Grocery.objects.filter(month_year=month_year)
+    try:
+        fixed_expense = FixedExpense.objects.get(month_year=month_year)
+    except FixedExpense.DoesNotExist:
+        fixed_expense = None
+    return payments, groceries, fixed_expense
+
+
+def render_report(kind, month_year, mess_settings):
+    """Render one report as bytes, honouring the include_*_details flags"""
+    payments, groceries, fixed_expense = month_data(month_year)
+    # ReportLab and openpyxl are slow to import; only the renderer needed
+    if kind == 'pdf':
+        from .pdf_reports import build_monthly_report_pdf
+        return build_monthly_report_pdf(month_year, payments, groceries, fixed_expense,
+                                        mess_settings.include_grocery_details)
+    from .excel_export import build_monthly_report_excel
+    return build_monthly_report_excel(month_year, payments, groceries, fixed_expense,
+                                      mess_settings.include_payment_details,
+                                      mess_settings.include_grocery_details)
+
+
+def _is_current(report, mess_settings):
+    return (not report.stale
+            and report.include_payment_details == mess_settings.include_payment_details
+            and report.include_grocery_details == mess_settings.include_grocery_details)
+
+
+def _report_data_version():
+    versions = get_data_versions()
+    return tuple(versions[name] for name in REPORT_MODELS)
+
+
+def build_reports(month_year, mess_settings, force=False):
+    """
+    Render and store the month's PDF and Excel reports
+
+    Reports already stored and current are kept unless force is set. A
+    report whose data changed while it rendered is stored stale, for the
+    next run to render again.
+
+    Returns:
+        list of the kinds rendered
+    """
+    existing = {report.kind: report for report in MonthlyReport.objects.filter(month_year=month_year)}
+    built = []
+    for kind in CONTENT_TYPES:
+        report = existing.get(kind)
+        if report is not None and not force and _is_current(report, mess_settings):
+            continue
+
+        version = _report_data_version()
+        content = render_report(kind, month_year, mess_settings)
+        old_name = report.file.name if report is not None else None
+        if report is None:
+            report = MonthlyReport(month_year=month_year, kind=kind)
+        report.include_payment_details = mess_settings.include_payment_details
+        report.include_grocery_details = mess_settings.include_grocery_details
+        # Stored stale, and only marked current below, so a save while it
+        # rendered (whose mark_reports_stale UPDATE this save would undo) can't
+        # leave an outdated report served
+        report.stale = True
+        report.generated_at = timezone.now()
+        report.file.save(FILENAMES[kind].format(month_year=month_year), ContentFile(content), save=False)
+        report.save()
+        if _report_data_version() == version:
+            MonthlyReport.objects.filter(pk=report.pk, stale=True).update(stale=False)
+            # A change that committed between the check and the update
+            if _report_data_version() != version:
+                MonthlyReport.objects.filter(pk=report.pk).update(stale=True)
+        else:
+            logger.info('%s %s data changed while it rendered; left stale', month_year, kind)
+
+        # Storage never overwrites, so the new file got a fresh name
+        if old_name and old_name != report.file.name:
+            report.file.storage.delete(old_name)
+        built.append(kind)
+    return built
+
+
+def mark_reports_stale(month_year):
+    """The month's data changed: stop serving its stored reports"""
+    MonthlyReport.objects.filter(month_year=month_year, stale=False).update(stale=True)
+
+
+# ==================== Serving ====================
+
+def prebuilt_report_response(kind, month_year, mess_settings):
+    """
+    A download response streaming the stored report, or None when there is
+    no current one and the caller should render it
+    """
+    # From the primary even in a replica view: a lagging replica may not
+    # have the stale flag set since, and would serve the old file
+    report = MonthlyReport.objects.using(DEFAULT_DB_ALIAS).filter(month_year=month_year, kind=kind).first()
+    if report is None or not _is_current(report, mess_settings):
+        return None
+    try:
+        file = report.file.open('rb')
+    except OSError as exc:
+        # e.g. a redeploy wiped local media; rendering still works
+        logger.warning('Stored %s report for %s unreadable: %s', kind, month_year, exc)
+        return None
+    return FileResponse(file, as_attachment=True, content_type=CONTENT_TYPES[kind],
+                        filename=FILENAMES[kind].format(month_year=month_year))
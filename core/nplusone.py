@@ -0,0 +1,140 @@
+"""
+N+1 query detection
+
+Within one request, every SQL statement is fingerprinted by its text - the
+ORM keeps parameters out of the SQL, so the same query for a different row
+has the same fingerprint. When one fingerprint is executed NPLUSONE_THRESHOLD
+times the call site (template line or project source line) is reported:
+
+- NPLUSONE_MODE = 'raise'  raise NPlusOneError (the test runner sets this)
+- NPLUSONE_MODE = 'log'    log a warning for a NPLUSONE_SAMPLE_RATE share
+                           of the requests that hit one (production default)
+- NPLUSONE_MODE = 'off'    do nothing
+
+NPlusOneMiddleware (core/middleware.py) scopes the counters to a request.
+"""
+import logging
+import os
+import random
+import re
+import sys
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+logger = logging.getLogger('core.nplusone')
+
+_current_tracker = ContextVar('nplusone_tracker', default=None)
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Statements that repeat legitimately and say nothing about the ORM
+_IGNORED_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class NPlusOneError(Exception):
+    """The same query ran once per row of a list"""
+
+
+class QueryTracker:
+    """Fingerprint counts for one request"""
+
+    def __init__(self, view_name=None):
+        self.view_name = view_name
+        self.counts = Counter()
+        self.sampled = random.random() < getattr(settings, 'NPLUSONE_SAMPLE_RATE', 0.1)
+
+
+def get_mode():
+    return getattr(settings, 'NPLUSONE_MODE', 'log')
+
+
+def start_tracking(view_name=None):
+    """Begin counting queries for the current request; returns a reset token"""
+    return _current_tracker.set(QueryTracker(view_name))
+
+
+def stop_tracking(token):
+    _current_tracker.reset(token)
+
+
+def get_tracker():
+    """The current request's QueryTracker, or None outside a request"""
+    return _current_tracker.get()
+
+
+def fingerprint(sql):
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+# ==================== Call Sites ====================
+
+_PROJECT_DIR = str(settings.BASE_DIR)
+_THIS_FILE = os.path.abspath(__file__)
+
+# Execute wrappers (this module's, request timing's) are never the call site
+_EXECUTE_WRAPPER_ARGS = ('execute', 'sql', 'params', 'many', 'context')
+
+_LIBRARY_DIRS = tuple({os.path.dirname(os.__file__), *(p for p in sys.path if 'site-packages' in p)})
+
+
+def find_call_site():
+    """
+    Where the repeated query came from: 'template <name>, line <n>' when a
+    template triggered it, otherwise the innermost project 'file:line'
+    """
+    frame = sys._getframe(1)
+    source_line = None
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == 'render_annotated':
+            # django.template.base.Node.render_annotated - the innermost
+            # template node being rendered when the query ran
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                return f'template {origin.template_name or origin.name}, line {token.lineno}'
+        filename = os.path.abspath(code.co_filename)
+        if (source_line is None and filename.startswith(_PROJECT_DIR)
+                and filename != _THIS_FILE and not filename.startswith(_LIBRARY_DIRS)
+                and code.co_varnames[:5] != _EXECUTE_WRAPPER_ARGS):
+            source_line = f'{os.path.relpath(filename, _PROJECT_DIR)}:{frame.f_lineno} in {code.co_name}'
+        frame = frame.f_back
+    return source_line or 'unknown call site'
+
+
+# ==================== Detection ====================
+
+def _report(tracker, sql, count):
+    call_site = find_call_site()
+    message = (f'Possible N+1 query in {tracker.view_name or "request"}: ran {count} times '
+               f'from {call_site}: {sql[:300]}')
+    if get_mode() == 'raise':
+        raise NPlusOneError(message)
+    if tracker.sampled:
+        logger.warning(message)
+
+
+def _track_query(execute, sql, params, many, context):
+    tracker = _current_tracker.get()
+    if tracker is None or many or sql.startswith(_IGNORED_PREFIXES):
+        return execute(sql, params, many, context)
+
+    key = fingerprint(sql)
+    tracker.counts[key] += 1
+    # Report once per fingerprint, when it first reaches the threshold
+    if tracker.counts[key] == getattr(settings, 'NPLUSONE_THRESHOLD', 5):
+        _report(tracker, key, tracker.counts[key])
+    return execute(sql, params, many, context)
+
+
+def _install_query_tracker(sender, connection, **kwargs):
+    if get_mode() != 'off' and _track_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_track_query)
+
+
+connection_created.connect(_install_query_tracker)
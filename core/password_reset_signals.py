@@ -5,7 +5,7 @@ from django.dispatch import receiver
 from allauth.account.signals import password_reset
 from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
-from core.email_templates import get_password_reset_success_email_html
+from core.email_templates import render_email
 
 
 @receiver(password_reset)
@@ -15,26 +15,9 @@ def send_password_reset_confirmation(sender, request, user, **kwargs):
     """
     try:
         subject = '✅ Password Reset Successful - Mess Management'
-        text_content = f'''
-Hi {user.first_name or user.username},
-
-Your password has been successfully reset.
-
-You can now login to your account using your new password.
-
-If you did not perform this password reset, please contact us immediately.
-
-Login here: http://127.0.0.1:8000/accounts/login/
-
-For assistance, contact: pawantripathi802@gmail.com
-
-Best regards,
-Mess Management Team
-        '''
-        
-        html_content = get_password_reset_success_email_html(
-            user_name=user.first_name or user.username
-        )
+        text_content, html_content = render_email('password_reset_success', {
+            'user_name': user.first_name or user.username,
+        })
         
         msg = EmailMultiAlternatives(
             subject=subject,
@@ -0,0 +1,218 @@
+"""
+PDF report helper functions for mess management system
+
+ReportLab is slow to import, so this module is only imported inside the
+views that produce PDFs - never at URLconf load time.
+"""
+from io import BytesIO
+
+from django.db.models import Sum
+from django.http import HttpResponse
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from .request_timing import timed
+
+
+def create_pdf_response(pdf_bytes, filename):
+    """Create an HTTP response for PDF file download"""
+    response = HttpResponse(pdf_bytes, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@timed('pdf')
+def build_monthly_report_pdf(month_year, payments, groceries, fixed_expense, include_grocery_details=True):
+    """
+    Build the monthly mess report as PDF bytes
+
+    Args:
+        month_year: Month/year string (YYYY-MM)
+        payments: QuerySet of Payment objects for the month
+        groceries: QuerySet of Grocery objects for the month
+        fixed_expense: FixedExpense for the month, or None
+        include_grocery_details: List every grocery item, not just the total
+
+    Returns:
+        bytes of the PDF document
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    # Title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+    elements.append(Paragraph(f'Mess Management Report - {month_year}', title_style))
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Payments Summary
+    total_collected = payments.filter(status='paid').aggregate(Sum('amount'))['amount__sum'] or 0
+    pending_count = payments.filter(status='pending').count()
+
+    elements.append(Paragraph('Payment Summary', styles['Heading2']))
+    payment_data = [
+        ['Total Collected', f'₹{total_collected:.2f}'],
+        ['Pending Payments', str(pending_count)],
+        ['Total Users', str(payments.count())],
+    ]
+    payment_table = Table(payment_data, colWidths=[3*inch, 2*inch])
+    payment_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ecf0f1')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ]))
+    elements.append(payment_table)
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Grocery Expenses
+    total_grocery = groceries.aggregate(Sum('price'))['price__sum'] or 0
+
+    elements.append(Paragraph('Grocery Expenses', styles['Heading2']))
+    grocery_data = [['Item', 'Category', 'Quantity', 'Price']]
+    if include_grocery_details:
+        for item in groceries:
+            grocery_data.append([item.item_name, item.category, item.quantity, f'₹{item.price:.2f}'])
+    grocery_data.append(['', '', 'Total', f'₹{total_grocery:.2f}'])
+
+    grocery_table = Table(grocery_data, colWidths=[2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
+    grocery_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -2), colors.HexColor('#ecf0f1')),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e74c3c')),
+        ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ]))
+    elements.append(grocery_table)
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Fixed Expenses
+    if fixed_expense:
+        elements.append(Paragraph('Fixed Expenses', styles['Heading2']))
+        fixed_data = [
+            ['Kitchen Rent', f'₹{fixed_expense.kitchen_rent:.2f}'],
+            ['Maid Salary', f'₹{fixed_expense.maid_salary:.2f}'],
+            ['Gas Cylinder', f'₹{fixed_expense.gas_cylinder:.2f}'],
+            ['Other Expenses', f'₹{fixed_expense.other_expenses:.2f}'],
+            ['Total Fixed', f'₹{fixed_expense.total_fixed_expense:.2f}'],
+        ]
+        fixed_table = Table(fixed_data, colWidths=[3*inch, 2*inch])
+        fixed_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -2), colors.HexColor('#ecf0f1')),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e74c3c')),
+            ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ]))
+        elements.append(fixed_table)
+    else:
+        elements.append(Paragraph('No fixed expenses recorded for this month.', styles['Normal']))
+
+    # Build PDF
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+@timed('pdf')
+def build_receipt_pdf(user, payment, month_year):
+    """
+    Build a member's payment receipt as PDF bytes
+
+    Args:
+        user: User the receipt is for
+        payment: That user's Payment for the month
+        month_year: Month/year string (YYYY-MM)
+
+    Returns:
+        bytes of the PDF document
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    # Title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=20,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=20,
+        alignment=TA_CENTER
+    )
+    elements.append(Paragraph('Payment Receipt', title_style))
+    elements.append(Spacer(1, 0.2*inch))
+
+    # User Details
+    user_data = [
+        ['Name', user.get_full_name()],
+        ['Username', user.username],
+        ['Month', month_year],
+    ]
+    user_table = Table(user_data, colWidths=[2*inch, 4*inch])
+    user_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ecf0f1')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ]))
+    elements.append(user_table)
+    elements.append(Spacer(1, 0.2*inch))
+
+    # Payment Details
+    payment_data = [
+        ['Amount', f'₹{payment.amount:.2f}'],
+        ['Status', payment.get_status_display()],
+        ['Transaction ID', payment.transaction_id or 'N/A'],
+        ['Payment Date', payment.paid_date.strftime('%d-%m-%Y %H:%M') if payment.paid_date else 'N/A'],
+    ]
+    payment_table = Table(payment_data, colWidths=[2*inch, 4*inch])
+    payment_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ecf0f1')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ]))
+    elements.append(payment_table)
+
+    # Build PDF
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def export_monthly_report_to_pdf(month_year, payments, groceries, fixed_expense, include_grocery_details=True):
+    """Monthly mess report as a PDF download response"""
+    pdf_bytes = build_monthly_report_pdf(month_year, payments, groceries, fixed_expense,
+                                         include_grocery_details)
+    return create_pdf_response(pdf_bytes, f'mess_report_{month_year}.pdf')
+
+
+def export_receipt_to_pdf(user, payment, month_year):
+    """Payment receipt as a PDF download response"""
+    pdf_bytes = build_receipt_pdf(user, payment, month_year)
+    return create_pdf_response(pdf_bytes, f'receipt_{user.username}_{month_year}.pdf')
@@ -0,0 +1,205 @@
+"""
+Synthetic data for load and performance testing
+
+seed_perf_data() fills the database with a realistic mess: members with
+profiles and settings, months of payments in mixed states, groceries across
+categories, fixed expenses, meal plans, messages and activity logs. Rows are
+generated lazily and written with bulk_create in chunks, every random choice
+comes from one seeded RNG (same seed, same data) and all members share a
+single precomputed password hash - hashing is by far the slowest part of
+creating a user. Even so, expect minutes rather than seconds for big sets:
+about 21 s for 122k rows (3000 members) on one vCPU with SQLite, most of
+it bulk_create preparing each field for the insert.
+
+Used by the seed_perf_data management command and core/test_performance.py.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .cache_versions import VERSIONED_MODELS, bump_data_version
+from .models import (ActivityLog, FixedExpense, Grocery, MealPlan, Message, Payment,
+                     UserProfile, UserSettings)
+from .search import rebuild_index
+
+
+CHUNK_SIZE = 1000
+
+PAYMENT_STATUSES = ('paid', 'paid', 'paid', 'pending', 'partial')
+
+GROCERY_ITEMS = {
+    'vegetables': ('Potato', 'Onion', 'Tomato', 'Cabbage', 'Spinach'),
+    'grains': ('Rice', 'Wheat Flour', 'Poha', 'Toor Dal', 'Moong Dal'),
+    'dairy': ('Milk', 'Curd', 'Paneer'),
+    'spices': ('Turmeric', 'Chilli Powder', 'Garam Masala'),
+    'other': ('Mustard Oil', 'Salt', 'Sugar', 'Tea'),
+}
+
+MEALS = {
+    'breakfast': ('Poha', 'Upma', 'Aloo Paratha', 'Idli Sambar', 'Bread Omelette'),
+    'lunch': ('Rice, Dal, Sabzi', 'Rajma Chawal', 'Chole Rice', 'Kadhi Chawal'),
+    'dinner': ('Roti, Sabzi', 'Paneer, Roti', 'Khichdi', 'Egg Curry, Rice'),
+}
+
+
+def recent_months(count, today=None):
+    """The last count months as 'YYYY-MM' strings, oldest first"""
+    today = today or date.today()
+    year, month = today.year, today.month
+    months = []
+    for _ in range(count):
+        months.append(f'{year:04d}-{month:02d}')
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months[::-1]
+
+
+def bulk_create_chunked(model, objects, batch_size=CHUNK_SIZE, **kwargs):
+    """
+    bulk_create an iterable of unsaved instances batch_size at a time, so
+    only one chunk is ever held in memory
+
+    Returns:
+        number of rows written
+    """
+    objects = iter(objects)
+    total = 0
+    while True:
+        chunk = list(islice(objects, batch_size))
+        if not chunk:
+            return total
+        model.objects.bulk_create(chunk, batch_size=batch_size, **kwargs)
+        total += len(chunk)
+
+
+def _user_ids(usernames, batch_size):
+    # bulk_create only sets primary keys on backends with RETURNING, so look
+    # the new users up (MySQL would leave them unset)
+    ids = {}
+    for start in range(0, len(usernames), batch_size):
+        ids.update(User.objects.filter(username__in=usernames[start:start + batch_size])
+                   .values_list('username', 'id'))
+    return [ids[username] for username in usernames]
+
+
+def seed_perf_data(users=200, months=24, groceries_per_month=40, messages=3000,
+                   activity_logs=6000, seed=0, prefix='perf', password='perf-pass',
+                   batch_size=CHUNK_SIZE):
+    """
+    Generate a synthetic dataset in one transaction
+
+    Members are named f'{prefix}{n}'; groceries, which belong to no member,
+    are tagged with the prefix in their quantity (see synthetic_groceries).
+    Fixed expenses and meal plans are per month/day, so those already
+    present are left alone.
+
+    Returns:
+        dict mapping each model name to the number of rows generated
+    """
+    rng = random.Random(seed)
+    month_list = recent_months(months)
+    password_hash = make_password(password)
+    usernames = [f'{prefix}{i}' for i in range(users)]
+    counts = {}
+
+    with transaction.atomic():
+        counts['user'] = bulk_create_chunked(User, (
+            User(username=username, password=password_hash, first_name=f'Member{i}',
+                 last_name=prefix.title(), email=f'{username}@example.com')
+            for i, username in enumerate(usernames)
+        ), batch_size)
+        user_ids = _user_ids(usernames, batch_size)
+
+        counts['userprofile'] = bulk_create_chunked(UserProfile, (
+            UserProfile(user_id=user_id, role='user', phone=f'98{i:08d}', room_no=str(100 + i))
+            for i, user_id in enumerate(user_ids)
+        ), batch_size)
+        counts['usersettings'] = bulk_create_chunked(UserSettings, (
+            UserSettings(user_id=user_id, payment_history_months=rng.choice((3, 6, 12)))
+            for user_id in user_ids
+        ), batch_size)
+
+        now = timezone.now()
+        counts['payment'] = bulk_create_chunked(Payment, (
+            _payment(rng, user_id, month, now)
+            for user_id in user_ids for month in month_list
+        ), batch_size)
+
+        counts['grocery'] = bulk_create_chunked(Grocery, (
+            _grocery(rng, month, i, prefix)
+            for month in month_list for i in range(groceries_per_month)
+        ), batch_size)
+
+        counts['fixedexpense'] = bulk_create_chunked(FixedExpense, (
+            FixedExpense(month_year=month, kitchen_rent=Decimal('8000'), maid_salary=Decimal('6000'),
+                         gas_cylinder=Decimal(rng.choice((1100, 2200, 3300))),
+                         other_expenses=Decimal(rng.randrange(0, 2000)))
+            for month in month_list
+        ), batch_size, ignore_conflicts=True)
+
+        first_day = date(int(month_list[0][:4]), int(month_list[0][5:]), 1)
+        days = (date.today() - first_day).days + 60  # through the next two months
+        counts['mealplan'] = bulk_create_chunked(MealPlan, (
+            MealPlan(date=first_day + timedelta(days=day),
+                     **{meal: rng.choice(options) for meal, options in MEALS.items()})
+            for day in range(days)
+        ), batch_size, ignore_conflicts=True)
+
+        message_types = [choice for choice, _ in Message.MESSAGE_TYPE_CHOICES]
+        counts['message'] = bulk_create_chunked(Message, (
+            _message(rng, rng.choice(user_ids), rng.choice(message_types), i, now)
+            for i in range(messages)
+        ), batch_size)
+
+        action_types = [choice for choice, _ in ActivityLog.ACTION_TYPE_CHOICES]
+        counts['activitylog'] = bulk_create_chunked(ActivityLog, (
+            ActivityLog(user_id=rng.choice(user_ids), action_type=rng.choice(action_types),
+                        description=f'Synthetic activity {i}')
+            for i in range(activity_logs)
+        ), batch_size)
+
+        # bulk_create sends no post_save, so invalidate cached fragments
+        # and index the new rows for search here
+        for model_name in VERSIONED_MODELS:
+            bump_data_version(model_name)
+        counts['searchterm'] = rebuild_index(batch_size)[1]
+
+    return counts
+
+
+def _payment(rng, user_id, month, now):
+    status = rng.choice(PAYMENT_STATUSES)
+    amount = Decimal('2500') if status != 'partial' else Decimal(rng.choice((1000, 1500, 2000)))
+    return Payment(user_id=user_id, month_year=month, amount=amount, status=status,
+                   transaction_id=f'UPI{rng.randrange(10 ** 11, 10 ** 12)}' if status != 'pending' else None,
+                   paid_date=now if status == 'paid' else None)
+
+
+def synthetic_groceries(prefix):
+    """Groceries of a run with this prefix; nothing else ties them to it"""
+    return Grocery.objects.filter(quantity__endswith=f' [{prefix}]')
+
+
+def _grocery(rng, month, index, prefix):
+    category = rng.choice(list(GROCERY_ITEMS))
+    return Grocery(item_name=rng.choice(GROCERY_ITEMS[category]), category=category,
+                   quantity=f'{rng.randrange(1, 10)} kg [{prefix}]',
+                   price=Decimal(rng.randrange(2000, 90000)) / 100,
+                   purchase_date=date(int(month[:4]), int(month[5:]), 1 + index % 28),
+                   month_year=month)
+
+
+def _message(rng, user_id, message_type, index, now):
+    message = Message(user_id=user_id, subject=f'Subject {index}', message='Lorem ipsum dolor sit amet. ' * 8,
+                      message_type=message_type, status=rng.choice(('pending', 'resolved')))
+    if message.status == 'resolved':
+        message.resolved_at = now
+        message.admin_reply = 'Thanks, this has been taken care of.'
+        message.replied_at = now
+    return message
+
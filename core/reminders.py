@@ -0,0 +1,360 @@
+"""
+Tiered payment reminders
+
+A payment for month YYYY-MM falls due on MessSettings.billing_day of that
+month. Reminders go out in tiers:
+
+- first / second / final: first_reminder_days, second_reminder_days and
+  final_reminder_days before the due date
+- overdue: once the grace period after the due date has passed, if
+  send_overdue_reminders is on
+
+`manage.py run_reminders` (run it daily) sends, for every pending or partial
+payment, the latest tier that is due. A tier whose time has passed is not
+sent late once a later one is due. Each sent tier is recorded as a
+PaymentReminder whose unique key (payment:<id>:<tier>) makes re-runs, and
+runs that overlap, skip it. In-app messages are created with one bulk
+insert, and emails go to members with email_payment_reminders on, all over
+one SMTP connection. An email that doesn't go out (the SMTP server is down,
+say) stays pending on its PaymentReminder and the next runs retry it, for
+REMINDER_EMAIL_RETRY_DAYS, while it is the payment's latest reminder.
+
+The admin's "Remind all pending" button (remind_month) reminds a whole
+month the same way, at most once a day per payment, and queues the emails
+so the page doesn't wait for SMTP.
+"""
+import calendar
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from string import Template
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .cache_versions import bump_data_version
+from .email_templates import get_payment_reminder_email_html
+from .models import Message, MessSettings, Payment, PaymentReminder
+
+
+logger = logging.getLogger(__name__)
+
+# A reminder to send: key is its PaymentReminder key
+DueReminder = namedtuple('DueReminder', 'payment tier due_on key')
+
+# Emails queued by the admin bulk action go out one batch at a time
+_email_queue = ThreadPoolExecutor(max_workers=1, thread_name_prefix='reminder-email')
+
+SUBJECTS = {
+    None: 'Payment Reminder - {month_year}',
+    'manual': 'Payment Reminder - {month_year}',
+    'first': 'Payment Reminder - {month_year}',
+    'second': 'Second Payment Reminder - {month_year}',
+    'final': 'Final Payment Reminder - {month_year}',
+    'overdue': 'Overdue Payment - {month_year}',
+}
+
+
+# ==================== Schedule ====================
+
+def due_date(month_year, billing_day):
+    """The day a month's payment is due (billing_day, clamped to the month)"""
+    year, month = map(int, month_year.split('-'))
+    return date(year, month, max(1, min(billing_day, calendar.monthrange(year, month)[1])))
+
+
+def due_tier(due, today, mess_settings):
+    """
+    The latest reminder tier due on `today` for a payment due on `due`
+
+    Returns:
+        'first', 'second', 'final', 'overdue' or None
+    """
+    if today > due:
+        overdue_from = due + timedelta(days=mess_settings.grace_period_days + 1)
+        if mess_settings.send_overdue_reminders and today >= overdue_from:
+            return 'overdue'
+        return None
+
+    tier = None
+    for name, days in (('first', mess_settings.first_reminder_days),
+                       ('second', mess_settings.second_reminder_days),
+                       ('final', mess_settings.final_reminder_days)):
+        if today >= due - timedelta(days=days):
+            tier = name
+    return tier
+
+
+# ==================== Content ====================
+
+# Compiled once; every reminder is one substitute() call
+REMINDER_TEMPLATE = Template("""Dear $first_name,
+
+This is a friendly reminder that your mess payment for $month_year is currently $status_lower.
+
+Payment Amount: ₹$amount
+Status: $status$due_line
+
+Please pay your bill on time to avoid any inconvenience.
+
+Payment Details:
+UPI ID: $upi_id
+
+Thank you for your cooperation!
+
+- Mess Management""")
+
+
+def reminder_text(payment, upi_id, due=None):
+    """Plain-text reminder, as an in-app message and the email's text part"""
+    status = payment.get_status_display()
+    return REMINDER_TEMPLATE.substitute(
+        first_name=payment.user.first_name,
+        month_year=payment.month_year,
+        status=status,
+        status_lower=status.lower(),
+        amount=payment.amount,
+        due_line=f"\nDue Date: {due.strftime('%d %b %Y')}" if due else '',
+        upi_id=upi_id,
+    )
+
+
+def reminder_subject(payment, tier=None):
+    return SUBJECTS[tier].format(month_year=payment.month_year)
+
+
+def wants_reminder_email(user):
+    # Members without a UserSettings row have the defaults, i.e. emails on
+    user_settings = getattr(user, 'settings', None)
+    return bool(user.email) and (user_settings is None or user_settings.email_payment_reminders)
+
+
+# ==================== Sending ====================
+
+def _unpaid(**filters):
+    return {'status__in': ('pending', 'partial'), **filters}
+
+
+def _payments(**filters):
+    return (Payment.objects.filter(**_unpaid(**filters))
+            .select_related('user', 'user__settings')
+            .order_by('month_year', 'id'))
+
+
+def _sent_keys(**filters):
+    # Filtered like the payments rather than by key, which could mean an IN
+    # list longer than the database allows
+    return set(PaymentReminder.objects
+               .filter(**{f'payment__{lookup}': value for lookup, value in _unpaid(**filters).items()})
+               .values_list('key', flat=True))
+
+
+def find_due_reminders(today, mess_settings):
+    """
+    Every DueReminder due today and not sent yet, in two queries
+    """
+    latest_month = (today + timedelta(days=max(mess_settings.first_reminder_days, 0))).strftime('%Y-%m')
+    due = []
+    for payment in _payments(month_year__lte=latest_month):
+        due_on = due_date(payment.month_year, mess_settings.billing_day)
+        tier = due_tier(due_on, today, mess_settings)
+        if tier is not None:
+            due.append(DueReminder(payment, tier, due_on, PaymentReminder.make_key(payment.id, tier)))
+
+    sent = _sent_keys(month_year__lte=latest_month)
+    return [reminder for reminder in due if reminder.key not in sent]
+
+
+def record_reminders(reminders, upi_id, email=False):
+    """
+    Insert the PaymentReminder keys and the in-app messages in one transaction
+
+    Args:
+        email: the reminders will be emailed, so mark the emails pending
+
+    Returns:
+        False if another run recorded some of the same keys first (nothing
+        is inserted then)
+    """
+    try:
+        with transaction.atomic():
+            # Keys first: a run that overlaps this one fails here, before
+            # creating any message, and sends nothing
+            PaymentReminder.objects.bulk_create([
+                PaymentReminder(key=reminder.key, payment=reminder.payment, tier=reminder.tier,
+                                email_pending=email and wants_reminder_email(reminder.payment.user))
+                for reminder in reminders
+            ])
+            Message.objects.bulk_create([
+                Message(user=reminder.payment.user,
+                        subject=reminder_subject(reminder.payment, reminder.tier),
+                        message=reminder_text(reminder.payment, upi_id, reminder.due_on),
+                        message_type='system', status='pending')
+                for reminder in reminders
+            ])
+            # bulk_create sends no post_save, so bump the version by hand
+            bump_data_version('message')
+    except IntegrityError:
+        logger.warning('Another reminder run sent these reminders first; nothing sent')
+        return False
+    return True
+
+
+def unsent_reminder_emails(mess_settings, exclude_payments=()):
+    """
+    DueReminders whose email is still pending, for retrying: each unpaid
+    payment's latest reminder of the last REMINDER_EMAIL_RETRY_DAYS, unless
+    the payment is in exclude_payments (it has a newer one on its way)
+    """
+    since = timezone.now() - timedelta(days=getattr(settings, 'REMINDER_EMAIL_RETRY_DAYS', 3))
+    latest = {}
+    for reminder in (PaymentReminder.objects
+                     .filter(created_at__gte=since,
+                             **{f'payment__{lookup}': value for lookup, value in _unpaid().items()})
+                     .select_related('payment__user__settings')
+                     .order_by('created_at', 'id')):
+        latest[reminder.payment_id] = reminder
+    return [DueReminder(reminder.payment, reminder.tier,
+                        due_date(reminder.payment.month_year, mess_settings.billing_day), reminder.key)
+            for payment_id, reminder in latest.items()
+            if reminder.email_pending and payment_id not in exclude_payments]
+
+
+def send_due_reminders(today=None, send_email=True, dry_run=False):
+    """
+    Create and send every reminder due today (the run_reminders command)
+
+    Returns:
+        dict of counts: due, created, emailed, email_failed, email_skipped,
+        email_retried, plus 'reminders', the DueReminders that were (or,
+        with dry_run, would be) sent
+    """
+    today = today or timezone.localdate()
+    mess_settings = MessSettings.get_cached()
+    upi_id = mess_settings.admin_upi_id or "Not configured"
+    due = find_due_reminders(today, mess_settings)
+    result = {'due': len(due), 'created': 0, 'emailed': 0, 'email_failed': 0, 'email_skipped': 0,
+              'email_retried': 0, 'reminders': due}
+    if dry_run:
+        return result
+
+    if due and not record_reminders(due, upi_id, email=send_email):
+        return {**result, 'due': 0, 'reminders': []}
+    result['created'] = len(due)
+
+    if send_email:
+        # Emails earlier runs (or the admin's "Remind all pending") couldn't send
+        retries = unsent_reminder_emails(mess_settings, {reminder.payment.id for reminder in due})
+        result['email_retried'] = len(retries)
+        result.update(email_reminders(due + retries, upi_id))
+    return result
+
+
+def remind_month(month_year, send_email=True, today=None):
+    """
+    Remind every pending or partial payment of one month (the admin's
+    "Remind all pending" action). A payment already reminded this way
+    today is skipped, so a double click sends nothing twice.
+
+    Emails are queued and sent after the response, over one connection.
+
+    Returns:
+        dict of counts: sent, skipped, emails_queued, email_skipped
+    """
+    today = today or timezone.localdate()
+    mess_settings = MessSettings.get_cached()
+    upi_id = mess_settings.admin_upi_id or "Not configured"
+    due_on = due_date(month_year, mess_settings.billing_day)
+
+    payments = list(_payments(month_year=month_year))
+    sent = _sent_keys(month_year=month_year)
+    reminders = []
+    for payment in payments:
+        key = PaymentReminder.make_key(payment.id, 'manual', today)
+        if key not in sent:
+            reminders.append(DueReminder(payment, 'manual', due_on, key))
+
+    result = {'sent': 0, 'skipped': len(payments) - len(reminders), 'emails_queued': 0, 'email_skipped': 0}
+    if not reminders or not record_reminders(reminders, upi_id, email=send_email):
+        return {**result, 'skipped': len(payments)}
+    result['sent'] = len(reminders)
+
+    if send_email:
+        emailed = [reminder for reminder in reminders if wants_reminder_email(reminder.payment.user)]
+        result.update(emails_queued=len(emailed), email_skipped=len(reminders) - len(emailed))
+        queue_reminder_emails(emailed, upi_id)
+    return result
+
+
+def queue_reminder_emails(reminders, upi_id):
+    """
+    Send reminder emails on a background thread once the transaction
+    commits; with REMINDER_EMAILS_IN_BACKGROUND off (tests) send them inline
+    """
+    if not reminders:
+        return
+    if not getattr(settings, 'REMINDER_EMAILS_IN_BACKGROUND', True):
+        transaction.on_commit(lambda: email_reminders(reminders, upi_id))
+        return
+
+    def send():
+        try:
+            email_reminders(reminders, upi_id)
+        except Exception:
+            logger.exception('Queued reminder emails failed')
+        finally:
+            close_old_connections()
+
+    transaction.on_commit(lambda: _email_queue.submit(send))
+
+
+def _reminder_email(reminder, upi_id):
+    payment = reminder.payment
+    email = EmailMultiAlternatives(
+        subject=reminder_subject(payment, reminder.tier),
+        body=reminder_text(payment, upi_id, reminder.due_on),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[payment.user.email],
+    )
+    email.attach_alternative(get_payment_reminder_email_html(
+        user_name=payment.user.first_name or payment.user.username,
+        month_year=payment.month_year,
+        amount=payment.amount,
+        status=payment.get_status_display(),
+        upi_id=upi_id,
+    ), 'text/html')
+    return email
+
+
+def email_reminders(reminders, upi_id):
+    """
+    Email the members who want reminder emails, over one SMTP connection,
+    and record emailed_at for each email sent; the others stay pending
+
+    Returns:
+        dict of counts: emailed, email_failed, email_skipped
+    """
+    emails = [(reminder.key, _reminder_email(reminder, upi_id))
+              for reminder in reminders if wants_reminder_email(reminder.payment.user)]
+
+    sent_keys = []
+    if emails:
+        # One SMTP session for the whole batch; a rejected address fails
+        # only its own email
+        try:
+            with get_connection(fail_silently=False) as connection:
+                for key, email in emails:
+                    try:
+                        connection.send_messages([email])
+                    except Exception as exc:
+                        logger.warning('Reminder email to %s failed: %s', email.to[0], exc)
+                    else:
+                        sent_keys.append(key)
+        except Exception as exc:
+            logger.error('Could not send reminder emails: %s', exc)
+        PaymentReminder.objects.filter(key__in=sent_keys).update(emailed_at=timezone.now(), email_pending=False)
+    return {'emailed': len(sent_keys), 'email_failed': len(emails) - len(sent_keys),
+            'email_skipped': len(reminders) - len(emails)}
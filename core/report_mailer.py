@@ -0,0 +1,160 @@
+"""
+Monthly report emails
+
+With MessSettings.auto_email_reports on, `manage.py send_monthly_reports`
+(run it daily, after generate_monthly_reports) emails every member billed
+for the previous month a summary of the month with their payment receipt
+attached. Members with email_monthly_reports off or no email address are
+left out.
+
+Progress lives in the database: the first run queues one ReportEmail row
+per member, and every run sends the rows still pending. A run that stops
+halfway - a crash, a deploy, Gmail's daily quota - is picked up by the
+next one. Emails go out REPORT_EMAIL_BATCH_SIZE at a time over one SMTP
+connection per batch, with REPORT_EMAIL_BATCH_PAUSE seconds between
+batches. Each batch's rows are marked sent as soon as it is done, so after
+a crash at most one batch is sent twice. A failed email stays pending for
+the next run until it has failed REPORT_EMAIL_MAX_ATTEMPTS times.
+
+Nothing here runs in a web request.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .email_templates import monthly_report_email_context, render_email
+from .models import FixedExpense, Grocery, Payment, ReportEmail
+
+
+logger = logging.getLogger(__name__)
+
+
+def wants_report_email(user):
+    # Members without a UserSettings row have the defaults, i.e. emails on
+    user_settings = getattr(user, 'settings', None)
+    return bool(user.email) and (user_settings is None or user_settings.email_monthly_reports)
+
+
+def month_totals(month_year):
+    """The month's grocery and fixed expense totals, the same in every email"""
+    total_grocery = Grocery.objects.filter(month_year=month_year).aggregate(Sum('price'))['price__sum'] or 0
+    fixed_expense = FixedExpense.objects.filter(month_year=month_year).first()
+    return total_grocery, fixed_expense.total_fixed_expense if fixed_expense else 0
+
+
+def queue_report_emails(month_year):
+    """
+    Add a pending ReportEmail for every member billed for the month who
+    wants the email and hasn't got one queued yet
+
+    Returns:
+        number of rows added
+    """
+    payments = (Payment.objects.filter(month_year=month_year, user__is_active=True)
+                .select_related('user', 'user__settings'))
+    queued = set(ReportEmail.objects.filter(month_year=month_year).values_list('user_id', flat=True))
+    new = [ReportEmail(month_year=month_year, user=payment.user) for payment in payments
+           if payment.user_id not in queued and wants_report_email(payment.user)]
+    # A run queuing the same month at the same time loses the race quietly
+    ReportEmail.objects.bulk_create(new, ignore_conflicts=True)
+    return len(new)
+
+
+def _report_email(payment, totals):
+    from .pdf_reports import build_receipt_pdf
+
+    user = payment.user
+    text, html = render_email('monthly_report', monthly_report_email_context(
+        user.first_name or user.username, payment.month_year, payment.amount,
+        payment.get_status_display(), *totals))
+    email = EmailMultiAlternatives(
+        subject=f'Monthly Report - {payment.month_year}',
+        body=text,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
+    email.attach_alternative(html, 'text/html')
+    email.attach(f'receipt_{user.username}_{payment.month_year}.pdf',
+                 build_receipt_pdf(user, payment, payment.month_year), 'application/pdf')
+    return email
+
+
+def _send_batch(rows, payments, totals):
+    """Send one batch over one SMTP connection; returns (sent ids, {id: error})"""
+    sent, failed = [], {}
+    emails = []
+    for row in rows:
+        payment = payments.get(row.user_id)
+        if payment is None:
+            # The payment was deleted after the email was queued
+            failed[row.id] = 'No payment for the month'
+            continue
+        emails.append((row.id, _report_email(payment, totals)))
+
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for row_id, email in emails:
+                try:
+                    connection.send_messages([email])
+                except Exception as exc:
+                    failed[row_id] = str(exc)
+                else:
+                    sent.append(row_id)
+    except Exception as exc:
+        # Could not connect (or the session dropped): the rest of the batch waits for the next run
+        logger.error('Could not send report emails: %s', exc)
+        failed.update({row_id: str(exc) for row_id, _ in emails if row_id not in sent and row_id not in failed})
+    return sent, failed
+
+
+def _record_failures(failed):
+    max_attempts = getattr(settings, 'REPORT_EMAIL_MAX_ATTEMPTS', 3)
+    for row_id, error in failed.items():
+        ReportEmail.objects.filter(id=row_id).update(attempts=F('attempts') + 1, last_error=error[:1000])
+    ReportEmail.objects.filter(id__in=list(failed), attempts__gte=max_attempts).update(status='failed')
+
+
+def send_report_emails(month_year, limit=None, batch_size=None, pause=None):
+    """
+    Send the month's pending report emails, batch by batch
+
+    Args:
+        limit: send at most this many (e.g. what is left of a daily quota)
+
+    Returns:
+        dict of counts: sent, failed, remaining
+    """
+    batch_size = batch_size or getattr(settings, 'REPORT_EMAIL_BATCH_SIZE', 50)
+    pause = getattr(settings, 'REPORT_EMAIL_BATCH_PAUSE', 2) if pause is None else pause
+    pending = ReportEmail.objects.filter(month_year=month_year, status='pending').order_by('id')
+
+    totals = month_totals(month_year)
+    payments = {payment.user_id: payment for payment in
+                Payment.objects.filter(month_year=month_year).select_related('user')}
+
+    result = {'sent': 0, 'failed': 0}
+    last_id = 0
+    while limit is None or result['sent'] + result['failed'] < limit:
+        size = batch_size if limit is None else min(batch_size, limit - result['sent'] - result['failed'])
+        rows = list(pending.filter(id__gt=last_id)[:size])
+        if not rows:
+            break
+        if last_id:
+            time.sleep(pause)
+        last_id = rows[-1].id
+
+        sent, failed = _send_batch(rows, payments, totals)
+        if sent:
+            ReportEmail.objects.filter(id__in=sent).update(status='sent', sent_at=timezone.now())
+        if failed:
+            logger.warning('%d report emails for %s failed', len(failed), month_year)
+            _record_failures(failed)
+        result['sent'] += len(sent)
+        result['failed'] += len(failed)
+
+    result['remaining'] = pending.count()
+    return result
@@ -0,0 +1,173 @@
+"""
+Per-request instrumentation: SQL query count and time, template render time
+and PDF/Excel generation time
+
+RequestTimingMiddleware (core/middleware.py) starts a RequestMetrics for
+every request. Queries are counted by an execute wrapper installed on every
+database connection, templates by the TimedDjangoTemplates backend, and
+report generation by the timed() decorator on the pdf_reports/excel_export
+builders. Outside a request all of these are no-ops.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template
+
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters for one request; safe to update from the async query pool"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.timings = defaultdict(float)  # 'template', 'pdf', 'excel' -> ms
+        self._lock = threading.Lock()
+
+    def add_query(self, duration_ms):
+        with self._lock:
+            self.queries += 1
+            self.db_ms += duration_ms
+
+    def add_timing(self, name, duration_ms):
+        with self._lock:
+            self.timings[name] += duration_ms
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def start_request_metrics():
+    """Begin collecting for the current request; returns (metrics, reset token)"""
+    metrics = RequestMetrics()
+    return metrics, _current_metrics.set(metrics)
+
+
+def stop_request_metrics(token):
+    _current_metrics.reset(token)
+
+
+def get_request_metrics():
+    """The current request's RequestMetrics, or None outside a request"""
+    return _current_metrics.get()
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent in a block (or decorated function) to the current
+    request under name. Usage: @timed('pdf') or `with timed('pdf'):`
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_timing(name, (time.perf_counter() - start) * 1000)
+
+
+# ==================== Database ====================
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query((time.perf_counter() - start) * 1000)
+
+
+def _install_query_recorder(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+connection_created.connect(_install_query_recorder)
+
+
+# ==================== Templates ====================
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend that adds render time to the request metrics"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+# ==================== Per-view Summary ====================
+
+_view_stats = {}
+_view_stats_lock = threading.Lock()
+
+
+def record_view_stats(view_name, metrics, total_ms):
+    """Fold one request into the per-view totals shown by the summary page"""
+    with _view_stats_lock:
+        stats = _view_stats.setdefault(view_name, {
+            'view': view_name, 'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'queries': 0, 'max_queries': 0, 'db_ms': 0.0, 'template_ms': 0.0,
+        })
+        stats['requests'] += 1
+        stats['total_ms'] += total_ms
+        stats['max_ms'] = max(stats['max_ms'], total_ms)
+        stats['queries'] += metrics.queries
+        stats['max_queries'] = max(stats['max_queries'], metrics.queries)
+        stats['db_ms'] += metrics.db_ms
+        stats['template_ms'] += metrics.timings.get('template', 0.0)
+
+
+def get_view_stats(limit=50):
+    """
+    Per-view averages since the process started, slowest first
+
+    Returns:
+        list of dicts with view, requests, avg/max total ms, avg/max queries
+        and avg db/template ms
+    """
+    with _view_stats_lock:
+        snapshot = [dict(stats) for stats in _view_stats.values()]
+
+    rows = []
+    for stats in snapshot:
+        count = stats['requests']
+        rows.append({
+            'view': stats['view'],
+            'requests': count,
+            'avg_ms': stats['total_ms'] / count,
+            'max_ms': stats['max_ms'],
+            'avg_queries': stats['queries'] / count,
+            'max_queries': stats['max_queries'],
+            'avg_db_ms': stats['db_ms'] / count,
+            'avg_template_ms': stats['template_ms'] / count,
+        })
+    rows.sort(key=lambda row: row['avg_ms'], reverse=True)
+    return rows[:limit]
+
+
+def reset_view_stats():
+    with _view_stats_lock:
+        _view_stats.clear()
@@ -0,0 +1,277 @@
+"""
+Admin search across user messages, groceries and users
+
+Searchable text is kept in an inverted index, the SearchTerm table: one
+row per (object, word) with a weight - the sum, over the fields the word
+appears in, of the field's weight below. Looking a word up is an index
+range scan on SearchTerm.term, and a search ranks at most PROBE_LIMIT
+objects, those of its rarest word, however large the tables grow; nothing
+does LIKE '%...%' over the source tables.
+
+The index is portable (SQLite, MySQL, Postgres alike) and kept current by
+signals (core/signals.py): saving an object replaces its rows, deleting
+it drops them. bulk_create and queryset.update() send no signals, so
+after a bulk load run `manage.py rebuild_search_index` (seed_perf_data
+does it itself).
+
+A query matches objects holding every word in it, the last word as a
+prefix (so results appear while it is still being typed). Results are
+ranked by the summed weight of the matching rows, newest first on a tie.
+When even the rarest word has more than PROBE_LIMIT rows, only its newest
+COMMON_WORD_LIMIT objects are ranked: a word that common says little, and
+another word narrows the search.
+"""
+import re
+from collections import defaultdict, namedtuple
+from functools import reduce
+from itertools import islice
+from operator import add
+
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import Max, OuterRef, Q, Subquery, Sum
+
+from .models import Grocery, Message, SearchTerm
+
+
+PER_PAGE = 20
+MAX_TERM_LENGTH = 64
+MAX_WEIGHT = 100
+MAX_QUERY_TERMS = 8
+
+# A query ranks the objects of its rarest word when that word has at most
+# PROBE_LIMIT rows; a word more common than that only its newest
+# COMMON_WORD_LIMIT objects
+PROBE_LIMIT = 2000
+COMMON_WORD_LIMIT = 500
+
+# Field weights: a word in a title or a name says more than one in a body
+MESSAGE_FIELDS = (('subject', 3), ('message', 1), ('admin_reply', 1), ('user_reply', 1))
+GROCERY_FIELDS = (('item_name', 3),)
+USER_FIELDS = (('username', 3), ('first_name', 3), ('last_name', 3), ('email', 2))
+ROOM_WEIGHT = 2
+
+# Model fields whose text is indexed, per sender; saving none of them
+# (save(update_fields=...)) leaves the index alone
+INDEXED_FIELDS = {
+    'message': {'message_type'} | {field for field, _ in MESSAGE_FIELDS},
+    'grocery': {field for field, _ in GROCERY_FIELDS},
+    'user': {field for field, _ in USER_FIELDS},
+    'userprofile': {'room_no'},
+}
+
+Hit = namedtuple('Hit', 'kind object score')
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lower-cased words of text, in order; e-mail addresses split at @ and ."""
+    return [word[:MAX_TERM_LENGTH] for word in _WORD.findall((text or '').lower())]
+
+
+# ==================== Indexing ====================
+
+def _weights(fields):
+    """{term: weight} for (text, field weight) pairs"""
+    weights = defaultdict(int)
+    for text, weight in fields:
+        for term in tokenize(text):
+            weights[term] = min(weights[term] + weight, MAX_WEIGHT)
+    return weights
+
+
+def message_document(message):
+    # System reminders aren't searched, as admin_messages doesn't list them
+    if message.message_type != 'user':
+        return None
+    return [(getattr(message, field), weight) for field, weight in MESSAGE_FIELDS]
+
+
+def grocery_document(grocery):
+    return [(getattr(grocery, field), weight) for field, weight in GROCERY_FIELDS]
+
+
+def user_document(user, profile=None):
+    profile = profile or getattr(user, 'profile', None)
+    fields = [(getattr(user, field), weight) for field, weight in USER_FIELDS]
+    if profile is not None:
+        fields.append((profile.room_no, ROOM_WEIGHT))
+    return fields
+
+
+def indexed_fields_saved(sender, update_fields):
+    """Whether a save with these update_fields may have changed indexed text"""
+    return not update_fields or not INDEXED_FIELDS[sender._meta.model_name].isdisjoint(update_fields)
+
+
+def _terms(kind, object_id, fields):
+    return [SearchTerm(term=term, kind=kind, object_id=object_id, weight=weight)
+            for term, weight in _weights(fields).items()]
+
+
+def index_object(kind, object_id, fields, created=False):
+    """
+    Replace the index rows of one object
+
+    Args:
+        fields: (text, weight) pairs, or None to drop the object from the index
+        created: the object is new, so it has no rows to replace
+    """
+    with transaction.atomic(savepoint=False):
+        if not created:
+            unindex_object(kind, object_id)
+        if fields:
+            SearchTerm.objects.bulk_create(_terms(kind, object_id, fields))
+
+
+def unindex_object(kind, object_id):
+    SearchTerm.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def _documents():
+    """(kind, id, fields) of everything searchable"""
+    for message in Message.objects.filter(message_type='user').iterator(chunk_size=1000):
+        yield 'message', message.id, message_document(message)
+    for grocery in Grocery.objects.iterator(chunk_size=1000):
+        yield 'grocery', grocery.id, grocery_document(grocery)
+    for user in User.objects.select_related('profile').iterator(chunk_size=1000):
+        yield 'user', user.id, user_document(user)
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Reindex everything from scratch
+
+    Returns:
+        (objects indexed, index rows written) tuple
+    """
+    objects = rows = 0
+
+    def terms():
+        nonlocal objects
+        for kind, object_id, fields in _documents():
+            objects += 1
+            yield from _terms(kind, object_id, fields)
+
+    with transaction.atomic():
+        SearchTerm.objects.all().delete()
+        pending = terms()
+        while batch := list(islice(pending, batch_size)):
+            SearchTerm.objects.bulk_create(batch)
+            rows += len(batch)
+    return objects, rows
+
+
+# ==================== Searching ====================
+
+def _condition(word, prefix=False):
+    if not prefix:
+        return Q(term=word)
+    if connection.vendor == 'sqlite':
+        # SQLite's LIKE is case-insensitive, so startswith can't use the
+        # index on term. It compares text bytewise, so this range holds
+        # exactly the terms starting with word.
+        return Q(term__gte=word, term__lt=word + '\U0010ffff')
+    return Q(term__startswith=word)
+
+
+def _weight_in_object(condition):
+    """Summed weight of the rows matching condition in the outer row's object (None if none do)"""
+    return Subquery(SearchTerm.objects.filter(condition, kind=OuterRef('kind'), object_id=OuterRef('object_id'))
+                    .values('kind').annotate(total=Sum('weight')).values('total'))
+
+
+def _matching_every_word(postings, conditions):
+    """
+    Objects with rows matching every condition, scored by the weight of all
+    of them
+
+    Returns:
+        (hits, limited) tuple; limited when only the newest
+        COMMON_WORD_LIMIT objects of the rarest word were ranked
+    """
+    # How many rows each word has (up to PROBE_LIMIT + 1, so a common word
+    # costs no more than a rare one) picks the word to start from; index-only counts
+    frequency = [postings.filter(condition)[:PROBE_LIMIT + 1].count() for condition in conditions]
+    # On a tie the whole words go first: the newest objects of one are a
+    # range of the index, where a prefix's have to be sorted
+    rarest = min(range(len(conditions)), key=lambda i: (frequency[i], i))
+    if frequency[rarest] == 0:
+        return postings.none().values('kind', 'object_id').annotate(score=Sum('weight')), False
+
+    driver = postings.filter(conditions[rarest])
+    limited = frequency[rarest] > PROBE_LIMIT
+    if limited:
+        cutoff = driver.order_by('-object_id').values_list('object_id', flat=True)[COMMON_WORD_LIMIT - 1]
+        driver = driver.filter(object_id__gte=cutoff)
+
+    # Look each other word up in the driving word's objects, through the
+    # (kind, object_id, term) unique index
+    others = {f'weight_{i}': _weight_in_object(condition)
+              for i, condition in enumerate(conditions) if i != rarest}
+    probed = driver.annotate(**others).filter(**{f'{name}__isnull': False for name in others})
+    hits = probed.values('kind', 'object_id').annotate(
+        score=reduce(add, (Max(name) for name in others), Sum('weight')))
+    return hits, limited
+
+
+def matching(query, kind=None):
+    """
+    Ranked matches for query
+
+    Empty (matches nothing) if the query has no words.
+
+    Returns:
+        (hits, limited) tuple: a queryset of dicts with kind, object_id and
+        score, and whether only the newest matches of a common word are in it
+    """
+    postings = SearchTerm.objects.all()
+    if kind:
+        postings = postings.filter(kind=kind)
+
+    words = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not words:
+        return postings.none().values('kind', 'object_id').annotate(score=Sum('weight')), False
+
+    *whole, prefix = words
+    conditions = [_condition(word) for word in whole] + [_condition(prefix, prefix=True)]
+    hits, limited = _matching_every_word(postings, conditions)
+    return hits.order_by('-score', '-object_id'), limited
+
+
+LOADERS = {
+    'message': lambda ids: Message.objects.select_related('user').in_bulk(ids),
+    'grocery': lambda ids: Grocery.objects.in_bulk(ids),
+    'user': lambda ids: User.objects.select_related('profile').in_bulk(ids),
+}
+
+
+def search(query, kind=None, page=1, per_page=PER_PAGE):
+    """
+    One page of results for query
+
+    Args:
+        kind: 'message', 'grocery' or 'user' to search only those
+
+    Returns:
+        django Page whose object_list is Hits, best first; page.limited
+        when the query's words are all so common that only the newest
+        matches were ranked
+    """
+    hits, limited = matching(query, kind)
+    page = Paginator(hits, per_page).get_page(page)
+    page.limited = limited
+
+    ids = defaultdict(list)
+    for row in page.object_list:
+        ids[row['kind']].append(row['object_id'])
+    objects = {hit_kind: LOADERS[hit_kind](object_ids) for hit_kind, object_ids in ids.items()}
+
+    # An object deleted without its signal (queryset.delete() does send them,
+    # raw SQL doesn't) has rows left over; leave it out
+    page.object_list = [Hit(row['kind'], objects[row['kind']][row['object_id']], row['score'])
+                        for row in page.object_list
+                        if row['object_id'] in objects[row['kind']]]
+    return page
@@ -1,12 +1,18 @@
 """
 Signal handlers for the core app
-Automatically creates UserProfile when new users are created
+Automatically creates UserProfile when new users are created,
+keeps the cache data versions in step with model changes
+marks pre-rendered monthly reports stale when their month changes
+and keeps the admin search index current
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from allauth.account.signals import user_signed_up
-from .models import UserProfile
+from .models import UserProfile, Payment, Grocery, FixedExpense, Message
+from .cache_versions import bump_data_version
+from .monthly_reports import mark_reports_stale
+from . import search
 
 
 @receiver(post_save, sender=User)
@@ -65,32 +71,16 @@ def create_profile_for_social_user(sender, request, user, **kwargs):
     # Send welcome email for Google OAuth signups
     from django.core.mail import EmailMultiAlternatives
     from django.conf import settings
-    from core.email_templates import get_welcome_email_html
+    from core.email_templates import render_email
     
     try:
         subject = '🎉 Welcome to Mess Management System!'
-        text_content = f'''
-Dear {user.first_name or user.username},
-
-Congratulations! Your account has been successfully created using Google Sign-In.
-
-Your Account Details:
-- Name: {user.get_full_name() or user.username}
-- Email: {user.email}
-
-Login here: http://127.0.0.1:8000/accounts/login/
-
-For assistance, contact: pawantripathi802@gmail.com
-
-Best regards,
-Mess Management Team
-        '''
-        
-        html_content = get_welcome_email_html(
-            user_name=user.first_name or user.username,
-            email=user.email,
-            username=user.username or user.email.split('@')[0]
-        )
+        text_content, html_content = render_email('welcome', {
+            'user_name': user.first_name or user.username,
+            'email': user.email,
+            'username': user.username or user.email.split('@')[0],
+            'via': 'Google Sign-In',
+        })
         
         msg = EmailMultiAlternatives(
             subject=subject,
@@ -104,3 +94,77 @@ Mess Management Team
     except Exception as e:
         # Log the error but don't fail signup
         print(f"Failed to send welcome email for social signup: {e}")
+
+
+# Fields nothing cached shows: login only touches User.last_login, the
+# theme toggle only UserProfile.dark_mode
+UNVERSIONED_FIELDS = {User: {'last_login'}, UserProfile: {'dark_mode'}}
+
+
+def bump_model_data_version(sender, instance, **kwargs):
+    """
+    Invalidate cached fragments and API ETags that cover this model
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= UNVERSIONED_FIELDS.get(sender, set()):
+        return
+    bump_data_version(sender._meta.model_name)
+
+
+for versioned_model in (Payment, Grocery, FixedExpense, Message, User, UserProfile):
+    post_save.connect(bump_model_data_version, sender=versioned_model,
+                      dispatch_uid=f'data_version_save_{versioned_model._meta.model_name}')
+    post_delete.connect(bump_model_data_version, sender=versioned_model,
+                        dispatch_uid=f'data_version_delete_{versioned_model._meta.model_name}')
+
+
+def mark_month_reports_stale(sender, instance, **kwargs):
+    """A month's pre-rendered reports no longer match its data"""
+    mark_reports_stale(instance.month_year)
+
+
+for report_model in (Payment, Grocery, FixedExpense):
+    post_save.connect(mark_month_reports_stale, sender=report_model,
+                      dispatch_uid=f'monthly_report_save_{report_model._meta.model_name}')
+    post_delete.connect(mark_month_reports_stale, sender=report_model,
+                        dispatch_uid=f'monthly_report_delete_{report_model._meta.model_name}')
+
+
+def index_message(sender, instance, created, update_fields=None, **kwargs):
+    if search.indexed_fields_saved(sender, update_fields):
+        search.index_object('message', instance.id, search.message_document(instance), created)
+
+
+def index_grocery(sender, instance, created, update_fields=None, **kwargs):
+    if search.indexed_fields_saved(sender, update_fields):
+        search.index_object('grocery', instance.id, search.grocery_document(instance), created)
+
+
+def index_user(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Reindex a user whose name or email may have changed (not on login,
+    which saves only last_login)
+    A new user is indexed by its profile's post_save instead, which follows
+    straight away (create_user_profile) and knows the room number
+    """
+    if not created and search.indexed_fields_saved(sender, update_fields):
+        search.index_object('user', instance.id, search.user_document(instance))
+
+
+def index_profile_user(sender, instance, update_fields=None, **kwargs):
+    # Even a new profile may belong to a user indexed before it had one
+    if search.indexed_fields_saved(sender, update_fields):
+        search.index_object('user', instance.user_id, search.user_document(instance.user, instance))
+
+
+def unindex(sender, instance, **kwargs):
+    search.unindex_object(sender._meta.model_name, instance.id)
+
+
+for indexed_model, index_handler in ((Message, index_message), (Grocery, index_grocery),
+                                     (User, index_user), (UserProfile, index_profile_user)):
+    post_save.connect(index_handler, sender=indexed_model,
+                      dispatch_uid=f'search_index_save_{indexed_model._meta.model_name}')
+for indexed_model in (Message, Grocery, User):
+    post_delete.connect(unindex, sender=indexed_model,
+                        dispatch_uid=f'search_index_delete_{indexed_model._meta.model_name}')
@@ -0,0 +1,79 @@
+"""
+Opt-in SQLite tuning for small single-node deployments
+
+With SQLITE_TUNING = True every new SQLite connection gets the PRAGMAs in
+SQLITE_PRAGMAS (see settings.py):
+
+- journal_mode=WAL:     readers no longer block the writer or each other, so
+                        gunicorn workers only serialize on writes
+- synchronous=NORMAL:   fsync at checkpoints instead of every commit; safe
+                        with WAL, a power cut can lose only the last commits
+- mmap_size/cache_size: read hot pages from memory instead of syscalls
+- busy_timeout:         wait for the write lock instead of failing straight
+                        away with "database is locked"
+
+Atomic blocks also start with BEGIN IMMEDIATE, taking the write lock up
+front. A plain (deferred) BEGIN that reads and then writes can't upgrade
+its lock once another worker has committed, and SQLite fails it at once
+without waiting out busy_timeout. Django 5.1's OPTIONS
+{'transaction_mode': 'IMMEDIATE'} does the same.
+
+journal_mode is stored in the database file; the others last for the
+connection. Run `manage.py optimize` now and then to VACUUM and ANALYZE.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # negative: KiB rather than pages
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+def get_pragmas():
+    """DEFAULT_PRAGMAS updated with settings.SQLITE_PRAGMAS"""
+    return {**DEFAULT_PRAGMAS, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+
+def apply_pragmas(connection, pragmas=None):
+    """
+    Set PRAGMAs on an open Django SQLite connection
+
+    Returns:
+        dict mapping each PRAGMA to the value SQLite reports afterwards
+    """
+    applied = {}
+    with connection.cursor() as cursor:
+        for name, value in (pragmas or get_pragmas()).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            applied[name] = row[0] if row else None
+    return applied
+
+
+def _begin_immediate(execute, sql, params, many, context):
+    if sql == 'BEGIN':
+        sql = 'BEGIN IMMEDIATE'
+    return execute(sql, params, many, context)
+
+
+def _tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_TUNING', False):
+        return
+    # In-memory databases (the test database) have no journal to tune
+    if connection.is_in_memory_db():
+        return
+    if _begin_immediate not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_begin_immediate)
+    # A pooled connection handed out again keeps its PRAGMAs
+    if getattr(connection, 'pooled_connection_is_new', True):
+        apply_pragmas(connection)
+
+
+connection_created.connect(_tune_sqlite_connection)
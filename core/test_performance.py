@@ -0,0 +1,229 @@
+"""
+Performance regression tests
+
+Seeds a realistic dataset once - 200 members with 24 months of payments,
+groceries and fixed expenses, thousands of messages and activity logs - and
+requests every URL name in core/urls.py, asserting a fixed query budget and a
+wall-clock ceiling for each response, the PDF and Excel exports included.
+
+Query budgets are exact upper bounds taken with cold caches, so a view that
+starts issuing a query per row fails here long before it reaches production.
+Ceilings are loose enough for a slow CI machine; PERF_CEILING_SCALE in the
+environment multiplies them (e.g. 3 under coverage).
+"""
+import logging
+import os
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .meal_feed import make_feed_token
+from .models import FixedExpense, Grocery, MealPlan, Message, Payment, UserProfile
+from .perf_data import recent_months, seed_perf_data
+
+
+# One timing log line per request would drown the test output
+logging.getLogger('core.request_timing').setLevel(logging.WARNING)
+
+MEMBERS = 200
+MONTHS = 24
+GROCERIES_PER_MONTH = 40
+MESSAGES = 3000
+ACTIVITY_LOGS = 6000
+
+CEILING_SCALE = float(os.environ.get('PERF_CEILING_SCALE', '1'))
+
+# Wall-clock ceilings in milliseconds
+PAGE_MS = 1500
+EXPORT_MS = 3000
+
+
+def route(role, queries, args=None, method='get', data=None, status=200, ms=PAGE_MS):
+    """
+    One entry of ROUTES
+
+    Args:
+        role: 'admin', 'user' or None (anonymous client)
+        queries: maximum number of SQL queries for the request
+        args: callable taking the test case and returning the URL args
+        method/data: how the request is made (a dict of data is sent as a
+            query string or form, anything else as a JSON body)
+        status: expected response status
+        ms: wall-clock ceiling in milliseconds (before PERF_CEILING_SCALE)
+    """
+    return {'role': role, 'queries': queries, 'args': args, 'method': method,
+            'data': data, 'status': status, 'ms': ms}
+
+
+# Every URL name in core/urls.py; a new URL fails test_every_url_has_a_budget
+# until it gets an entry here
+ROUTES = {
+    # Public and authentication
+    'landing_page': route(None, 0),
+    'role_selection': route(None, 0),
+    'login': route(None, 0, status=302),
+    'logout': route(None, 0, status=302),
+    'dashboard': route('user', 3, status=302),
+    'admin_login': route(None, 0),
+    'password_reset': route(None, 0),
+    'password_reset_done': route(None, 0),
+    'password_reset_confirm': route(None, 7, status=302, args=lambda t: t.reset_args()),
+    'password_reset_complete': route(None, 0),
+
+    # Admin pages
+    'admin_dashboard': route('admin', 10),
+    'user_list': route('admin', 4),
+    'user_create': route('admin', 3),
+    'user_edit': route('admin', 5, args=lambda t: [t.member.profile.id]),
+    'user_delete': route('admin', 5, args=lambda t: [t.member.profile.id]),
+    'payment_list': route('admin', 5),
+    'payment_create': route('admin', 4),
+    'payment_edit': route('admin', 5, args=lambda t: [t.payment.id]),
+    'payment_delete': route('admin', 5, args=lambda t: [t.payment.id]),
+    'send_payment_reminder': route('admin', 10, status=302, args=lambda t: [t.payment.id]),
+    'remind_all_pending': route('admin', 10, method='post', data='{}', status=302),
+    'grocery_list': route('admin', 6),
+    'grocery_create': route('admin', 3),
+    'grocery_edit': route('admin', 4, args=lambda t: [t.grocery.id]),
+    'grocery_delete': route('admin', 4, args=lambda t: [t.grocery.id]),
+    'expense_list': route('admin', 4),
+    'expense_create': route('admin', 3),
+    'expense_edit': route('admin', 4, args=lambda t: [t.expense.id]),
+    'expense_delete': route('admin', 4, args=lambda t: [t.expense.id]),
+    # Renders every user message unpaginated, so it grows with the table
+    'admin_messages': route('admin', 4, ms=EXPORT_MS),
+    'message_resolve': route('admin', 5, status=302, args=lambda t: [t.message.id]),
+    'message_reply': route('admin', 5, args=lambda t: [t.message.id]),
+    # Half the messages match both words: the ranking reads every one of their index rows
+    'admin_search': route('admin', 8, data={'q': 'lorem ipsu'}),
+    'meal_calendar': route('admin', 5),
+    'meal_plan_create': route('admin', 3),
+    'meal_plan_bulk': route('admin', 3),
+    'meal_plan_edit': route('admin', 4, args=lambda t: [t.meal_plan.id]),
+    'meal_plan_delete': route('admin', 5, status=302, args=lambda t: [t.meal_plan.id]),
+    'admin_settings': route('admin', 4),
+    'request_timings': route('admin', 3, status=404),
+
+    # Member pages
+    'user_dashboard': route('user', 7),
+    'user_payment': route('user', 5),
+    'user_messages_list': route('user', 4),
+    'user_send_message': route('user', 4),
+    'user_message_reply': route('user', 4, args=lambda t: [t.message.id]),
+    'user_meal_calendar': route('user', 5),
+    'meal_plan_feed': route(None, 2, args=lambda t: [make_feed_token(t.member)]),
+    'transparent_data': route('user', 9),
+    'save_theme_preference': route('user', 4, method='post', data='{"dark_mode": true}'),
+    'profile_settings': route('user', 3),
+    'user_settings': route('user', 5),
+
+    # Reports and exports
+    # Budgets for rendering live; a report generated ahead of time is streamed after 5
+    'monthly_report': route('admin', 11, ms=EXPORT_MS),
+    'user_receipt': route('user', 4, ms=EXPORT_MS),
+    'export_payments_excel': route('admin', 4, ms=EXPORT_MS),
+    'export_groceries_excel': route('admin', 4, ms=EXPORT_MS),
+    'export_monthly_report_excel': route('admin', 8, ms=EXPORT_MS),
+
+    # JSON API
+    'api_dashboard': route('admin', 9),
+    'api_my_payment': route('user', 4),
+    'api_messages': route('user', 4),
+    # The ETag's meal plan stamp is one aggregate; a 304 skips the rest
+    'api_meal_plans': route('user', 5),
+    'api_transparent_data': route('user', 6),
+}
+
+
+def core_url_names():
+    resolver = get_resolver('core.urls')
+    return {pattern.name for pattern in resolver.url_patterns
+            if isinstance(pattern, URLPattern) and pattern.name}
+
+
+@override_settings(
+    # Rendering pages in tests must not depend on a collectstatic manifest
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+class PerformanceBudgetTests(TestCase):
+    """Query budgets and response time ceilings for every page on a full dataset"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_perf_data(users=MEMBERS, months=MONTHS, groceries_per_month=GROCERIES_PER_MONTH,
+                       messages=MESSAGES, activity_logs=ACTIVITY_LOGS, seed=37, prefix='member')
+        months = recent_months(MONTHS)
+
+        cls.admin = User.objects.create_user('admin1', first_name='Admin')
+        UserProfile.objects.filter(user=cls.admin).update(role='admin')
+
+        cls.member = User.objects.get(username='member0')
+        cls.payment = Payment.objects.filter(user=cls.member).latest('month_year')
+        cls.grocery = Grocery.objects.filter(month_year=months[-1]).first()
+        cls.expense = FixedExpense.objects.get(month_year=months[-1])
+        cls.meal_plan = MealPlan.objects.filter(date__gte=date.today()).first()
+        cls.message = Message.objects.create(user=cls.member, subject='Question', message='Hello',
+                                             admin_reply='Hi', replied_at=timezone.now())
+
+    def reset_args(self):
+        # The token covers last_login, so make it after any earlier login
+        self.member.refresh_from_db()
+        return [urlsafe_base64_encode(force_bytes(self.member.pk)),
+                default_token_generator.make_token(self.member)]
+
+    def request(self, name, spec):
+        args = spec['args'](self) if spec['args'] else None
+        url = reverse(name, args=args)
+        send = getattr(self.client, spec['method'])
+        if isinstance(spec['data'], dict):
+            return send(url, spec['data'])
+        if spec['data'] is not None:
+            return send(url, spec['data'], content_type='application/json')
+        return send(url)
+
+    def login_as(self, role):
+        self.client.logout()
+        if role == 'admin':
+            self.client.force_login(self.admin)
+        elif role == 'user':
+            self.client.force_login(self.member)
+
+    def test_every_url_has_a_budget(self):
+        self.assertEqual(core_url_names() - set(ROUTES), set())
+        self.assertEqual(set(ROUTES) - core_url_names(), set())
+
+    def test_query_budgets_and_ceilings(self):
+        for name, spec in ROUTES.items():
+            with self.subTest(name):
+                self.login_as(spec['role'])
+
+                # Warm imports and template loading in a rolled-back savepoint,
+                # then measure with cold caches
+                with transaction.atomic():
+                    self.request(name, spec)
+                    transaction.set_rollback(True)
+                cache.clear()
+
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = self.request(name, spec)
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                queries = [query['sql'] for query in captured]
+
+                self.assertEqual(response.status_code, spec['status'])
+                self.assertLessEqual(
+                    len(queries), spec['queries'],
+                    f'{name} ran {len(queries)} queries (budget {spec["queries"]}):\n' + '\n'.join(queries)
+                )
+                self.assertLess(elapsed_ms, spec['ms'] * CEILING_SCALE,
+                                f'{name} took {elapsed_ms:.0f} ms')
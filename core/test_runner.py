@@ -0,0 +1,29 @@
+"""
+Test runner for mess management system
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+# Tests clear the cache freely; keep them off the project's file cache or Redis
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mess-tests',
+    }
+}
+
+
+class TestRunner(DiscoverRunner):
+    """Django's runner, with N+1 queries failing the test that caused them"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.NPLUSONE_MODE = 'raise'
+        self._test_caches = override_settings(CACHES=TEST_CACHES)
+        self._test_caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_caches.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,14 @@
+"""
+URLconf serving the async dashboards, for AsyncDashboardTests
+"""
+from django.urls import include, path
+
+from . import views
+
+
+urlpatterns = [
+    path('manage/dashboard/', views.admin_dashboard_async, name='admin_dashboard'),
+    path('user/dashboard/', views.user_dashboard_async, name='user_dashboard'),
+    path('user/data/', views.transparent_data_async, name='transparent_data'),
+    path('', include('mess_management.urls')),
+]
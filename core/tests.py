@@ -1,3 +1,1398 @@
-from django.test import TestCase
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO, StringIO
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteWrapper
+from django.db.migrations.loader import MigrationLoader
+from django.template import engines
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from mess_management.release import migrations_on_disk, pending_migrations
+
+from . import db_router, email_templates, health, login_throttle, monthly_reports, search
+from .cache_versions import get_data_versions
+from .meal_calendar import apply_meal_plan_template, get_month_calendar, month_bounds
+from .meal_feed import make_feed_token
+from . import views
+from .concurrent_queries import gather_queries
+from .db_backends.sqlite3.base import DatabaseWrapper as PooledSQLiteWrapper
+from .db_pool import ConnectionPool, PoolTimeout, get_pool, pool_stats
+from .sqlite_tuning import DEFAULT_PRAGMAS
+from .nplusone import NPlusOneError, start_tracking, stop_tracking
+from .models import (ActivityLog, FixedExpense, Grocery, MealPlan, MessSettings, Message, MonthlyReport, Payment,
+                     PaymentReminder, ReportEmail, SearchTerm, UserProfile, UserSettings)
+from .reminders import due_tier
+from .request_timing import get_view_stats, reset_view_stats
+from .warmup import WARM_TEMPLATES, warm_up
+
+
+# One timing log line per request would drown the test output
+logging.getLogger('core.request_timing').setLevel(logging.WARNING)
+
+# Rendering pages in tests must not depend on a collectstatic manifest
+plain_static = override_settings(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+
+
+class MealCalendarTests(TestCase):
+    """Tests for the shared meal calendar builder"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_month_bounds_is_half_open(self):
+        self.assertEqual(month_bounds(2025, 2), (date(2025, 2, 1), date(2025, 3, 1)))
+        self.assertEqual(month_bounds(2025, 12), (date(2025, 12, 1), date(2026, 1, 1)))
+
+    def test_cells_hold_meal_plans_for_the_month_only(self):
+        MealPlan.objects.create(date=date(2025, 3, 1), lunch='Rice')
+        MealPlan.objects.create(date=date(2025, 3, 31), dinner='Roti')
+        MealPlan.objects.create(date=date(2025, 4, 1), lunch='Dal')
+
+        data = get_month_calendar(2025, 3)
+        cells = data['cells']
+        self.assertEqual(len(cells) % 7, 0)
+        # 1 March 2025 is a Saturday, so the first row has six blanks
+        self.assertEqual([c['day'] for c in cells[:7]], [0, 0, 0, 0, 0, 0, 1])
+
+        meals = {c['day']: c['meal'] for c in cells if c['meal']}
+        self.assertEqual(set(meals), {1, 31})
+        self.assertEqual(meals[1]['lunch'], 'Rice')
+        self.assertEqual((data['prev_year'], data['prev_month']), (2025, 2))
+        self.assertEqual((data['next_year'], data['next_month']), (2025, 4))
+
+    def test_cached_month_is_rebuilt_after_changes(self):
+        plan = MealPlan.objects.create(date=date(2025, 3, 5), lunch='Rice')
+        get_month_calendar(2025, 3)
+
+        with self.assertNumQueries(1):
+            get_month_calendar(2025, 3)
+
+        plan.lunch = 'Biryani'
+        plan.save()
+        meals = [c['meal'] for c in get_month_calendar(2025, 3)['cells'] if c['meal']]
+        self.assertEqual(meals[0]['lunch'], 'Biryani')
+
+        MealPlan.objects.create(date=date(2025, 3, 2), lunch='Poha')
+        plan.delete()
+        meals = [c['meal'] for c in get_month_calendar(2025, 3)['cells'] if c['meal']]
+        self.assertEqual([m['lunch'] for m in meals], ['Poha'])
+
+    @plain_static
+    def test_calendar_views_render(self):
+        MealPlan.objects.create(date=date(2025, 3, 5), lunch='Rice')
+        admin = User.objects.create_user('admin1', password='pass12345')
+        UserProfile.objects.filter(user=admin).update(role='admin')
+        User.objects.create_user('member1', password='pass12345')
+
+        self.client.login(username='admin1', password='pass12345')
+        response = self.client.get(reverse('meal_calendar'), {'year': 2025, 'month': 3})
+        self.assertContains(response, 'Rice')
+        self.assertContains(response, reverse('meal_plan_create') + '?date=2025-03-01')
+
+        self.client.login(username='member1', password='pass12345')
+        response = self.client.get(reverse('user_meal_calendar'), {'year': 2025, 'month': 3})
+        self.assertContains(response, 'Rice')
+
+
+class MealPlanFeedTests(TestCase):
+    """Tests for the tokenized iCalendar meal plan feed"""
+
+    def setUp(self):
+        self.member = User.objects.create_user('member1', password='pass12345')
+        self.url = reverse('meal_plan_feed', args=[make_feed_token(self.member)])
+
+    def test_feed_lists_meals_in_window(self):
+        today = timezone.localdate()
+        MealPlan.objects.create(date=today, breakfast='Poha, tea', dinner='Dal')
+        MealPlan.objects.create(date=today - timedelta(days=400), lunch='Ancient')
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('SUMMARY:Breakfast: Poha\\, tea', body)
+        self.assertIn('SUMMARY:Dinner: Dal', body)
+        self.assertNotIn('Ancient', body)
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+
+    def test_unchanged_feed_returns_not_modified(self):
+        plan = MealPlan.objects.create(date=timezone.localdate(), lunch='Rice')
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        plan.lunch = 'Biryani'
+        plan.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_forged_or_inactive_token_is_rejected(self):
+        self.assertEqual(self.client.get(self.url + 'x').status_code, 404)
+        self.assertEqual(
+            self.client.get(reverse('meal_plan_feed', args=['1:forged'])).status_code, 404
+        )
+        UserProfile.objects.filter(user=self.member).update(is_active=False)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class MealPlanBulkTests(TestCase):
+    """Tests for copying weeks/months of meal plans in bulk"""
+
+    def setUp(self):
+        # 2 March 2025 is a Sunday
+        for offset, dish in enumerate(['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']):
+            MealPlan.objects.create(date=date(2025, 3, 2) + timedelta(days=offset), lunch=dish)
+
+    def test_week_rotation_lines_up_weekdays(self):
+        # Savepoint, source read, target read, one upsert, release
+        with self.assertNumQueries(5):
+            summary = apply_meal_plan_template(
+                'week', date(2025, 3, 4), date(2025, 4, 1), date(2025, 4, 30)
+            )
+        self.assertEqual(summary, {'created': 30, 'updated': 0, 'skipped': 0, 'days': 30})
+        # 1 April 2025 is a Tuesday, 27 April a Sunday
+        self.assertEqual(MealPlan.objects.get(date=date(2025, 4, 1)).lunch, 'Tue')
+        self.assertEqual(MealPlan.objects.get(date=date(2025, 4, 27)).lunch, 'Sun')
+
+    def test_overwrite_upserts_existing_dates(self):
+        MealPlan.objects.create(date=date(2025, 4, 1), lunch='Old', notes='keep?')
+
+        summary = apply_meal_plan_template(
+            'week', date(2025, 3, 2), date(2025, 4, 1), date(2025, 4, 2), overwrite=False
+        )
+        self.assertEqual(summary, {'created': 1, 'updated': 0, 'skipped': 1, 'days': 2})
+        self.assertEqual(MealPlan.objects.get(date=date(2025, 4, 1)).lunch, 'Old')
+
+        summary = apply_meal_plan_template(
+            'week', date(2025, 3, 2), date(2025, 4, 1), date(2025, 4, 2)
+        )
+        self.assertEqual(summary, {'created': 0, 'updated': 2, 'skipped': 0, 'days': 2})
+        plan = MealPlan.objects.get(date=date(2025, 4, 1))
+        self.assertEqual((plan.lunch, plan.notes), ('Tue', None))
+
+    def test_month_copy_uses_day_of_month(self):
+        summary = apply_meal_plan_template(
+            'month', date(2025, 3, 15), date(2025, 5, 1), date(2025, 5, 31)
+        )
+        self.assertEqual(summary['created'], 7)
+        self.assertEqual(MealPlan.objects.get(date=date(2025, 5, 2)).lunch, 'Sun')
+
+
+class ApiTests(TestCase):
+    """Tests for the read-only JSON API"""
+
+    def setUp(self):
+        self.member = User.objects.create_user('member1', password='pass12345', first_name='Asha')
+        self.admin = User.objects.create_user('admin1', password='pass12345')
+        UserProfile.objects.filter(user=self.admin).update(role='admin')
+        self.month = datetime.now().strftime('%Y-%m')
+        cache.clear()
+
+    def test_requires_login(self):
+        response = self.client.get(reverse('api_dashboard'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'error': 'Authentication required'})
+
+    def test_dashboard_by_role_with_etag(self):
+        Payment.objects.create(user=self.member, month_year=self.month, amount=Decimal('2500'), status='paid')
+        Grocery.objects.create(item_name='Rice', quantity='5 kg', price=Decimal('300'),
+                               purchase_date=date.today(), month_year=self.month)
+        FixedExpense.objects.create(month_year=self.month, kitchen_rent=Decimal('1000'))
+
+        self.client.login(username='admin1', password='pass12345')
+        response = self.client.get(reverse('api_dashboard'))
+        data = response.json()
+        self.assertEqual(data['total_users'], 1)
+        self.assertEqual(Decimal(data['total_payments']), Decimal('2500'))
+        self.assertEqual(Decimal(data['total_expenses']), Decimal('1300'))
+
+        not_modified = self.client.get(reverse('api_dashboard'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+
+        self.client.login(username='member1', password='pass12345')
+        data = self.client.get(reverse('api_dashboard')).json()
+        self.assertEqual(data['payment_status'], 'paid')
+
+    def test_not_modified_before_any_data_query(self):
+        self.client.login(username='member1', password='pass12345')
+        url = reverse('api_transparent_data')
+        etag = self.client.get(url, {'month': '2025-03'})['ETag']
+
+        with CaptureQueriesContext(connection) as captured:
+            not_modified = self.client.get(url, {'month': '2025-03'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        data_tables = ('core_grocery', 'core_payment', 'core_fixedexpense')
+        self.assertFalse([q['sql'] for q in captured if any(table in q['sql'] for table in data_tables)])
+
+        self.assertEqual(self.client.get(url, {'month': '2025-04'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            Grocery.objects.create(item_name='Rice', quantity='5 kg', price=Decimal('300'),
+                                   purchase_date=date(2025, 3, 2), month_year='2025-03')
+        changed = self.client.get(url, {'month': '2025-03'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['groceries'][0]['item_name'], 'Rice')
+
+    def test_messages_keyset_pagination(self):
+        for i in range(5):
+            Message.objects.create(user=self.member, subject=f'Subject {i}', message='Hi')
+        self.client.login(username='member1', password='pass12345')
+
+        first = self.client.get(reverse('api_messages'), {'limit': 3}).json()
+        self.assertEqual([m['subject'] for m in first['results']], ['Subject 4', 'Subject 3', 'Subject 2'])
+        second = self.client.get(
+            reverse('api_messages'), {'limit': 3, 'before': first['next_cursor']}
+        ).json()
+        self.assertEqual([m['subject'] for m in second['results']], ['Subject 1', 'Subject 0'])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_meal_plans_and_transparent_data(self):
+        MealPlan.objects.create(date=date(2025, 3, 1), lunch='Rice')
+        MealPlan.objects.create(date=date(2025, 3, 2), lunch='Dal')
+        Payment.objects.create(user=self.member, month_year='2025-03', amount=Decimal('2500'), status='paid')
+        self.client.login(username='member1', password='pass12345')
+
+        data = self.client.get(
+            reverse('api_meal_plans'), {'start': '2025-03-01', 'end': '2025-03-31', 'limit': 1}
+        ).json()
+        self.assertEqual(data['results'][0]['lunch'], 'Rice')
+        self.assertEqual(data['next_cursor'], '2025-03-01')
+
+        response = self.client.get(reverse('api_meal_plans'), {'start': 'bad'})
+        self.assertEqual(response.status_code, 400)
+
+        data = self.client.get(reverse('api_transparent_data'), {'month': '2025-03'}).json()
+        self.assertEqual(data['payments'], [
+            {'amount': '2500.00', 'status': 'paid', 'first_name': 'Asha', 'last_name': ''}
+        ])
+        self.assertEqual(data['total_collected'], '2500.00')
+        self.assertIsNone(data['fixed_expense'])
+
+
+@plain_static
+class FragmentCacheTests(TestCase):
+    """Tests for version-keyed template fragment caching"""
+
+    def setUp(self):
+        cache.clear()
+        self.member = User.objects.create_user('member1', password='pass12345', first_name='Asha')
+        self.payment = Payment.objects.create(
+            user=self.member, month_year='2025-03', amount=Decimal('2500'), status='pending'
+        )
+        self.client.login(username='member1', password='pass12345')
+
+    def get_transparent_data(self):
+        return self.client.get(reverse('transparent_data'), {'month': '2025-03'})
+
+    def test_fragments_skip_queries_until_data_changes(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.get_transparent_data()
+        cold_queries = len(captured)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.get_transparent_data()
+        self.assertLess(len(captured), cold_queries)
+        self.assertContains(response, 'Pending')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.payment.status = 'paid'
+            self.payment.save()
+        self.assertContains(self.get_transparent_data(), 'badge-paid')
+
+    def test_login_does_not_invalidate_user_fragments(self):
+        before = get_data_versions()['user']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.login(username='member1', password='pass12345')
+        self.assertEqual(get_data_versions()['user'], before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.first_name = 'Asha Devi'
+            self.member.save()
+        self.assertNotEqual(get_data_versions()['user'], before)
+
+
+class ImportTimeBudgetTests(SimpleTestCase):
+    """Cold import of the WSGI app and URLconf must stay within budget"""
+
+    # Generous enough for a slow CI box; override with IMPORT_TIME_BUDGET_MS
+    BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', 1500))
+
+    # Only needed by the PDF/Excel views, which import them lazily
+    LAZY_MODULES = ('reportlab', 'openpyxl')
+
+    SCRIPT = (
+        "import json, sys\n"
+        "import mess_management.wsgi\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+        "print(json.dumps(sorted({m.split('.')[0] for m in sys.modules})))\n"
+    )
+
+    def test_wsgi_cold_import(self):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'mess_management.settings'}
+        env.pop('RAILWAY_ENVIRONMENT', None)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', self.SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+
+        loaded = set(json.loads(result.stdout.strip().splitlines()[-1]))
+        for module in self.LAZY_MODULES:
+            self.assertFalse(module in loaded, f'{module} is imported while loading the URLconf')
+
+        # "import time: self [us] | cumulative | name" - top-level names are not indented
+        imports = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if not name.startswith('  '):
+                imports.append((int(cumulative) / 1000, name.strip()))
+
+        total_ms = sum(ms for ms, _ in imports)
+        slowest = ', '.join(f'{name} {ms:.0f}ms' for ms, name in sorted(imports, reverse=True)[:5])
+        self.assertLess(
+            total_ms, self.BUDGET_MS,
+            f'Cold import took {total_ms:.0f}ms (budget {self.BUDGET_MS}ms); slowest: {slowest}'
+        )
+
+
+class WorkerWarmupTests(TestCase):
+    """Tests for the gunicorn worker warm-up and the MessSettings cache"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_mess_settings_cache_is_invalidated_on_save(self):
+        settings_obj = MessSettings.get_cached()
+        with self.assertNumQueries(0):
+            self.assertEqual(MessSettings.get_cached().mess_name, settings_obj.mess_name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_obj.mess_name = 'Hostel Mess'
+            settings_obj.save()
+        self.assertEqual(MessSettings.get_cached().mess_name, 'Hostel Mess')
+
+    # The test database connection must stay open for the rest of the test
+    @mock.patch('core.warmup.close_database_connections')
+    def test_warm_up_fills_caches(self, close_connections):
+        result = warm_up()
+
+        self.assertGreater(result['url_patterns'], 0)
+        self.assertEqual(result['templates'], len(WARM_TEMPLATES))
+        self.assertTrue(result['mess_settings'])
+        self.assertIsNotNone(cache.get(MessSettings.CACHE_KEY))
+        self.assertEqual(close_connections.call_count, 2)
+
+    @mock.patch('core.warmup.close_database_connections')
+    def test_master_warm_up_skips_the_database(self, close_connections):
+        with self.assertNumQueries(0):
+            result = warm_up(database=False)
+        self.assertNotIn('mess_settings', result)
+        self.assertIsNone(cache.get(MessSettings.CACHE_KEY))
+
+
+class ReleaseCheckTests(TestCase):
+    """Tests for the fast pending-migrations check run at release time"""
+
+    def test_disk_scan_matches_the_migration_loader(self):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        self.assertEqual(
+            migrations_on_disk(settings.INSTALLED_APPS, settings.MIGRATION_MODULES),
+            set(loader.disk_migrations),
+        )
+
+    def test_reports_unrecorded_migrations(self):
+        self.assertEqual(pending_migrations(), [])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM django_migrations WHERE app = 'core' AND name = '0001_initial'"
+            )
+        self.assertEqual(pending_migrations(), [('core', '0001_initial')])
+
+
+
+class PaymentReminderTests(TestCase):
+    """Tests for the tiered, idempotent run_reminders scheduler"""
+
+    def setUp(self):
+        cache.clear()
+        mess_settings = MessSettings.get_settings()
+        mess_settings.billing_day = 10
+        mess_settings.grace_period_days = 3
+        mess_settings.save()
+        self.mess_settings = MessSettings.get_settings()
+
+        self.emailed = User.objects.create_user('member1', email='member1@example.com', first_name='Asha')
+        self.opted_out = User.objects.create_user('member2', email='member2@example.com')
+        UserSettings.objects.create(user=self.opted_out, email_payment_reminders=False)
+        paid = User.objects.create_user('member3', email='member3@example.com')
+        for user, status in ((self.emailed, 'pending'), (self.opted_out, 'partial'), (paid, 'paid')):
+            Payment.objects.create(user=user, month_year='2026-03', amount=Decimal('1500.00'), status=status)
+
+    def run_reminders(self, day):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('run_reminders', date=day, stdout=StringIO())
+
+    def test_tier_schedule(self):
+        due = date(2026, 3, 10)
+        expected = {1: None, 3: 'first', 7: 'second', 9: 'final', 10: 'final', 12: None, 14: 'overdue'}
+        for day, tier in expected.items():
+            self.assertEqual(due_tier(due, date(2026, 3, day), self.mess_settings), tier, day)
+
+        self.mess_settings.send_overdue_reminders = False
+        self.assertIsNone(due_tier(due, date(2026, 4, 30), self.mess_settings))
+
+    def test_batched_and_idempotent(self):
+        versions = get_data_versions()
+        with CaptureQueriesContext(connection) as queries:
+            self.run_reminders('2026-03-07')
+        message_inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "core_message"')]
+        self.assertEqual(len(message_inserts), 1)
+        self.assertNotEqual(get_data_versions()['message'], versions['message'])
+
+        reminders = Message.objects.filter(message_type='system')
+        self.assertEqual(reminders.count(), 2)
+        self.assertEqual(set(reminders.values_list('subject', flat=True)), {'Second Payment Reminder - 2026-03'})
+        self.assertEqual([m.to for m in mail.outbox], [['member1@example.com']])
+        self.assertIn('Due Date: 10 Mar 2026', mail.outbox[0].body)
+        self.assertEqual(PaymentReminder.objects.filter(emailed_at__isnull=False).count(), 1)
+
+        # Running again the same day sends nothing more
+        self.run_reminders('2026-03-07')
+        self.assertEqual(reminders.count(), 2)
+        self.assertEqual(len(mail.outbox), 1)
+
+        self.run_reminders('2026-03-09')
+        self.assertEqual(reminders.filter(subject__startswith='Final').count(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(set(PaymentReminder.objects.values_list('tier', flat=True)), {'second', 'final'})
+
+    def test_emails_that_failed_are_retried(self):
+        with mock.patch('core.reminders.get_connection', side_effect=OSError('connection refused')), \
+                self.assertLogs('core.reminders', 'ERROR'):
+            self.run_reminders('2026-03-07')
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Message.objects.filter(message_type='system').count(), 2)
+
+        # Nothing new is due the same day, but the pending email goes out
+        self.run_reminders('2026-03-07')
+        self.assertEqual([m.to for m in mail.outbox], [['member1@example.com']])
+        self.run_reminders('2026-03-07')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(Message.objects.filter(message_type='system').count(), 2)
+
+        # Reminders created without email aren't emailed later
+        call_command('run_reminders', date='2026-03-09', no_email=True, stdout=StringIO())
+        self.run_reminders('2026-03-09')
+        self.assertEqual(len(mail.outbox), 1)
+
+    @plain_static
+    @override_settings(REMINDER_EMAILS_IN_BACKGROUND=False)
+    def test_remind_all_pending_in_one_request(self):
+        admin = User.objects.create_user('admin1', password='pass12345')
+        UserProfile.objects.filter(user=admin).update(role='admin')
+        self.client.force_login(admin)
+        url = reverse('remind_all_pending')
+
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'month': '2026-03', 'send_email': 'on'}, follow=True)
+        self.assertRedirects(response, reverse('payment_list') + '?month=2026-03')
+        self.assertContains(response, '2 reminders sent for 2026-03, 0 skipped')
+        message_inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "core_message"')]
+        self.assertEqual(len(message_inserts), 1)
+        self.assertEqual(Message.objects.filter(subject='Payment Reminder - 2026-03').count(), 2)
+        self.assertEqual([m.to for m in mail.outbox], [['member1@example.com']])
+
+        # A second click the same day reminds nobody twice
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'month': '2026-03', 'send_email': 'on'}, follow=True)
+        self.assertContains(response, '0 reminders sent for 2026-03, 2 skipped')
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class MonthlyReportTests(TestCase):
+    """Tests for reports rendered ahead of time by generate_monthly_reports"""
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        mess_settings = MessSettings.get_settings()
+        mess_settings.report_generation_day = 3
+        mess_settings.save()
+
+        self.member = User.objects.create_user('member1', first_name='Asha')
+        Payment.objects.create(user=self.member, month_year='2026-03', amount=Decimal('1500.00'), status='paid')
+        Grocery.objects.create(item_name='Rice', category='grains', quantity='10 kg',
+                               price=Decimal('600.00'), purchase_date=date(2026, 3, 5), month_year='2026-03')
+        admin = User.objects.create_user('admin1', password='pass12345')
+        UserProfile.objects.filter(user=admin).update(role='admin')
+        self.client.force_login(admin)
+
+    def generate(self, **options):
+        out = StringIO()
+        call_command('generate_monthly_reports', stdout=out, **options)
+        return out.getvalue()
+
+    def download(self, name):
+        response = self.client.get(reverse(name), {'month': '2026-03'})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_schedule(self):
+        self.assertIn('nothing to do', self.generate(date='2026-04-02'))
+        self.assertFalse(MonthlyReport.objects.exists())
+
+        self.assertIn('2026-03: rendered pdf, xlsx', self.generate(date='2026-04-03'))
+        self.assertEqual(sorted(MonthlyReport.objects.values_list('month_year', 'kind')),
+                         [('2026-03', 'pdf'), ('2026-03', 'xlsx')])
+        self.assertIn('stored reports are current', self.generate(date='2026-04-20'))
+
+        mess_settings = MessSettings.get_settings()
+        mess_settings.auto_generate_monthly_report = False
+        mess_settings.save()
+        self.assertIn('off in the mess settings', self.generate(date='2026-05-03'))
+        self.assertFalse(MonthlyReport.objects.filter(month_year='2026-04').exists())
+
+    def test_views_serve_stored_report_until_month_changes(self):
+        self.generate(month='2026-03')
+        stored = MonthlyReport.objects.get(kind='pdf')
+        with stored.file.open('rb') as file:
+            stored_pdf = file.read()
+
+        with mock.patch('core.pdf_reports.build_monthly_report_pdf') as render:
+            response = self.download('monthly_report')
+            self.assertEqual(b''.join(response.streaming_content), stored_pdf)
+            render.assert_not_called()
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="mess_report_2026-03.pdf"')
+
+        # A late grocery entry: the stored report no longer matches the month
+        Grocery.objects.create(item_name='Dal', category='other', quantity='5 kg',
+                               price=Decimal('400.00'), purchase_date=date(2026, 3, 28), month_year='2026-03')
+        self.assertTrue(MonthlyReport.objects.get(kind='pdf').stale)
+        self.assertFalse(self.download('monthly_report').streaming)
+
+        self.assertIn('rendered pdf, xlsx', self.generate(month='2026-03'))
+        self.assertTrue(self.download('monthly_report').streaming)
+
+    def test_change_while_rendering_leaves_the_report_stale(self):
+        render_report = monthly_reports.render_report
+
+        def render_during_a_save(kind, month_year, mess_settings):
+            content = render_report(kind, month_year, mess_settings)
+            # Another process saves a grocery of the month and commits
+            if kind == 'pdf':
+                Grocery.objects.create(item_name='Dal', category='other', quantity='5 kg', price=Decimal('400.00'),
+                                       purchase_date=date(2026, 3, 28), month_year='2026-03')
+                cache.set('data_version:grocery', time.time_ns())
+            return content
+
+        with mock.patch('core.monthly_reports.render_report', side_effect=render_during_a_save):
+            self.generate(month='2026-03')
+        self.assertEqual(dict(MonthlyReport.objects.values_list('kind', 'stale')), {'pdf': True, 'xlsx': False})
+        self.assertFalse(self.download('monthly_report').streaming)
+
+        self.assertIn('rendered pdf', self.generate(month='2026-03'))
+        self.assertTrue(self.download('monthly_report').streaming)
+
+    def test_include_flags(self):
+        from openpyxl import load_workbook
+
+        mess_settings = MessSettings.get_settings()
+        mess_settings.include_payment_details = False
+        with self.captureOnCommitCallbacks(execute=True):
+            mess_settings.save()
+        self.generate(month='2026-03')
+
+        response = self.download('export_monthly_report_excel')
+        self.assertTrue(response.streaming)
+        workbook = load_workbook(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(workbook.sheetnames, ['Summary', 'Groceries'])
+
+        # Reports rendered under other flags aren't served
+        mess_settings.include_payment_details = True
+        with self.captureOnCommitCallbacks(execute=True):
+            mess_settings.save()
+        response = self.download('export_monthly_report_excel')
+        self.assertFalse(response.streaming)
+        self.assertEqual(load_workbook(BytesIO(response.content)).sheetnames, ['Summary', 'Payments', 'Groceries'])
+
+
+@override_settings(REPORT_EMAIL_BATCH_SIZE=2, REPORT_EMAIL_BATCH_PAUSE=0)
+class ReportMailerTests(TestCase):
+    """Tests for the batched, resumable monthly report mailer"""
+
+    def setUp(self):
+        mess_settings = MessSettings.get_settings()
+        mess_settings.report_generation_day = 3
+        mess_settings.save()
+
+        for i, status in enumerate(('paid', 'pending', 'paid', 'partial'), 1):
+            user = User.objects.create_user(f'member{i}', email=f'member{i}@example.com', first_name=f'M{i}')
+            Payment.objects.create(user=user, month_year='2026-03', amount=Decimal('1500.00'), status=status)
+        UserSettings.objects.create(user=User.objects.get(username='member4'), email_monthly_reports=False)
+        FixedExpense.objects.create(month_year='2026-03', kitchen_rent=Decimal('5000.00'))
+
+    def send(self, **options):
+        out = StringIO()
+        call_command('send_monthly_reports', stdout=out, **options)
+        return out.getvalue()
+
+    def test_batches_share_a_connection(self):
+        self.assertIn('nothing to do', self.send(date='2026-04-02'))
+
+        with mock.patch('core.report_mailer.get_connection', wraps=mail.get_connection) as get_connection:
+            output = self.send(date='2026-04-03')
+        self.assertIn('3 report emails sent', output)
+        self.assertEqual(get_connection.call_count, 2)
+
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox),
+                         ['member1@example.com', 'member2@example.com', 'member3@example.com'])
+        receipt = mail.outbox[0].attachments[0]
+        self.assertEqual(receipt[0], 'receipt_member1_2026-03.pdf')
+        self.assertTrue(receipt[1].startswith(b'%PDF'))
+        self.assertIn('Fixed Expenses: ₹5000.00', mail.outbox[0].body)
+
+        # Everyone has had the email; later runs send nothing
+        self.assertIn('0 report emails sent', self.send(date='2026-04-04'))
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_resumes_where_it_stopped(self):
+        self.assertIn('1 report emails sent', self.send(month='2026-03', limit=1))
+        self.assertEqual(ReportEmail.objects.filter(status='pending').count(), 2)
+
+        send_messages = mail.get_connection().__class__.send_messages
+
+        def reject_member3(backend, messages):
+            if messages[0].to == ['member3@example.com']:
+                raise ConnectionError('mailbox unavailable')
+            return send_messages(backend, messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', reject_member3), \
+                self.assertLogs('core.report_mailer', 'WARNING'):
+            output = self.send(month='2026-03')
+        self.assertIn('1 report emails sent', output)
+        self.assertIn('1 emails failed', output)
+        failed = ReportEmail.objects.get(user__username='member3')
+        self.assertEqual((failed.status, failed.attempts, failed.last_error), ('pending', 1, 'mailbox unavailable'))
+
+        self.assertIn('1 report emails sent in', self.send(month='2026-03'))
+        self.assertEqual([m.to[0] for m in mail.outbox],
+                         ['member1@example.com', 'member2@example.com', 'member3@example.com'])
+        self.assertFalse(ReportEmail.objects.exclude(status='sent').exists())
+
+
+@plain_static
+class EmailTemplateTests(TestCase):
+    """Tests for the template-based HTML emails and their text parts"""
+
+    def test_shell_rendered_once_per_title(self):
+        email_templates._email_shell.cache_clear()
+        text, html = email_templates.render_email('welcome', {
+            'user_name': 'Asha <b>', 'email': 'asha@example.com', 'username': 'asha'})
+        email_templates.render_email('welcome', {'user_name': 'Ravi', 'email': 'r@example.com', 'username': 'ravi'})
+        self.assertEqual(email_templates._email_shell.cache_info().misses, 1)
+
+        self.assertTrue(html.lstrip().startswith('<!DOCTYPE html>'))
+        self.assertIn('<title>Welcome to Mess Management</title>', html)
+        self.assertIn('Welcome, Asha &lt;b&gt;!', html)
+        self.assertIn('Dear Asha <b>,', text)
+        self.assertIn('- Username: asha', text)
+
+    def test_password_reset_text_part_has_its_own_template(self):
+        User.objects.create_user('member1', email='member1@example.com', password='pass12345')
+        self.client.post(reverse('password_reset'), {'email': 'member1@example.com'})
+        self.client.post(reverse('password_reset'), {'email': 'nobody@example.com'})
+
+        reset, not_found = mail.outbox
+        self.assertIn('Username: member1', reset.body)
+        self.assertIn('/password-reset-confirm/', reset.body)
+        self.assertNotIn('<', reset.body)
+        self.assertIn('<!DOCTYPE html>', reset.alternatives[0][0])
+        self.assertIn('(nobody@example.com)', not_found.body)
+        self.assertIn('<strong style="background: white;', not_found.alternatives[0][0])
+
+
+@plain_static
+class LoginThrottleTests(TestCase):
+    """Tests for the cache-backed failed-login lockout"""
+
+    def setUp(self):
+        cache.clear()
+        mess_settings = MessSettings.get_settings()
+        mess_settings.max_login_attempts = 3
+        mess_settings.lockout_duration_minutes = 10
+        mess_settings.save()
+
+        self.admin = User.objects.create_user('admin1', email='admin1@example.com', password='pass12345')
+        UserProfile.objects.filter(user=self.admin).update(role='admin')
+        User.objects.create_user('member1', email='member1@example.com', password='pass12345')
+        self.addCleanup(login_throttle._pending_lockouts.clear)
+
+    def admin_login(self, password, username='admin1', ip='10.0.0.1'):
+        return self.client.post(reverse('admin_login'), {'username': username, 'password': password},
+                                REMOTE_ADDR=ip, follow=True)
+
+    def test_locked_out_attempts_skip_password_hashing(self):
+        with self.assertLogs('core.login_throttle', 'WARNING'):
+            for _ in range(3):
+                self.assertContains(self.admin_login('wrong'), 'Invalid admin credentials.')
+
+        with mock.patch('django.contrib.auth.base_user.check_password') as check_password:
+            response = self.admin_login('pass12345')
+        check_password.assert_not_called()
+        self.assertContains(response, 'Too many failed login attempts. Please try again in 10 minutes.')
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+        # Other accounts aren't affected; the lockout goes to the activity log
+        self.assertEqual(self.client.post(reverse('account_login'), {'login': 'member1', 'password': 'pass12345'},
+                                          REMOTE_ADDR='10.0.0.1').status_code, 302)
+        self.assertEqual(login_throttle.flush_lockout_log(), 1)
+        self.assertTrue(ActivityLog.objects.filter(user=self.admin, description__contains='locked out').exists())
+
+    def test_success_clears_failures(self):
+        self.admin_login('wrong')
+        self.admin_login('wrong')
+        self.assertRedirects(self.admin_login('pass12345'), reverse('admin_dashboard'))
+        self.client.logout()
+        self.admin_login('wrong')
+        self.admin_login('wrong')
+        self.assertRedirects(self.admin_login('pass12345'), reverse('admin_dashboard'))
+
+    @override_settings(LOGIN_THROTTLE_IP_FAILURES=4)
+    def test_ip_limit_spans_usernames(self):
+        with self.assertLogs('core.login_throttle', 'WARNING'):
+            for i in range(4):
+                self.admin_login('wrong', username=f'guess{i}')
+
+        response = self.client.post(reverse('account_login'), {'login': 'member1', 'password': 'pass12345'},
+                                    REMOTE_ADDR='10.0.0.1')
+        self.assertContains(response, 'Too many failed login attempts.')
+        self.assertRedirects(self.admin_login('pass12345', ip='10.0.0.2'), reverse('admin_dashboard'))
+
+    def test_username_and_email_share_one_counter(self):
+        with self.assertLogs('core.login_throttle', 'WARNING'):
+            for login in ('admin1', 'Admin1@Example.com', 'admin1'):
+                self.admin_login('wrong', username=login, ip=f'10.0.0.{len(login)}')
+        response = self.admin_login('pass12345', username='admin1@example.com', ip='10.0.0.9')
+        self.assertContains(response, 'Too many failed login attempts.')
+
+    @override_settings(LOGIN_THROTTLE_IP_FAILURES=2)
+    def test_spoofed_forwarded_for_is_ignored(self):
+        # The proxy appends the real address; a client rotating a fake first
+        # entry is still counted as one IP
+        with self.assertLogs('core.login_throttle', 'WARNING'):
+            for i in range(2):
+                self.client.post(reverse('admin_login'), {'username': f'guess{i}', 'password': 'wrong'},
+                                 HTTP_X_FORWARDED_FOR=f'1.2.3.{i}, 203.0.113.9', REMOTE_ADDR='10.0.0.1')
+
+        response = self.client.post(reverse('account_login'), {'login': 'member1', 'password': 'pass12345'},
+                                    HTTP_X_FORWARDED_FOR='1.2.3.99, 203.0.113.9', REMOTE_ADDR='10.0.0.1')
+        self.assertContains(response, 'Too many failed login attempts.')
+
+
+class SearchTests(TestCase):
+    """Tests for the admin search index and its signals"""
+
+    def setUp(self):
+        self.member = User.objects.create_user('asha', first_name='Asha', last_name='Verma',
+                                               email='asha.v@example.com')
+        profile = self.member.profile
+        profile.room_no = 'B-204'
+        profile.save()
+
+    def found(self, query, kind=None):
+        return [(hit.kind, hit.object.id) for hit in search.search(query, kind=kind)]
+
+    def test_signals_keep_the_index_current(self):
+        message = Message.objects.create(user=self.member, subject='Leaking tap',
+                                         message='The kitchen tap drips all night')
+        rice = Grocery.objects.create(item_name='Basmati Rice', category='grains', quantity='10 kg',
+                                      price=Decimal('900.00'), purchase_date=date(2026, 3, 5), month_year='2026-03')
+        Message.objects.create(user=self.member, subject='Payment reminder', message='Tap to pay',
+                               message_type='system')
+
+        self.assertEqual(self.found('tap'), [('message', message.id)])
+        self.assertEqual(self.found('basmati'), [('grocery', rice.id)])
+        self.assertEqual(self.found('b 204'), [('user', self.member.id)])
+        self.assertEqual(self.found('asha.v@example.com'), [('user', self.member.id)])
+
+        message.admin_reply = 'Plumber booked for Monday'
+        message.subject = 'Dripping tap'
+        message.save()
+        self.assertEqual(self.found('plumber'), [('message', message.id)])
+        self.assertEqual(self.found('leaking'), [])
+
+        self.member.last_name = 'Rao'
+        self.member.save()
+        self.assertEqual(self.found('verma'), [])
+        self.assertEqual(self.found('asha rao'), [('user', self.member.id)])
+
+        rice.delete()
+        self.member.delete()
+        self.assertEqual(self.found('basmati') + self.found('tap'), [])
+        self.assertFalse(SearchTerm.objects.exists())
+
+    def test_ranking_prefix_and_every_word(self):
+        in_body = Message.objects.create(user=self.member, subject='Dinner', message='Too much salt in the dal')
+        in_subject = Message.objects.create(user=self.member, subject='Salt', message='Dal was too salty')
+        Grocery.objects.create(item_name='Salt', category='spices', quantity='1 kg', price=Decimal('25.00'),
+                               purchase_date=date(2026, 3, 5), month_year='2026-03')
+
+        self.assertEqual(self.found('salt', kind='message'), [('message', in_subject.id), ('message', in_body.id)])
+        self.assertEqual(len(self.found('sal')), 3)
+        self.assertEqual(self.found('dal sal'), [('message', in_subject.id), ('message', in_body.id)])
+        self.assertEqual(self.found('dinner salt'), [('message', in_body.id)])
+        self.assertEqual(self.found('dinner pepper'), [])
+        self.assertEqual(self.found('!!'), [])
+
+    @mock.patch.object(search, 'COMMON_WORD_LIMIT', 2)
+    @mock.patch.object(search, 'PROBE_LIMIT', 3)
+    def test_common_words_rank_only_their_newest_objects(self):
+        batches = [Grocery.objects.create(item_name=f'Rice batch {day}', category='grains', quantity='10 kg',
+                                          price=Decimal('600.00'), purchase_date=date(2026, 3, day),
+                                          month_year='2026-03')
+                   for day in range(1, 6)]
+
+        results = search.search('rice bat')
+        self.assertTrue(results.limited)
+        self.assertEqual([hit.object for hit in results], batches[:2:-1])
+
+        # A rare word drives the search, however common the others are
+        results = search.search('rice batch 2')
+        self.assertFalse(results.limited)
+        self.assertEqual([hit.object for hit in results], [batches[1]])
+
+    @plain_static
+    def test_room_changed_through_user_edit_is_searchable(self):
+        admin = User.objects.create_user('admin1')
+        UserProfile.objects.filter(user=admin).update(role='admin')
+        self.client.force_login(admin)
+
+        response = self.client.post(reverse('user_edit', args=[self.member.profile.id]), {
+            'username': 'asha', 'first_name': 'Asha', 'last_name': 'Verma', 'email': 'asha.v@example.com',
+            'phone': '9800000000', 'room_no': 'C-310', 'role': 'user',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.found('c 310'), [('user', self.member.id)])
+        self.assertEqual(self.found('204'), [])
+
+    @plain_static
+    def test_admin_search_page_is_paginated(self):
+        for day in range(1, 26):
+            Grocery.objects.create(item_name=f'Rice batch {day}', category='grains', quantity='10 kg',
+                                   price=Decimal('600.00'), purchase_date=date(2026, 3, day), month_year='2026-03')
+        admin = User.objects.create_user('admin1')
+        UserProfile.objects.filter(user=admin).update(role='admin')
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse('admin_search'), {'q': 'rice', 'kind': 'grocery'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['results'].paginator.count, 25)
+        self.assertEqual(len(response.context['results']), search.PER_PAGE)
+        self.assertContains(response, 'Rice batch 25')
+
+        response = self.client.get(reverse('admin_search'), {'q': 'rice', 'kind': 'grocery', 'page': 2})
+        self.assertEqual(len(response.context['results']), 5)
+        self.assertContains(response, 'Page 2 of 2')
+
+        # A rebuild reproduces what the signals maintained
+        indexed = sorted(SearchTerm.objects.values_list('kind', 'object_id', 'term', 'weight'))
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(sorted(SearchTerm.objects.values_list('kind', 'object_id', 'term', 'weight')), indexed)
+
+
+class SeedPerfDataTests(TestCase):
+    """Tests for the synthetic dataset generator"""
+
+    def seed(self, **options):
+        call_command('seed_perf_data', users=5, months=3, groceries_per_month=4, messages=10,
+                     activity_logs=10, stdout=StringIO(), **options)
+
+    def snapshot(self):
+        return (
+            list(Payment.objects.order_by('user__username', 'month_year')
+                 .values_list('user__username', 'month_year', 'status', 'amount')),
+            list(Message.objects.order_by('subject').values_list('user__username', 'subject', 'status')),
+        )
+
+    def test_generates_every_model_from_one_password_hash(self):
+        self.seed()
+
+        members = User.objects.filter(username__startswith='perf')
+        self.assertEqual(members.count(), 5)
+        self.assertEqual(len(set(members.values_list('password', flat=True))), 1)
+        self.assertTrue(members.first().check_password('perf-pass'))
+        self.assertEqual(UserProfile.objects.filter(user__in=members, role='user').count(), 5)
+        self.assertEqual(Payment.objects.count(), 15)
+        self.assertEqual(Grocery.objects.count(), 12)
+        self.assertEqual(FixedExpense.objects.count(), 3)
+        self.assertEqual(Message.objects.count(), 10)
+
+    def test_same_seed_same_data(self):
+        self.seed(seed=7)
+        first = self.snapshot()
+
+        with self.assertRaises(CommandError):
+            self.seed(seed=7)
+        self.seed(seed=7, clear=True)
+        self.assertEqual(self.snapshot(), first)
+        # Groceries belong to no member but go with the run all the same
+        self.assertEqual(Grocery.objects.count(), 12)
+
+
+
+class HealthCheckTests(TestCase):
+    """Tests for the /healthz and /readyz probes"""
+
+    @override_settings(SECURE_SSL_REDIRECT=True)
+    def test_liveness_skips_the_middleware_stack(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/healthz', HTTP_HOST='healthcheck.railway.app')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'ok')
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        self.assertNotIn('Server-Timing', response)
+        self.assertFalse(response.cookies)
+
+    def test_readiness_checks_database_and_cache(self):
+        response = self.client.get('/readyz', HTTP_HOST='healthcheck.railway.app')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok', 'checks': {'database': 'ok', 'cache': 'ok'}})
+
+    def test_cache_check_uses_a_key_of_its_own(self):
+        # Workers probing at once mustn't read back each other's value
+        with mock.patch.object(health.cache, 'set', wraps=health.cache.set) as cache_set:
+            health.check_cache()
+            health.check_cache()
+        first, second = (call.args[0] for call in cache_set.call_args_list)
+        self.assertNotEqual(first, second)
+        self.assertIsNone(cache.get(first))
+
+    def test_failing_or_slow_check_is_unavailable(self):
+        def broken():
+            raise ConnectionError('database is down')
+
+        with mock.patch.dict(health.CHECKS, database=broken), \
+                self.assertLogs('core.health', 'ERROR') as logs:
+            response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        # Anyone can call the probe: the details stay in the log
+        self.assertEqual(response.json()['checks']['database'], 'error')
+        self.assertNotContains(response, 'database is down', status_code=503)
+        self.assertIn('database is down', logs.output[0])
+
+        with mock.patch.dict(health.CHECKS, {'cache': lambda: time.sleep(0.5)}), \
+                self.assertLogs('core.health', 'ERROR'):
+            ready, checks = health.run_readiness_checks(timeout=0.1)
+        self.assertFalse(ready)
+        self.assertEqual(checks['cache'], 'timed out')
+
+
+
+@plain_static
+class ReplicaRouterTests(TestCase):
+    """Tests for read-replica routing, with a second SQLite file as the replica"""
+
+    def setUp(self):
+        logging.getLogger('core.request_timing').setLevel(logging.WARNING)
+        self.member = User.objects.create_user('member1', password='pass12345')
+        self.payment = Payment.objects.create(user=self.member, month_year=datetime.now().strftime('%Y-%m'),
+                                              amount=Decimal('100.00'))
+        self.client.force_login(self.member)
+
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        self.replica_path = os.path.join(workdir, 'replica.sqlite3')
+        # Replicate: a snapshot of the primary as it is now
+        snapshot = sqlite3.connect(self.replica_path)
+        snapshot.executescript('\n'.join(connection.connection.iterdump()))
+        snapshot.close()
+        self.use_replica(self.replica_path)
+        patcher = mock.patch.object(db_router, '_replica_down_until', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Replication lag: the replica hasn't seen this change yet
+        Payment.objects.filter(pk=self.payment.pk).update(amount=Decimal('250.00'))
+
+    def use_replica(self, name):
+        patcher = mock.patch.dict(connections.settings, {
+            db_router.REPLICA_DB_ALIAS: {**connection.settings_dict, 'NAME': name},
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(connections.__delitem__, db_router.REPLICA_DB_ALIAS)
+        self.addCleanup(lambda: connections[db_router.REPLICA_DB_ALIAS].close())
+
+    def test_designated_reads_go_to_the_replica(self):
+        with db_router.read_from_replica():
+            self.assertEqual(Payment.objects.get(pk=self.payment.pk).amount, Decimal('100.00'))
+        self.assertEqual(Payment.objects.get(pk=self.payment.pk).amount, Decimal('250.00'))
+
+        replica = connections[db_router.REPLICA_DB_ALIAS]
+        with CaptureQueriesContext(replica) as replica_queries:
+            response = self.client.get(reverse('transparent_data'))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(replica_queries), 0)
+        self.assertNotIn(db_router.PIN_COOKIE, response.cookies)
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        response = self.client.post(reverse('save_theme_preference'), data=json.dumps({'dark_mode': True}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies[db_router.PIN_COOKIE]['max-age'], settings.REPLICA_PIN_SECONDS)
+
+        replica = connections[db_router.REPLICA_DB_ALIAS]
+        with CaptureQueriesContext(replica) as replica_queries:
+            self.client.get(reverse('transparent_data'))
+        self.assertEqual(len(replica_queries), 0)
+
+        # Within one request, reads after a write see it too
+        state, token = db_router.start_request_routing(pinned=False)
+        try:
+            with db_router.read_from_replica():
+                Payment.objects.filter(pk=self.payment.pk).update(amount=Decimal('300.00'))
+                self.assertEqual(Payment.objects.get(pk=self.payment.pk).amount, Decimal('300.00'))
+        finally:
+            db_router.stop_request_routing(token)
+
+    def test_replica_pages_cache_briefly_and_reports_come_from_the_primary(self):
+        # A replica page's rows may predate the data version its fragments are keyed by
+        self.assertIsNone(db_router.versioned_cache_timeout())
+        response = self.client.get(reverse('transparent_data'))
+        self.assertEqual(response.context['fragment_timeout'], settings.REPLICA_CACHE_SECONDS)
+
+        replica = connections[db_router.REPLICA_DB_ALIAS]
+        with CaptureQueriesContext(replica) as replica_queries, db_router.read_from_replica():
+            monthly_reports.prebuilt_report_response('pdf', self.payment.month_year, None)
+        self.assertEqual(len(replica_queries), 0)
+
+    def test_unreachable_replica_falls_back_to_the_primary(self):
+        self.use_replica(os.path.join(self.replica_path, 'missing', 'replica.sqlite3'))
+        with self.assertLogs('core.db_router', 'WARNING'), db_router.read_from_replica():
+            self.assertEqual(Payment.objects.get(pk=self.payment.pk).amount, Decimal('250.00'))
+        # Not retried until REPLICA_RETRY_SECONDS have passed
+        with self.assertNoLogs('core.db_router'), db_router.read_from_replica():
+            Payment.objects.count()
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Tests for the process-wide connection pool and the pooled SQLite backend"""
+
+    def make_pool(self, **options):
+        pool = ConnectionPool(lambda: sqlite3.connect(':memory:', check_same_thread=False),
+                              PooledSQLiteWrapper.check_raw_connection, **options)
+        self.addCleanup(pool.close_all)
+        return pool
+
+    def test_bounded_reuse_and_timeout(self):
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        first, created = pool.checkout()
+        self.assertTrue(created)
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+
+        pool.release(first)
+        again, created = pool.checkout()
+        self.assertIs(again, first)
+        self.assertFalse(created)
+        stats = pool.stats()
+        self.assertEqual((stats['created'], stats['checkouts'], stats['timeouts']), (1, 2, 1))
+
+    def test_broken_and_expired_connections_are_replaced(self):
+        pool = self.make_pool(check_after=0)
+        connection, _ = pool.checkout()
+        pool.release(connection)
+        connection.close()  # e.g. the server dropped it while idle
+
+        replacement, created = pool.checkout()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(created)
+        self.assertEqual(pool.stats()['health_check_failures'], 1)
+
+        pool.max_lifetime = 0
+        pool.release(replacement)
+        self.assertEqual(pool.stats()['closed_expired'], 1)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_backend_returns_connections_to_the_pool(self):
+        alias = 'pooled_test'
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        settings_dict = {**connection.settings_dict, 'NAME': os.path.join(workdir, 'pooled.sqlite3'),
+                         'ENGINE': 'core.db_backends.sqlite3', 'CONN_MAX_AGE': 0, 'POOL': {'max_size': 2}}
+        wrapper = PooledSQLiteWrapper(settings_dict, alias)
+        self.addCleanup(lambda: get_pool(alias, None).close_all())
+
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIs(wrapper.connection, raw)
+
+        # Closed inside a transaction: Django keeps the connection, so the
+        # pool must not hand it out again
+        connections[alias] = wrapper
+        self.addCleanup(connections.__delitem__, alias)
+        with transaction.atomic(using=alias):
+            wrapper.close()
+        self.assertIsNone(wrapper.connection)
+        stats = pool_stats()[alias]
+        self.assertEqual((stats['created'], stats['closed_broken'], stats['size']), (1, 1, 0))
+
+
+class SQLiteTuningTests(SimpleTestCase):
+    """Tests for the opt-in SQLite PRAGMAs and the optimize command"""
+
+    def make_connection(self, alias='tuning_test'):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        settings_dict = {**connection.settings_dict, 'NAME': os.path.join(workdir, 'tuned.sqlite3'),
+                         'CONN_MAX_AGE': 0}
+        wrapper = SQLiteWrapper(settings_dict, alias)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_only_when_enabled(self):
+        wrapper = self.make_connection()
+        with override_settings(SQLITE_TUNING=False):
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+        wrapper.close()
+
+        with override_settings(SQLITE_TUNING=True, SQLITE_PRAGMAS={'busy_timeout': 1234}):
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)  # NORMAL
+            self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 1234)
+            self.assertEqual(self.pragma(wrapper, 'cache_size'), DEFAULT_PRAGMAS['cache_size'])
+
+    def test_atomic_blocks_take_the_write_lock_up_front(self):
+        alias = 'immediate_test'
+        wrapper = self.make_connection(alias)
+        connections[alias] = wrapper
+        self.addCleanup(connections.__delitem__, alias)
+        other = sqlite3.connect(wrapper.settings_dict['NAME'], timeout=0)
+        self.addCleanup(other.close)
+
+        with override_settings(SQLITE_TUNING=True), transaction.atomic(using=alias):
+            self.pragma(wrapper, 'journal_mode')  # a read only, yet the lock is held
+            with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+                other.execute('BEGIN IMMEDIATE')
+
+    def test_optimize_vacuums_and_analyzes(self):
+        alias = 'optimize_test'
+        wrapper = self.make_connection(alias)
+        connections[alias] = wrapper
+        self.addCleanup(connections.__delitem__, alias)
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE filler (id INTEGER PRIMARY KEY, body TEXT)')
+            cursor.executemany('INSERT INTO filler (body) VALUES (%s)', [('x' * 1000,)] * 2000)
+            cursor.execute('CREATE INDEX filler_body ON filler (body)')
+            cursor.execute('DELETE FROM filler WHERE id > 10')
+        size = os.path.getsize(wrapper.settings_dict['NAME'])
+
+        out = StringIO()
+        call_command('optimize', database=alias, stdout=out)
+        self.assertIn('VACUUM', out.getvalue())
+        self.assertLess(os.path.getsize(wrapper.settings_dict['NAME']), size / 10)
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM sqlite_stat1 WHERE tbl = 'filler'")
+            self.assertGreater(cursor.fetchone()[0], 0)
+
+
+@plain_static
+class RequestTimingTests(TestCase):
+    """Tests for the Server-Timing header, timing log line and summary page"""
+
+    def setUp(self):
+        cache.clear()
+        reset_view_stats()
+        self.admin = User.objects.create_user('admin1', password='pass12345')
+        UserProfile.objects.filter(user=self.admin).update(role='admin')
+        self.client.force_login(self.admin)
+
+    def server_timing(self, response):
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=', 1) for param in params)
+        return entries
+
+    def test_header_reports_queries_and_template_time(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('admin_dashboard'))
+        query_count = len(captured)
+
+        timing = self.server_timing(response)
+        self.assertEqual(timing['db']['desc'], f'"{query_count} queries"')
+        self.assertGreater(float(timing['template']['dur']), 0)
+        self.assertGreaterEqual(float(timing['total']['dur']), float(timing['db']['dur']))
+
+    def test_export_time_and_log_line(self):
+        with self.assertLogs('core.request_timing', 'INFO') as logs:
+            response = self.client.get(reverse('export_payments_excel'))
+
+        self.assertIn('excel', self.server_timing(response))
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line['view'], 'export_payments_excel')
+        self.assertEqual(line['status'], 200)
+        self.assertGreater(line['excel_ms'], 0)
+
+    def test_summary_page_is_debug_only(self):
+        self.assertEqual(self.client.get(reverse('request_timings')).status_code, 404)
+
+        with override_settings(DEBUG=True):
+            self.client.get(reverse('admin_dashboard'))
+            response = self.client.get(reverse('request_timings'))
+        self.assertContains(response, 'admin_dashboard')
+        self.assertIn('admin_dashboard', [row['view'] for row in get_view_stats()])
+
+
+@plain_static
+class NPlusOneTests(TestCase):
+    """Tests for N+1 query detection (the test runner runs it in 'raise' mode)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.month = datetime.now().strftime('%Y-%m')
+        cls.admin = User.objects.create_user('admin1', password='pass12345')
+        UserProfile.objects.filter(user=cls.admin).update(role='admin')
+        for i in range(6):
+            member = User.objects.create_user(f'member{i}', password='pass12345', first_name=f'Member{i}')
+            Payment.objects.create(user=member, month_year=cls.month, amount=Decimal('2500'))
+            Message.objects.create(user=member, subject=f'Subject {i}', message='Hello')
+
+    def setUp(self):
+        cache.clear()
+        token = start_tracking('test')
+        self.addCleanup(stop_tracking, token)
+
+    def test_repeated_query_reports_source_line(self):
+        with self.assertRaisesMessage(NPlusOneError, 'core/tests.py'):
+            for payment in Payment.objects.all():
+                payment.user.username
+
+    def test_repeated_query_reports_template_line(self):
+        template = engines['django'].from_string(
+            '<ul>\n{% for payment in payments %}\n<li>{{ payment.user.username }}</li>\n{% endfor %}</ul>'
+        )
+        with self.assertRaisesMessage(NPlusOneError, ', line 3'):
+            template.render({'payments': Payment.objects.all()})
+
+    @override_settings(NPLUSONE_MODE='log', NPLUSONE_SAMPLE_RATE=1)
+    def test_logs_in_production_mode(self):
+        token = start_tracking('test')
+        self.addCleanup(stop_tracking, token)
+        with self.assertLogs('core.nplusone', 'WARNING') as logs:
+            for payment in Payment.objects.all():
+                payment.user.username
+        self.assertEqual(len(logs.records), 1)
+
+    def test_list_views_stay_constant(self):
+        self.client.force_login(self.admin)
+        for name in ('admin_dashboard', 'payment_list', 'admin_messages', 'transparent_data',
+                     'export_payments_excel', 'export_monthly_report_excel'):
+            self.assertEqual(self.client.get(reverse(name)).status_code, 200, name)
+
+
+@plain_static
+@override_settings(ROOT_URLCONF='core.test_urls', ASYNC_QUERIES_IN_PARALLEL=False)
+class AsyncDashboardTests(TestCase):
+    """Tests for the async dashboard views"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.month = datetime.now().strftime('%Y-%m')
+        cls.member = User.objects.create_user('member1', password='pass12345', first_name='Asha')
+        cls.admin = User.objects.create_user('admin1', password='pass12345')
+        UserProfile.objects.filter(user=cls.admin).update(role='admin')
+        Payment.objects.create(user=cls.member, month_year=cls.month, amount=Decimal('2500'), status='paid')
+        Grocery.objects.create(item_name='Rice', quantity='5 kg', price=Decimal('300'),
+                               purchase_date=date.today(), month_year=cls.month)
+        FixedExpense.objects.create(month_year=cls.month, kitchen_rent=Decimal('1000'))
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_admin_dashboard(self):
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get('/manage/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_payments'], Decimal('2500'))
+        self.assertEqual(response.context['total_expenses'], Decimal('1300'))
+        self.assertEqual(response.context['total_users'], 1)
+
+    async def test_user_dashboard_and_transparent_data(self):
+        await self.async_client.aforce_login(self.member)
+        response = await self.async_client.get('/user/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['payment'].status, 'paid')
+        self.assertEqual(response.context['total_expenses'], Decimal('1300'))
+
+        response = await self.async_client.get('/user/data/', {'month': self.month})
+        self.assertContains(response, 'Rice')
+        self.assertEqual(response.context['months'], [self.month])
+        self.assertEqual(response.context['total_collected'], Decimal('2500'))
+
+    async def test_role_checks_redirect_to_login(self):
+        response = await self.async_client.get('/manage/dashboard/')
+        self.assertEqual(response.status_code, 302)
+
+        await self.async_client.aforce_login(self.member)
+        response = await self.async_client.get('/manage/dashboard/')
+        self.assertRedirects(response, '/login/?next=/manage/dashboard/', fetch_redirect_response=False)
+
+    def test_transparent_data_needs_a_role_sync_or_async(self):
+        no_profile = User.objects.create_user('noprofile')
+        UserProfile.objects.filter(user=no_profile).delete()
+        self.client.force_login(no_profile)
+        for urlconf in ('core.test_urls', 'mess_management.urls'):
+            with self.subTest(urlconf), self.settings(ROOT_URLCONF=urlconf):
+                response = self.client.get('/user/data/')
+                self.assertRedirects(response, '/login/?next=/user/data/', fetch_redirect_response=False)
+
+    async def test_gather_queries_runs_callables_concurrently(self):
+        # Neither callable can pass the barrier unless both run at once
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_then(value):
+            barrier.wait()
+            return value
+
+        with self.settings(ASYNC_QUERIES_IN_PARALLEL=True):
+            results = await gather_queries({'a': lambda: wait_then(1), 'b': lambda: wait_then(2)})
+        self.assertEqual(results, {'a': 1, 'b': 2})
@@ -1,7 +1,16 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from django.views.generic.base import RedirectView
-from . import views
+from . import views, api
+
+
+def dashboard_view(name):
+    """The sync view, or its async twin when ASYNC_DASHBOARDS is on"""
+    if settings.ASYNC_DASHBOARDS:
+        return getattr(views, f'{name}_async')
+    return getattr(views, name)
+
 
 urlpatterns = [
     # Landing and Authentication
@@ -14,7 +23,7 @@ urlpatterns = [
     
     # Admin URLs (using 'manage' to avoid conflict with Django admin)
     path('manage/login/', views.admin_login, name='admin_login'),  # Admin-only login (no Google OAuth)
-    path('manage/dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('manage/dashboard/', dashboard_view('admin_dashboard'), name='admin_dashboard'),
     
     # User Management
     path('manage/users/', views.user_list, name='user_list'),
@@ -28,6 +37,7 @@ urlpatterns = [
     path('manage/payments/<int:payment_id>/edit/', views.payment_edit, name='payment_edit'),
     path('manage/payments/<int:payment_id>/delete/', views.payment_delete, name='payment_delete'),
     path('manage/payments/<int:payment_id>/remind/', views.send_payment_reminder, name='send_payment_reminder'),
+    path('manage/payments/remind-pending/', views.remind_all_pending, name='remind_all_pending'),
     
     # Grocery Management
     path('manage/groceries/', views.grocery_list, name='grocery_list'),
@@ -46,24 +56,29 @@ urlpatterns = [
     path('manage/messages/<int:message_id>/resolve/', views.message_resolve, name='message_resolve'),
     path('manage/messages/<int:message_id>/reply/', views.message_reply, name='message_reply'),
     
+    # Search
+    path('manage/search/', views.admin_search, name='admin_search'),
+    
     # Reports
     path('manage/reports/monthly/', views.monthly_report, name='monthly_report'),
     
     # Meal Calendar
     path('manage/meals/', views.meal_calendar, name='meal_calendar'),
     path('manage/meals/create/', views.meal_plan_create, name='meal_plan_create'),
+    path('manage/meals/bulk/', views.meal_plan_bulk, name='meal_plan_bulk'),
     path('manage/meals/<int:plan_id>/edit/', views.meal_plan_edit, name='meal_plan_edit'),
     path('manage/meals/<int:plan_id>/delete/', views.meal_plan_delete, name='meal_plan_delete'),
     
     # User URLs
-    path('user/dashboard/', views.user_dashboard, name='user_dashboard'),
+    path('user/dashboard/', dashboard_view('user_dashboard'), name='user_dashboard'),
     path('user/payment/', views.user_payment, name='user_payment'),
     path('user/messages/', views.user_messages_list, name='user_messages_list'),
     path('user/messages/send/', views.user_send_message, name='user_send_message'),
     path('user/messages/<int:message_id>/reply/', views.user_message_reply, name='user_message_reply'),
     path('user/meals/', views.user_meal_calendar, name='user_meal_calendar'),
+    path('user/meals/feed/<str:token>.ics', views.meal_plan_feed, name='meal_plan_feed'),
     path('user/receipt/', views.user_receipt, name='user_receipt'),
-    path('user/data/', views.transparent_data, name='transparent_data'),
+    path('user/data/', dashboard_view('transparent_data'), name='transparent_data'),
     path('user/save-theme-preference/', views.save_theme_preference, name='save_theme_preference'),
     path('user/profile-settings/', views.profile_settings, name='profile_settings'),
     
@@ -81,4 +96,12 @@ urlpatterns = [
     # Settings
     path('user/settings/', views.user_settings, name='user_settings'),
     path('manage/settings/', views.admin_settings, name='admin_settings'),
+    path('manage/debug/timings/', views.request_timings, name='request_timings'),  # DEBUG only
+    
+    # Read-only JSON API (v1)
+    path('api/v1/dashboard/', api.dashboard_stats, name='api_dashboard'),
+    path('api/v1/payment/', api.my_payment, name='api_my_payment'),
+    path('api/v1/messages/', api.message_list, name='api_messages'),
+    path('api/v1/meals/', api.meal_plan_list, name='api_meal_plans'),
+    path('api/v1/transparent/', api.transparent_data, name='api_transparent_data'),
 ]
@@ -1,26 +1,35 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.db.models import Sum, Count, Q
-from django.http import HttpResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.core.cache import cache
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
 from datetime import datetime
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-from io import BytesIO
+
+from asgiref.sync import sync_to_async
 
 from .models import (UserProfile, Payment, Grocery, FixedExpense, Message,
-                     MealPlan, ActivityLog, UserSettings, MessSettings)
+                     MealPlan, ActivityLog, UserSettings, MessSettings, SearchTerm)
 from .forms import (UserRegistrationForm, UserEditForm, PaymentForm, UserPaymentForm,
                     GroceryForm, FixedExpenseForm, MessageForm, AdminReplyForm)
-from .meal_forms import MealPlanForm
-from .decorators import admin_required, user_required, role_required
+from .meal_forms import MealPlanForm, MealPlanBulkForm
+from .meal_calendar import get_month_calendar, apply_meal_plan_template
+from .meal_feed import (make_feed_token, get_feed_user_id, get_feed_window,
+                        get_feed_validators, iter_meal_plan_ics, MEAL_FEED_MAX_AGE)
+from .decorators import admin_required, user_required, role_required, async_role_required, replica_reads
+from .cache_versions import get_data_versions
+from .db_router import versioned_cache_timeout
+from .concurrent_queries import run_queries, gather_queries
+from .reminders import remind_month, reminder_subject, reminder_text
+from .monthly_reports import month_data, prebuilt_report_response
+from .search import search
 
 
 # ==================== Authentication Views ====================
@@ -53,6 +62,8 @@ def user_login(request):
                 return redirect('dashboard')
             else:
                 messages.error(request, 'Your account is inactive. Please contact admin.')
+        elif getattr(request, 'login_lockout', None):
+            messages.error(request, f'Too many failed login attempts. Please try again in {request.login_lockout.minutes} minutes.')
         else:
             messages.error(request, 'Invalid username or password.')
     
@@ -96,6 +107,8 @@ def admin_login(request):
             else:
                 messages.warning(request, '⚠️ User Access Detected! This is the Admin Portal. Regular users should login from the User Portal instead.')
                 return redirect('account_login')
+        elif getattr(request, 'login_lockout', None):
+            messages.error(request, f'Too many failed login attempts. Please try again in {request.login_lockout.minutes} minutes.')
         else:
             messages.error(request, 'Invalid admin credentials.')
     
@@ -117,42 +130,46 @@ def dashboard(request):
 
 # ==================== Admin Views ====================
 
+def _fixed_expense_total(month_year):
+    """Total fixed expenses for a month, 0 if none were recorded"""
+    try:
+        return FixedExpense.objects.get(month_year=month_year).total_fixed_expense
+    except FixedExpense.DoesNotExist:
+        return 0
+
+
+def _admin_dashboard_queries(current_month):
+    """Independent statistics queries of the admin dashboard"""
+    return {
+        'total_users': lambda: UserProfile.objects.filter(role='user', is_active=True).count(),
+        'total_payments': lambda: Payment.objects.filter(month_year=current_month, status='paid').aggregate(Sum('amount'))['amount__sum'] or 0,
+        'pending_payments': lambda: Payment.objects.filter(month_year=current_month, status='pending').count(),
+        'total_groceries': lambda: Grocery.objects.filter(month_year=current_month).aggregate(Sum('price'))['price__sum'] or 0,
+        'total_fixed': lambda: _fixed_expense_total(current_month),
+        'pending_messages': lambda: Message.objects.filter(status='pending').count(),
+    }
+
+
+def _admin_dashboard_context(stats, current_month):
+    context = dict(stats)
+    context.update({
+        'total_expenses': stats['total_groceries'] + stats['total_fixed'],
+        # Recent payments (only queried when the template fragment is not cached)
+        'recent_payments': Payment.objects.select_related('user').order_by('-created_at')[:5],
+        'current_month': current_month,
+        'data_versions': get_data_versions(),
+        'fragment_timeout': versioned_cache_timeout(),
+    })
+    return context
+
+
 @admin_required
+@replica_reads
 def admin_dashboard(request):
     """Admin dashboard with statistics"""
     current_month = datetime.now().strftime('%Y-%m')
-    
-    # Statistics
-    total_users = UserProfile.objects.filter(role='user', is_active=True).count()
-    total_payments = Payment.objects.filter(month_year=current_month, status='paid').aggregate(Sum('amount'))['amount__sum'] or 0
-    pending_payments = Payment.objects.filter(month_year=current_month, status='pending').count()
-    total_groceries = Grocery.objects.filter(month_year=current_month).aggregate(Sum('price'))['price__sum'] or 0
-    
-    # Fixed expenses for current month
-    try:
-        fixed_expense = FixedExpense.objects.get(month_year=current_month)
-        total_fixed = fixed_expense.total_fixed_expense
-    except FixedExpense.DoesNotExist:
-        total_fixed = 0
-    
-    # Pending messages
-    pending_messages = Message.objects.filter(status='pending').count()
-    
-    # Recent payments
-    recent_payments = Payment.objects.select_related('user').order_by('-created_at')[:5]
-    
-    context = {
-        'total_users': total_users,
-        'total_payments': total_payments,
-        'pending_payments': pending_payments,
-        'total_groceries': total_groceries,
-        'total_fixed': total_fixed,
-        'total_expenses': total_groceries + total_fixed,
-        'pending_messages': pending_messages,
-        'recent_payments': recent_payments,
-        'current_month': current_month,
-    }
-    
+    stats = run_queries(_admin_dashboard_queries(current_month))
+    context = _admin_dashboard_context(stats, current_month)
     return render(request, 'admin/dashboard.html', context)
 
 
@@ -188,13 +205,13 @@ def user_edit(request, user_id):
     profile = get_object_or_404(UserProfile, id=user_id)
     
     if request.method == 'POST':
-        form = UserEditForm(request.POST, instance=profile)
+        form = UserEditForm(request.POST, instance=profile.user)
         if form.is_valid():
             form.save()
             messages.success(request, 'User updated successfully.')
             return redirect('user_list')
     else:
-        form = UserEditForm(instance=profile)
+        form = UserEditForm(instance=profile.user)
     
     context = {'form': form, 'profile': profile}
     return render(request, 'admin/user_edit.html', context)
@@ -439,7 +456,7 @@ def message_resolve(request, message_id):
     message = get_object_or_404(Message, id=message_id)
     message.status = 'resolved'
     message.resolved_at = timezone.now()
-    message.save()
+    message.save(update_fields=['status', 'resolved_at'])
     messages.success(request, 'Message marked as resolved.')
     return redirect('admin_messages')
 
@@ -473,34 +490,14 @@ def send_payment_reminder(request, payment_id):
     payment = get_object_or_404(Payment, id=payment_id)
     
     # Get UPI settings
-    try:
-        mess_settings = MessSettings.objects.first()
-        upi_id = mess_settings.admin_upi_id if mess_settings and mess_settings.admin_upi_id else "Not configured"
-    except MessSettings.DoesNotExist:
-        upi_id = "Not configured"
-    
-    # Create default reminder message
-    default_message = f"""Dear {payment.user.first_name},
-
-This is a friendly reminder that your mess payment for {payment.month_year} is currently {payment.get_status_display().lower()}.
-
-Payment Amount: ₹{payment.amount}
-Status: {payment.get_status_display()}
-
-Please pay your bill on time to avoid any inconvenience.
-
-Payment Details:
-UPI ID: {upi_id}
-
-Thank you for your cooperation!
-
-- Mess Management"""
+    mess_settings = MessSettings.get_cached()
+    upi_id = mess_settings.admin_upi_id or "Not configured"
     
     # Create message
     Message.objects.create(
         user=payment.user,
-        subject=f"Payment Reminder - {payment.month_year}",
-        message=default_message,
+        subject=reminder_subject(payment),
+        message=reminder_text(payment, upi_id),
         message_type='system',  # Mark as system message so it doesn't show in admin section
         status='pending'
     )
@@ -509,54 +506,60 @@ Thank you for your cooperation!
     return redirect('payment_list')
 
 
+
+@admin_required
+def remind_all_pending(request):
+    """Remind every pending or partial payment of a month in one go"""
+    if request.method != 'POST':
+        return redirect('payment_list')
+    
+    month_year = request.POST.get('month') or datetime.now().strftime('%Y-%m')
+    try:
+        datetime.strptime(month_year, '%Y-%m')
+    except ValueError:
+        messages.error(request, 'Invalid month.')
+        return redirect('payment_list')
+    
+    result = remind_month(month_year, send_email=request.POST.get('send_email') == 'on')
+    summary = f"{result['sent']} reminders sent for {month_year}, {result['skipped']} skipped (already reminded today)"
+    if result['emails_queued'] or result['email_skipped']:
+        summary += f"; {result['emails_queued']} emails queued, {result['email_skipped']} members opted out"
+    messages.success(request, summary + '.')
+    return redirect(f"{reverse('payment_list')}?month={month_year}")
+
+
+# ==================== Search ====================
+
+@admin_required
+@replica_reads
+def admin_search(request):
+    """Search messages, groceries and users through the search index"""
+    query = request.GET.get('q', '').strip()
+    kind = request.GET.get('kind', '')
+    if kind not in dict(SearchTerm.KIND_CHOICES):
+        kind = ''
+    
+    results = search(query, kind=kind or None, page=request.GET.get('page')) if query else None
+    context = {
+        'query': query,
+        'kind': kind,
+        'kinds': SearchTerm.KIND_CHOICES,
+        'results': results,
+    }
+    return render(request, 'admin/search.html', context)
+
+
 # ==================== Meal Calendar ====================
 
 @admin_required
 def meal_calendar(request):
     """Admin view meal calendar"""
-    from datetime import datetime, timedelta
-    import calendar
-    
     # Get current month/year or from query params
     year = int(request.GET.get('year', datetime.now().year))
     month = int(request.GET.get('month', datetime.now().month))
     
-    # Get all meal plans for this month
-    meal_plans = MealPlan.objects.filter(
-        date__year=year,
-        date__month=month
-    )
-    
-    # Create a dictionary for easy lookup
-    meal_dict = {mp.date.day: mp for mp in meal_plans}
-    
-    # Get calendar data
-    cal = calendar.monthcalendar(year, month)
-    month_name = calendar.month_name[month]
-    
-    # Calculate prev/next month
-    if month == 1:
-        prev_month, prev_year = 12, year - 1
-    else:
-        prev_month, prev_year = month - 1, year
-    
-    if month == 12:
-        next_month, next_year = 1, year + 1
-    else:
-        next_month, next_year = month + 1, year
-    
-    context = {
-        'calendar': cal,
-        'meal_dict': meal_dict,
-        'year': year,
-        'month': month,
-        'month_name': month_name,
-        'prev_month': prev_month,
-        'prev_year': prev_year,
-        'next_month': next_month,
-        'next_year': next_year,
-        'today': datetime.now().date(),
-    }
+    context = get_month_calendar(year, month)
+    context = {**context, 'today': datetime.now().date()}
     return render(request, 'admin/meal_calendar.html', context)
 
 
@@ -596,6 +599,35 @@ def meal_plan_edit(request, plan_id):
     return render(request, 'admin/meal_plan_form.html', context)
 
 
+@admin_required
+def meal_plan_bulk(request):
+    """Fill a date range from an existing week or month of meal plans in one go"""
+    if request.method == 'POST':
+        form = MealPlanBulkForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            summary = apply_meal_plan_template(
+                source=data['source'],
+                source_date=data['source_date'],
+                target_start=data['target_start'],
+                target_end=data['target_end'],
+                rotation_weeks=data['rotation_weeks'],
+                overwrite=data['overwrite'],
+            )
+            messages.success(
+                request,
+                f"Meal plans applied to {summary['days']} days: {summary['created']} created, "
+                f"{summary['updated']} updated, {summary['skipped']} skipped."
+            )
+            target = data['target_start']
+            return redirect(f"{reverse('meal_calendar')}?month={target.month}&year={target.year}")
+    else:
+        form = MealPlanBulkForm()
+    
+    context = {'form': form}
+    return render(request, 'admin/meal_plan_bulk.html', context)
+
+
 @admin_required
 def meal_plan_delete(request, plan_id):
     """Delete meal plan"""
@@ -608,198 +640,120 @@ def meal_plan_delete(request, plan_id):
 @user_required
 def user_meal_calendar(request):
     """User view meal calendar"""
-    from datetime import datetime
-    import calendar
-    
     # Get current month/year or from query params
     year = int(request.GET.get('year', datetime.now().year))
     month = int(request.GET.get('month', datetime.now().month))
     
-    # Get all meal plans for this month
-    meal_plans = MealPlan.objects.filter(
-        date__year=year,
-        date__month=month
-    )
-    
-    # Create a dictionary for easy lookup
-    meal_dict = {mp.date.day: mp for mp in meal_plans}
-    
-    # Get calendar data
-    cal = calendar.monthcalendar(year, month)
-    month_name = calendar.month_name[month]
-    
-    # Calculate prev/next month
-    if month == 1:
-        prev_month, prev_year = 12, year - 1
-    else:
-        prev_month, prev_year = month - 1, year
-    
-    if month == 12:
-        next_month, next_year = 1, year + 1
-    else:
-        next_month, next_year = month + 1, year
-    
+    context = get_month_calendar(year, month)
     context = {
-        'calendar': cal,
-        'meal_dict': meal_dict,
-        'year': year,
-        'month': month,
-        'month_name': month_name,
-        'prev_month': prev_month,
-        'prev_year': prev_year,
-        'next_month': next_month,
-        'next_year': next_year,
+        **context,
         'today': datetime.now().date(),
+        'feed_url': request.build_absolute_uri(
+            reverse('meal_plan_feed', args=[make_feed_token(request.user)])
+        ),
     }
     return render(request, 'user/meal_calendar.html', context)
 
 
+@require_safe
+def meal_plan_feed(request, token):
+    """
+    iCalendar feed of upcoming meal plans for calendar apps
+    Authenticated by the signed token in the URL rather than a session, and
+    answers unchanged polls with 304 before any serialization happens
+    """
+    if get_feed_user_id(token) is None:
+        raise Http404('Calendar feed not found')
+    
+    start, end = get_feed_window()
+    etag, last_modified = get_feed_validators(start, end)
+    
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp())
+    )
+    if response is None:
+        response = StreamingHttpResponse(
+            iter_meal_plan_ics(start, end, host=request.get_host().split(':')[0]),
+            content_type='text/calendar; charset=utf-8',
+        )
+        response['Content-Disposition'] = 'inline; filename="meal_plan.ics"'
+    
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, max_age=MEAL_FEED_MAX_AGE)
+    return response
+
+
 
 
 # ==================== Report Generation ====================
 
 @admin_required
+@replica_reads
 def monthly_report(request):
-    """Generate monthly PDF report"""
+    """Generate monthly PDF report, or serve the one generated ahead of time"""
     month_year = request.GET.get('month', datetime.now().strftime('%Y-%m'))
+    mess_settings = MessSettings.get_cached()
     
-    # Create PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    elements.append(Paragraph(f'Mess Management Report - {month_year}', title_style))
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Payments Summary
-    payments = Payment.objects.filter(month_year=month_year)
-    total_collected = payments.filter(status='paid').aggregate(Sum('amount'))['amount__sum'] or 0
-    pending_count = payments.filter(status='pending').count()
-    
-    elements.append(Paragraph('Payment Summary', styles['Heading2']))
-    payment_data = [
-        ['Total Collected', f'₹{total_collected:.2f}'],
-        ['Pending Payments', str(pending_count)],
-        ['Total Users', str(payments.count())],
-    ]
-    payment_table = Table(payment_data, colWidths=[3*inch, 2*inch])
-    payment_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ecf0f1')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-    ]))
-    elements.append(payment_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Grocery Expenses
-    groceries = Grocery.objects.filter(month_year=month_year)
-    total_grocery = groceries.aggregate(Sum('price'))['price__sum'] or 0
-    
-    elements.append(Paragraph('Grocery Expenses', styles['Heading2']))
-    grocery_data = [['Item', 'Category', 'Quantity', 'Price']]
-    for item in groceries:
-        grocery_data.append([item.item_name, item.category, item.quantity, f'₹{item.price:.2f}'])
-    grocery_data.append(['', '', 'Total', f'₹{total_grocery:.2f}'])
-    
-    grocery_table = Table(grocery_data, colWidths=[2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-    grocery_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -2), colors.HexColor('#ecf0f1')),
-        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e74c3c')),
-        ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-    ]))
-    elements.append(grocery_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Fixed Expenses
-    try:
-        fixed_exp = FixedExpense.objects.get(month_year=month_year)
-        elements.append(Paragraph('Fixed Expenses', styles['Heading2']))
-        fixed_data = [
-            ['Kitchen Rent', f'₹{fixed_exp.kitchen_rent:.2f}'],
-            ['Maid Salary', f'₹{fixed_exp.maid_salary:.2f}'],
-            ['Gas Cylinder', f'₹{fixed_exp.gas_cylinder:.2f}'],
-            ['Other Expenses', f'₹{fixed_exp.other_expenses:.2f}'],
-            ['Total Fixed', f'₹{fixed_exp.total_fixed_expense:.2f}'],
-        ]
-        fixed_table = Table(fixed_data, colWidths=[3*inch, 2*inch])
-        fixed_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -2), colors.HexColor('#ecf0f1')),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e74c3c')),
-            ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ]))
-        elements.append(fixed_table)
-    except FixedExpense.DoesNotExist:
-        elements.append(Paragraph('No fixed expenses recorded for this month.', styles['Normal']))
-    
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
+    response = prebuilt_report_response('pdf', month_year, mess_settings)
+    if response is not None:
+        return response
     
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="mess_report_{month_year}.pdf"'
-    return response
+    from .pdf_reports import export_monthly_report_to_pdf
+    payments, groceries, fixed_expense = month_data(month_year)
+    return export_monthly_report_to_pdf(month_year, payments, groceries, fixed_expense,
+                                        mess_settings.include_grocery_details)
 
 
 # ==================== User Views ====================
 
-@user_required
-def user_dashboard(request):
-    """User dashboard"""
-    current_month = datetime.now().strftime('%Y-%m')
-    
-    # Get user's payment for current month
-    try:
-        payment = Payment.objects.get(user=request.user, month_year=current_month)
-    except Payment.DoesNotExist:
-        payment = None
-    
-    # Get total expenses for current month
-    total_grocery = Grocery.objects.filter(month_year=current_month).aggregate(Sum('price'))['price__sum'] or 0
-    
-    try:
-        fixed_expense = FixedExpense.objects.get(month_year=current_month)
-        total_fixed = fixed_expense.total_fixed_expense
-    except FixedExpense.DoesNotExist:
-        total_fixed = 0
-    
-    total_expenses = total_grocery + total_fixed
+def _total_expenses_key(current_month, data_versions):
+    # Total expenses are the same for every member, so they are cached until
+    # a grocery or fixed expense changes
+    return f"total_expenses:{current_month}:{data_versions['grocery']}:{data_versions['fixedexpense']}"
+
+
+def _user_dashboard_queries(user, current_month, with_expenses):
+    """Independent queries of the member dashboard"""
+    def get_payment():
+        try:
+            return Payment.objects.get(user=user, month_year=current_month)
+        except Payment.DoesNotExist:
+            return None
     
-    # Recent messages
-    recent_messages = Message.objects.filter(user=request.user).order_by('-created_at')[:5]
+    queries = {'payment': get_payment}
+    if with_expenses:
+        queries['total_grocery'] = lambda: Grocery.objects.filter(month_year=current_month).aggregate(Sum('price'))['price__sum'] or 0
+        queries['total_fixed'] = lambda: _fixed_expense_total(current_month)
+    return queries
+
+
+def _user_dashboard_context(user, results, total_expenses, current_month, data_versions):
+    if total_expenses is None:
+        total_expenses = results['total_grocery'] + results['total_fixed']
+        cache.set(_total_expenses_key(current_month, data_versions), total_expenses, versioned_cache_timeout())
     
-    context = {
-        'payment': payment,
+    return {
+        'payment': results['payment'],
         'total_expenses': total_expenses,
         'current_month': current_month,
-        'recent_messages': recent_messages,
+        # Recent messages (only queried when the template fragment is not cached)
+        'recent_messages': Message.objects.filter(user=user).order_by('-created_at')[:5],
+        'data_versions': data_versions,
+        'fragment_timeout': versioned_cache_timeout(),
     }
+
+
+@user_required
+@replica_reads
+def user_dashboard(request):
+    """User dashboard"""
+    current_month = datetime.now().strftime('%Y-%m')
+    data_versions = get_data_versions()
+    total_expenses = cache.get(_total_expenses_key(current_month, data_versions))
     
+    results = run_queries(_user_dashboard_queries(request.user, current_month, total_expenses is None))
+    context = _user_dashboard_context(request.user, results, total_expenses, current_month, data_versions)
     return render(request, 'user/dashboard.html', context)
 
 
@@ -828,10 +782,7 @@ def user_payment(request):
         form = UserPaymentForm(instance=payment)
     
     # Get UPI details if available
-    try:
-        mess_settings = MessSettings.objects.first()
-    except MessSettings.DoesNotExist:
-        mess_settings = None
+    mess_settings = MessSettings.get_cached()
     
     context = {
         'form': form,
@@ -901,6 +852,8 @@ def user_message_reply(request, message_id):
 @user_required
 def user_receipt(request):
     """Generate personal receipt PDF"""
+    from .pdf_reports import export_receipt_to_pdf
+    
     month_year = request.GET.get('month', datetime.now().strftime('%Y-%m'))
     
     try:
@@ -909,97 +862,40 @@ def user_receipt(request):
         messages.error(request, 'No payment record found for the selected month.')
         return redirect('user_dashboard')
     
-    # Create PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=20,
-        alignment=TA_CENTER
-    )
-    elements.append(Paragraph('Payment Receipt', title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    
-    # User Details
-    user_data = [
-        ['Name', request.user.get_full_name()],
-        ['Username', request.user.username],
-        ['Month', month_year],
-    ]
-    user_table = Table(user_data, colWidths=[2*inch, 4*inch])
-    user_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ecf0f1')),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-    ]))
-    elements.append(user_table)
-    elements.append(Spacer(1, 0.2*inch))
-    
-    # Payment Details
-    payment_data = [
-        ['Amount', f'₹{payment.amount:.2f}'],
-        ['Status', payment.get_status_display()],
-        ['Transaction ID', payment.transaction_id or 'N/A'],
-        ['Payment Date', payment.paid_date.strftime('%d-%m-%Y %H:%M') if payment.paid_date else 'N/A'],
-    ]
-    payment_table = Table(payment_data, colWidths=[2*inch, 4*inch])
-    payment_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ecf0f1')),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-    ]))
-    elements.append(payment_table)
-    
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
-    
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="receipt_{request.user.username}_{month_year}.pdf"'
-    return response
+    return export_receipt_to_pdf(request.user, payment, month_year)
 
 
-@login_required
+def _transparent_data_queries(month_filter):
+    """Independent queries of the transparency page"""
+    return {
+        'total_grocery': lambda: Grocery.objects.filter(month_year=month_filter).aggregate(Sum('price'))['price__sum'] or 0,
+        'fixed_expense': lambda: FixedExpense.objects.filter(month_year=month_filter).first(),
+        'total_collected': lambda: Payment.objects.filter(month_year=month_filter, status='paid').aggregate(Sum('amount'))['amount__sum'] or 0,
+        # Get distinct months
+        'months': lambda: list(Grocery.objects.values_list('month_year', flat=True).distinct().order_by('-month_year')),
+    }
+
+
+def _transparent_data_context(results, month_filter):
+    context = dict(results)
+    context.update({
+        # Listed in cached template fragments; only queried on a cache miss
+        'groceries': Grocery.objects.filter(month_year=month_filter).order_by('-purchase_date'),
+        'payments': Payment.objects.filter(month_year=month_filter).select_related('user'),
+        'selected_month': month_filter,
+        'data_versions': get_data_versions(),
+        'fragment_timeout': versioned_cache_timeout(),
+    })
+    return context
+
+
+@role_required('admin', 'user')
+@replica_reads
 def transparent_data(request):
     """View all transparent mess data"""
     month_filter = request.GET.get('month', datetime.now().strftime('%Y-%m'))
-    
-    # Get all data for the month
-    groceries = Grocery.objects.filter(month_year=month_filter).order_by('-purchase_date')
-    total_grocery = groceries.aggregate(Sum('price'))['price__sum'] or 0
-    
-    try:
-        fixed_expense = FixedExpense.objects.get(month_year=month_filter)
-    except FixedExpense.DoesNotExist:
-        fixed_expense = None
-    
-    payments = Payment.objects.filter(month_year=month_filter).select_related('user')
-    total_collected = payments.filter(status='paid').aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    # Get distinct months
-    months = Grocery.objects.values_list('month_year', flat=True).distinct().order_by('-month_year')
-    
-    context = {
-        'groceries': groceries,
-        'total_grocery': total_grocery,
-        'fixed_expense': fixed_expense,
-        'payments': payments,
-        'total_collected': total_collected,
-        'selected_month': month_filter,
-        'months': months,
-    }
-    
+    results = run_queries(_transparent_data_queries(month_filter))
+    context = _transparent_data_context(results, month_filter)
     return render(request, 'user/transparent_data.html', context)
 
 
@@ -1017,7 +913,7 @@ def save_theme_preference(request):
             # Update user profile
             profile = request.user.profile
             profile.dark_mode = dark_mode
-            profile.save()
+            profile.save(update_fields=['dark_mode'])
             
             return JsonResponse({'success': True, 'message': 'Theme preference saved'})
         except Exception as e:
@@ -1060,6 +956,7 @@ def profile_settings(request):
 # ==================== Excel Export Views ====================
 
 @admin_required
+@replica_reads
 def export_payments_excel(request):
     """Export payments to Excel"""
     from .excel_export import export_payments_to_excel
@@ -1071,6 +968,7 @@ def export_payments_excel(request):
 
 
 @admin_required
+@replica_reads
 def export_groceries_excel(request):
     """Export groceries to Excel"""
     from .excel_export import export_groceries_to_excel
@@ -1082,21 +980,21 @@ def export_groceries_excel(request):
 
 
 @admin_required
+@replica_reads
 def export_monthly_report_excel(request):
-    """Export comprehensive monthly report to Excel"""
-    from .excel_export import export_monthly_report_to_excel
-    
+    """Export comprehensive monthly report to Excel, or serve the one generated ahead of time"""
     month_year = request.GET.get('month', datetime.now().strftime('%Y-%m'))
+    mess_settings = MessSettings.get_cached()
     
-    payments = Payment.objects.filter(month_year=month_year).select_related('user')
-    groceries = Grocery.objects.filter(month_year=month_year)
-    
-    try:
-        fixed_expense = FixedExpense.objects.get(month_year=month_year)
-    except FixedExpense.DoesNotExist:
-        fixed_expense = None
+    response = prebuilt_report_response('xlsx', month_year, mess_settings)
+    if response is not None:
+        return response
     
-    return export_monthly_report_to_excel(month_year, payments, groceries, fixed_expense)
+    from .excel_export import export_monthly_report_to_excel
+    payments, groceries, fixed_expense = month_data(month_year)
+    return export_monthly_report_to_excel(month_year, payments, groceries, fixed_expense,
+                                          mess_settings.include_payment_details,
+                                          mess_settings.include_grocery_details)
 
 
 # ==================== Settings Views ====================
@@ -1111,7 +1009,7 @@ def user_settings(request):
     user_settings_obj, created = UserSettings.objects.get_or_create(user=request.user)
     
     # Get mess settings for displaying admin UPI details
-    mess_settings = MessSettings.get_settings()
+    mess_settings = MessSettings.get_cached()
     
     if request.method == 'POST':
         section = request.POST.get('section')
@@ -1198,6 +1096,30 @@ def admin_settings(request):
     return render(request, 'admin/settings.html', context)
 
 
+# ==================== Request Timings (DEBUG only) ====================
+
+@admin_required
+def request_timings(request):
+    """Slowest views since the process started, from RequestTimingMiddleware"""
+    from django.conf import settings
+    from .db_pool import pool_stats
+    from .request_timing import get_view_stats, reset_view_stats
+    
+    if not settings.DEBUG:
+        raise Http404
+    
+    if request.method == 'POST':
+        reset_view_stats()
+        messages.success(request, 'Request timings cleared.')
+        return redirect('request_timings')
+    
+    context = {
+        'view_stats': get_view_stats(),
+        'pool_stats': sorted(pool_stats().items()),
+    }
+    return render(request, 'admin/request_timings.html', context)
+
+
 # ==================== Custom Password Reset ====================
 
 def custom_password_reset(request):
@@ -1210,3 +1132,44 @@ def custom_password_reset(request):
     
     view = CustomPasswordResetView.as_view(template_name='registration/password_reset_form.html')
     return view(request)
+
+
+# ==================== Async Dashboards ====================
+# Served in place of the views above when ASYNC_DASHBOARDS is on (core/urls.py).
+# Each page's independent queries run concurrently; the context is otherwise
+# built and rendered exactly like the sync version.
+
+@async_role_required('admin')
+@replica_reads
+async def admin_dashboard_async(request):
+    """Admin dashboard with its statistics queries run concurrently"""
+    current_month = datetime.now().strftime('%Y-%m')
+    stats = await gather_queries(_admin_dashboard_queries(current_month))
+    context = await sync_to_async(_admin_dashboard_context)(stats, current_month)
+    return await sync_to_async(render)(request, 'admin/dashboard.html', context)
+
+
+@async_role_required('user')
+@replica_reads
+async def user_dashboard_async(request):
+    """User dashboard with its queries run concurrently"""
+    current_month = datetime.now().strftime('%Y-%m')
+    data_versions = await sync_to_async(get_data_versions)()
+    total_expenses = await cache.aget(_total_expenses_key(current_month, data_versions))
+    
+    results = await gather_queries(_user_dashboard_queries(request.user, current_month, total_expenses is None))
+    context = await sync_to_async(_user_dashboard_context)(
+        request.user, results, total_expenses, current_month, data_versions
+    )
+    return await sync_to_async(render)(request, 'user/dashboard.html', context)
+
+
+@async_role_required('admin', 'user')
+@replica_reads
+async def transparent_data_async(request):
+    """Transparent mess data with its totals queried concurrently"""
+    month_filter = request.GET.get('month', datetime.now().strftime('%Y-%m'))
+    results = await gather_queries(_transparent_data_queries(month_filter))
+    context = await sync_to_async(_transparent_data_context)(results, month_filter)
+    return await sync_to_async(render)(request, 'user/transparent_data.html', context)
+
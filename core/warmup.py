@@ -0,0 +1,91 @@
+"""
+Worker warm-up - builds the lazily initialised state that the first request
+to a fresh gunicorn worker would otherwise pay for
+
+Called from the hooks in gunicorn.conf.py: once in the master before workers
+are forked (when the app is preloaded), and once in every worker after fork.
+"""
+import logging
+
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+
+logger = logging.getLogger(__name__)
+
+# Templates behind the most visited pages; loading one also compiles the
+# templates it extends and includes into the cached template loader
+WARM_TEMPLATES = (
+    'landing.html',
+    'auth/login.html',
+    'admin/dashboard.html',
+    'user/dashboard.html',
+    'user/transparent_data.html',
+    'user/meal_calendar.html',
+)
+
+
+def close_database_connections():
+    """
+    Drop every database connection held by this process
+
+    A connection opened before fork must never be used by two processes,
+    and gthread workers serve requests on their own threads (each with its
+    own connection), so the connection used for warm-up is not kept either.
+    """
+    connections.close_all()
+
+
+def warm_url_resolver():
+    """Import every view module and build the reverse() lookup tables"""
+    resolver = get_resolver()
+    resolver.reverse_dict
+    return len(resolver.url_patterns)
+
+
+def warm_templates(names=WARM_TEMPLATES):
+    """Compile templates into the cached loader; returns how many loaded"""
+    loaded = 0
+    for name in names:
+        try:
+            get_template(name)
+            loaded += 1
+        except Exception:
+            logger.warning('Could not pre-load template %s', name, exc_info=True)
+    return loaded
+
+
+def warm_mess_settings():
+    """Fill the shared MessSettings cache; needs a working database"""
+    from .models import MessSettings
+
+    try:
+        MessSettings.get_cached()
+        return True
+    except Exception:
+        logger.warning('Could not warm the MessSettings cache', exc_info=True)
+        return False
+
+
+def warm_up(database=True):
+    """
+    Warm everything a worker needs before its first request
+
+    Args:
+        database: Also touch the database (MessSettings). Pass False in the
+            gunicorn master, which must not hold connections across fork.
+
+    Returns:
+        dict with what was warmed, for logging
+    """
+    close_database_connections()
+
+    result = {
+        'url_patterns': warm_url_resolver(),
+        'templates': warm_templates(),
+    }
+    if database:
+        result['mess_settings'] = warm_mess_settings()
+        close_database_connections()
+    return result
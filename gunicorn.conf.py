@@ -0,0 +1,87 @@
+"""
+Gunicorn configuration for production
+
+gunicorn reads ./gunicorn.conf.py automatically; railway.json also passes it
+explicitly. Every value can be overridden with an environment variable:
+
+    WEB_CONCURRENCY           worker processes (default: 2 x CPUs + 1, max 8)
+    GUNICORN_THREADS          threads per worker (default: 4)
+    GUNICORN_WORKER_CLASS     gthread (default) or sync
+    GUNICORN_PRELOAD          'True' (default) / 'False'
+    GUNICORN_TIMEOUT          seconds before a stuck worker is restarted
+    GUNICORN_MAX_REQUESTS     requests before a worker is recycled
+
+Threaded workers keep a slow PDF build or SMTP call from blocking a whole
+process. Note that every thread holds its own database connection
+(CONN_MAX_AGE), so workers x threads must stay below the database's limit.
+"""
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _cpu_count():
+    # Respects the CPU set of the container, unlike os.cpu_count()
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = _env_int('WEB_CONCURRENCY', min(2 * _cpu_count() + 1, 8))
+threads = _env_int('GUNICORN_THREADS', 4)
+
+# Load Django once in the master so workers share its memory copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Recycle workers now and then to cap memory growth; jitter avoids restarting
+# them all at once
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# Worker heartbeat files on tmpfs, so a slow disk cannot stall workers
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# Set GUNICORN_ACCESS_LOG to an empty string to turn the access log off
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    """Master is up; warm shared state once before the first fork"""
+    if not server.cfg.preload_app:
+        return
+    from core.warmup import warm_up
+    result = warm_up(database=False)
+    server.log.info('Master warm-up: %s', result)
+
+
+def post_fork(server, worker):
+    """Drop connections inherited from the master and warm the new worker"""
+    if not server.cfg.preload_app:
+        return  # Django is not loaded yet; see post_worker_init
+    _warm_worker(server, worker)
+
+
+def post_worker_init(worker):
+    """Without preload the app is only loaded here, after fork"""
+    if not worker.cfg.preload_app:
+        _warm_worker(worker, worker)
+
+
+def _warm_worker(server, worker):
+    from core.warmup import warm_up
+    result = warm_up()
+    server.log.info('Worker %s warm-up: %s', worker.pid, result)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mess_management.settings')
+# Async dashboards only pay off under an ASGI server
+os.environ.setdefault('ASYNC_DASHBOARDS', 'True')
 
 application = get_asgi_application()
@@ -0,0 +1,123 @@
+"""
+Release phase for deploys: apply migrations only when some are pending
+
+    python -m mess_management.release
+
+Run once per deploy, before the new containers start. `manage.py migrate`
+sets up every app, loads all models, runs the system checks and fires the
+post_migrate handlers even when there is nothing to apply. This script first
+compares the migration files on disk with the django_migrations table, using
+only the settings and a raw database connection, and exits straight away
+when every migration is already recorded. Only then does it hand over to
+the real migrate command.
+
+Static files are collected at build time (see nixpacks.toml), not here.
+"""
+import importlib
+import importlib.util
+import os
+import pkgutil
+import sys
+import time
+import warnings
+
+
+def _app_migration_modules(installed_apps, migration_modules):
+    """
+    Yield (app_label, migrations_module) for every installed app
+
+    Labels are derived from the dotted path the way Django's default
+    AppConfig does. An app whose real label differs simply shows up as
+    pending, which only costs a regular migrate run.
+    """
+    for entry in installed_apps:
+        package, _, last = entry.rpartition('.')
+        if package and last[:1].isupper():
+            # 'app.apps.SomeConfig' names the config class, not the app
+            config = getattr(importlib.import_module(package), last)
+            label = getattr(config, 'label', None) or config.name.rpartition('.')[2]
+            app_name = config.name
+        else:
+            label = last
+            app_name = entry
+
+        if label in migration_modules:
+            module = migration_modules[label]
+            if module is None:
+                continue  # migrations disabled for this app
+        else:
+            module = f'{app_name}.migrations'
+        yield label, module
+
+
+def migrations_on_disk(installed_apps, migration_modules=None):
+    """
+    Set of (app_label, migration_name) for every migration file on disk
+
+    Migration packages are located with find_spec and their files listed
+    with pkgutil, so no migration (and no model) is imported.
+    """
+    found = set()
+    for label, module in _app_migration_modules(installed_apps, migration_modules or {}):
+        try:
+            spec = importlib.util.find_spec(module)
+        except ModuleNotFoundError:
+            spec = None
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        for info in pkgutil.iter_modules(spec.submodule_search_locations):
+            # Same filter as django.db.migrations.loader.MigrationLoader
+            if not info.ispkg and info.name[0] not in '_~':
+                found.add((label, info.name))
+    return found
+
+
+def recorded_migrations(connection):
+    """Set of (app_label, migration_name) rows in the django_migrations table"""
+    with warnings.catch_warnings(), connection.cursor() as cursor:
+        # Querying before django.setup() is deliberate here
+        warnings.filterwarnings('ignore', 'Accessing the database during app initialization',
+                                RuntimeWarning)
+        if 'django_migrations' not in connection.introspection.table_names(cursor):
+            return set()
+        cursor.execute('SELECT app, name FROM django_migrations')
+        return set(cursor.fetchall())
+
+
+def pending_migrations(using='default'):
+    """
+    Migrations on disk that the database has not recorded, sorted
+
+    Needs configured settings but not django.setup().
+    """
+    from django.conf import settings
+    from django.db import connections
+
+    on_disk = migrations_on_disk(settings.INSTALLED_APPS, settings.MIGRATION_MODULES)
+    return sorted(on_disk - recorded_migrations(connections[using]))
+
+
+def main():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mess_management.settings')
+    started = time.perf_counter()
+
+    pending = pending_migrations()
+    if not pending:
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f'No pending migrations (checked in {elapsed:.0f} ms)')
+        return 0
+
+    print(f'{len(pending)} pending migration(s):')
+    for app_label, name in pending:
+        print(f'  {app_label}.{name}')
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', interactive=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -60,8 +60,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.HealthCheckMiddleware',  # /healthz and /readyz, ahead of everything else
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add for static files
+    'core.middleware.RequestTimingMiddleware',  # Server-Timing header and timing log line
+    'core.middleware.NPlusOneMiddleware',  # Repeated-query detection (core/nplusone.py)
+    'core.middleware.ReplicaPinMiddleware',  # Read-your-writes for the read replica, if any
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -75,7 +79,9 @@ ROOT_URLCONF = 'mess_management.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that also reports render time per request
+        'BACKEND': 'core.request_timing.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -116,6 +122,39 @@ else:
         }
     }
 
+# Opt-in SQLite tuning for single-node deployments (core/sqlite_tuning.py):
+# WAL journal, synchronous=NORMAL, a sized mmap and page cache, and a busy
+# timeout so concurrent gunicorn workers wait for the write lock
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'False') == 'True'
+SQLITE_PRAGMAS = {
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE_MB', 256)) * 1024 * 1024,
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_SIZE_MB', 64)) * 1024,
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+}
+
+
+# Cache
+# Must be shared by all gunicorn workers: template fragments are invalidated
+# through version counters (core/cache_versions.py) that every worker reads.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    # File-based cache is shared across processes on a single host
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / '.django_cache'),
+            'OPTIONS': {
+                'MAX_ENTRIES': 5000,
+            },
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -242,6 +281,67 @@ SERVER_EMAIL = EMAIL_HOST_USER
 # Password Reset Settings
 PASSWORD_RESET_TIMEOUT = 3600  # 1 hour (in seconds)
 
+# Meal plan iCalendar feed - date window served, relative to today
+MEAL_FEED_DAYS_BACK = int(os.environ.get('MEAL_FEED_DAYS_BACK', 7))
+MEAL_FEED_DAYS_AHEAD = int(os.environ.get('MEAL_FEED_DAYS_AHEAD', 60))
+
+# Logging - one JSON line per request on 'core.request_timing'
+# (set REQUEST_TIMING_LOG_LEVEL=WARNING to turn it off)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.request_timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# N+1 query detection (core/nplusone.py): 'log' a sampled warning, 'raise'
+# (used by the test runner) or 'off'
+NPLUSONE_MODE = os.environ.get('NPLUSONE_MODE', 'log')
+NPLUSONE_THRESHOLD = int(os.environ.get('NPLUSONE_THRESHOLD', 5))
+NPLUSONE_SAMPLE_RATE = float(os.environ.get('NPLUSONE_SAMPLE_RATE', 0.1))
+
+# Runs the tests with N+1 detection raising errors
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
+# Serve the async dashboard views, which run their independent queries
+# concurrently. On by default under mess_management.asgi.
+ASYNC_DASHBOARDS = os.environ.get('ASYNC_DASHBOARDS', 'False') == 'True'
+
+# Seconds /readyz waits for its database and cache checks (core/health.py)
+READINESS_TIMEOUT = float(os.environ.get('READINESS_TIMEOUT', 2))
+
+# Send the emails of the admin "Remind all pending" action on a background
+# thread after the response (core/reminders.py); off in tests
+REMINDER_EMAILS_IN_BACKGROUND = os.environ.get('REMINDER_EMAILS_IN_BACKGROUND', 'True') == 'True'
+# Days run_reminders keeps retrying a reminder email that didn't go out
+REMINDER_EMAIL_RETRY_DAYS = int(os.environ.get('REMINDER_EMAIL_RETRY_DAYS', 3))
+
+# Monthly report emails (core/report_mailer.py): messages per SMTP session,
+# kept under what Gmail accepts before dropping a session, and the pause
+# between sessions so a large mailing isn't throttled as a burst
+REPORT_EMAIL_BATCH_SIZE = int(os.environ.get('REPORT_EMAIL_BATCH_SIZE', 50))
+REPORT_EMAIL_BATCH_PAUSE = float(os.environ.get('REPORT_EMAIL_BATCH_PAUSE', 2))
+# Failed sends are retried by later runs up to this many times in all
+REPORT_EMAIL_MAX_ATTEMPTS = int(os.environ.get('REPORT_EMAIL_MAX_ATTEMPTS', 3))
+
+# Failed logins from one IP before it is locked out (core/login_throttle.py).
+# Per-username limits come from MessSettings.max_login_attempts; the IP
+# limit is higher because members on the mess wifi share one address.
+LOGIN_THROTTLE_IP_FAILURES = int(os.environ.get('LOGIN_THROTTLE_IP_FAILURES', 50))
+# Proxies in front of the app that append to X-Forwarded-For (Railway's
+# edge is one); the client IP is the entry they added. 0 uses REMOTE_ADDR.
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 1))
+
 # INSTRUCTIONS TO SET EMAIL PASSWORD:
 # For local development, create a .env file (NOT committed to Git) with:
 # EMAIL_HOST_PASSWORD=your-16-char-app-password
@@ -269,10 +369,38 @@ if 'RAILWAY_ENVIRONMENT' in os.environ:
     DATABASES = {
         'default': dj_database_url.config(
             conn_max_age=600,
+            conn_health_checks=True,
             ssl_require=False  # Railway MySQL doesn't require SSL
         )
     }
     
+    if DATABASES['default'].get('ENGINE') == 'django.db.backends.mysql':
+        # Client-side timeouts, plus a server-side cap on each SELECT
+        DATABASES['default'].setdefault('OPTIONS', {}).update({
+            'connect_timeout': 5,
+            'read_timeout': 30,
+            'write_timeout': 30,
+            'init_command': 'SET SESSION max_execution_time = %d'
+                            % int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 10000)),
+        })
+        
+        # One pool of health-checked connections shared by all threads of a
+        # worker (core/db_pool.py); mysqlclient if installed, else PyMySQL
+        if os.environ.get('DB_POOL', 'True') == 'True':
+            DATABASES['default'].update({
+                'ENGINE': 'core.db_backends.mysql',
+                'CONN_MAX_AGE': 0,  # hand the connection back after each request
+                'CONN_HEALTH_CHECKS': False,  # the pool checks on checkout
+                'POOL': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+                    'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 600)),
+                    'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+                    'check_after': float(os.environ.get('DB_POOL_CHECK_AFTER', 1)),
+                },
+            })
+    
     # Allowed hosts from environment variable
     allowed_hosts_str = os.environ.get('ALLOWED_HOSTS', '')
     if allowed_hosts_str:
@@ -296,3 +424,29 @@ if 'RAILWAY_ENVIRONMENT' in os.environ:
             MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
             'whitenoise.middleware.WhiteNoiseMiddleware'
         )
+
+
+# ==================== READ REPLICA ====================
+# With DATABASE_REPLICA_URL set, reports, exports, dashboards and the
+# transparency page read from the replica (core/db_router.py). A browser that
+# just wrote reads from the primary for REPLICA_PIN_SECONDS; an unreachable
+# replica is skipped for REPLICA_RETRY_SECONDS. Cache entries filled from the
+# replica expire after REPLICA_CACHE_SECONDS, so a lagging one isn't kept.
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+REPLICA_RETRY_SECONDS = int(os.environ.get('REPLICA_RETRY_SECONDS', 30))
+REPLICA_CACHE_SECONDS = int(os.environ.get('REPLICA_CACHE_SECONDS', 30))
+
+if os.environ.get('DATABASE_REPLICA_URL'):
+    replica = dj_database_url.parse(
+        os.environ['DATABASE_REPLICA_URL'],
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    if replica['ENGINE'] == 'django.db.backends.mysql' and 'mysql' in DATABASES['default']['ENGINE']:
+        # Same driver options, statement timeout and pooling as the primary
+        replica.update({key: value for key, value in DATABASES['default'].items()
+                        if key in ('ENGINE', 'OPTIONS', 'CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'POOL')})
+    # Tests read the test database through the replica alias
+    replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES['replica'] = replica